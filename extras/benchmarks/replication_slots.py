@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Measure the cost of replication slots calculations done by one HA cycle.
+
+A :class:`~patroni.dcs.Cluster` object with the given number of members and permanent slots is created in-process
+together with a stub Postgresql object, so no PostgreSQL or DCS is required. Every cycle performs the same set of
+calls to the :class:`~patroni.dcs.Cluster` object as Patroni does while running as a replica.
+
+Usage::
+
+    python extras/benchmarks/replication_slots.py --members 50 --slots 200 --cycles 200
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+from typing import Any, Callable, Dict, List
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from patroni import global_config  # noqa: E402
+from patroni.dcs import Cluster, ClusterConfig, Leader, Member, Status, SyncState  # noqa: E402
+from patroni.postgresql.misc import PostgresqlRole  # noqa: E402
+
+
+class StubPostgresql(object):
+
+    name = 'member0'
+    role = PostgresqlRole.REPLICA
+    can_advance_slots = True
+    major_version = 170000
+
+
+def make_cluster(members: int, slots: int) -> Cluster:
+    member_list = [Member(0, 'member{0}'.format(i), 30,
+                          {'state': 'running', 'api_url': 'http://127.0.0.1:{0}/patroni'.format(8008 + i),
+                           'conn_url': 'postgres://127.0.0.1:{0}/postgres'.format(5432 + i), 'xlog_location': 100,
+                           'tags': {'replicatefrom': 'member{0}'.format(i - 1)} if i % 10 == 9 else {}})
+                   for i in range(members)]
+    permanent_slots: Dict[str, Any] = {
+        'slot{0}'.format(i): {'type': 'logical', 'database': 'db', 'plugin': 'pgoutput'} if i % 2 else None
+        for i in range(slots)}
+    config = ClusterConfig(1, {'permanent_slots': permanent_slots, 'member_slots_ttl': 0}, 1)
+    status = Status(100, {name: 100 for name in permanent_slots}, [])
+    leader = Leader(0, 0, member_list[-1])
+    return Cluster(True, config, leader, status, member_list, None, SyncState.empty(), None, None)
+
+
+def cycle(cluster: Cluster, postgresql: Any) -> None:
+    member = cluster.get_member(postgresql.name, False)
+    assert isinstance(member, Member)
+    cluster.should_enforce_hot_standby_feedback(postgresql, member)
+    cluster.has_permanent_slots(postgresql, member)
+    cluster.get_replication_slots(postgresql, member, show_error=True)
+    cluster.get_replication_slots(postgresql, member, role=PostgresqlRole.REPLICA)
+    cluster.maybe_filter_permanent_slots(postgresql, {'slot0': 100})
+    _ = cluster.permanent_physical_slots
+
+
+def run(cluster: Cluster, cycles: int, new_snapshot: bool) -> List[float]:
+    postgresql = StubPostgresql()
+    durations: List[float] = []
+    for _ in range(cycles):
+        snapshot = Cluster(*cluster) if new_snapshot else cluster
+        start = time.time()
+        cycle(snapshot, postgresql)
+        durations.append(time.time() - start)
+    return durations
+
+
+def no_memoize(self: Cluster, key: Any, func: Callable[[], Any]) -> Any:
+    return func()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--members', type=int, default=50, help='number of cluster members')
+    parser.add_argument('--slots', type=int, default=200, help='number of permanent slots')
+    parser.add_argument('--cycles', type=int, default=200, help='number of HA cycles to run')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.CRITICAL)
+    cluster = make_cluster(args.members, args.slots)
+    global_config.update(cluster)
+
+    results: Dict[str, List[float]] = {}
+    with patch.object(Cluster, '_memoize', no_memoize):
+        results['no memoization'] = run(cluster, args.cycles, True)
+    results['new snapshot'] = run(cluster, args.cycles, True)
+    results['same snapshot'] = run(cluster, args.cycles, False)
+
+    print('{0:<16}{1:>12}{2:>12}{3:>12}'.format('mode', 'mean ms', 'p50 ms', 'max ms'))
+    for mode, durations in results.items():
+        durations.sort()
+        print('{0:<16}{1:>12.3f}{2:>12.3f}{3:>12.3f}'.format(
+            mode, sum(durations) / len(durations) * 1000, durations[len(durations) // 2] * 1000, durations[-1] * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+"""Compare throughput and latency of the ``threaded`` and ``asyncio`` REST API server modes.
+
+The REST API server is started in-process with a stub Patroni object, so no PostgreSQL or DCS is required. Every
+client thread opens a new connection for each request, the same way most health checkers do.
+
+Usage::
+
+    python extras/benchmarks/restapi_server.py --concurrency 50 --requests 200 --path /liveness
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+from http.client import HTTPConnection, HTTPSConnection
+from threading import Thread
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from patroni.api import RestApiServer  # noqa: E402
+from patroni.postgresql.misc import PostgresqlRole  # noqa: E402
+
+
+class StubConnectionPool(object):
+
+    def get_pool(self, name: str) -> Any:
+        from patroni.postgresql.connection import NamedConnectionPool
+        return NamedConnectionPool(None, name)  # pyright: ignore [reportArgumentType]
+
+
+class StubPostgresql(object):
+
+    role = PostgresqlRole.PRIMARY
+    connection_pool = StubConnectionPool()
+
+    @staticmethod
+    def is_running() -> bool:
+        return True
+
+
+class StubHa(object):
+
+    @staticmethod
+    def is_paused() -> bool:
+        return False
+
+
+class StubDcs(object):
+
+    ttl = 30
+    cluster = None
+
+
+class StubPatroni(object):
+
+    version = '0.0.0'
+    postgresql = StubPostgresql()
+    ha = StubHa()
+    dcs = StubDcs()
+
+    @property
+    def next_run(self) -> float:
+        return time.time()
+
+
+def percentile(values: List[float], p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p / 100.0))] if values else 0.0
+
+
+def client(address: Any, path: str, requests: int, ssl_context: Any, latencies: List[float], errors: List[int]) -> None:
+    for _ in range(requests):
+        start = time.time()
+        try:
+            if ssl_context:
+                conn = HTTPSConnection(address[0], address[1], timeout=30, context=ssl_context)
+            else:
+                conn = HTTPConnection(address[0], address[1], timeout=30)
+            conn.request('GET', path)
+            conn.getresponse().read()
+            conn.close()
+            latencies.append(time.time() - start)
+        except Exception:
+            errors.append(1)
+
+
+def run(server_mode: str, args: argparse.Namespace) -> Dict[str, float]:
+    config: Dict[str, Any] = {'listen': '127.0.0.1:0', 'server_mode': server_mode,
+                              'thread_pool_size': args.thread_pool_size, 'request_queue_size': 1024}
+    ssl_context: Optional[Any] = None
+    if args.certfile:
+        import ssl
+        config.update(certfile=args.certfile, keyfile=args.keyfile)
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+
+    server = RestApiServer(StubPatroni(), config)  # pyright: ignore [reportArgumentType]
+    server.start()
+    latencies: List[float] = []
+    errors: List[int] = []
+    try:
+        threads = [Thread(target=client, args=(server.server_address, args.path, args.requests,
+                                               ssl_context, latencies, errors)) for _ in range(args.concurrency)]
+        start = time.time()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duration = time.time() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    latencies.sort()
+    return {'requests/s': len(latencies) / duration, 'p50 ms': percentile(latencies, 50) * 1000,
+            'p90 ms': percentile(latencies, 90) * 1000, 'p99 ms': percentile(latencies, 99) * 1000,
+            'max ms': (latencies[-1] if latencies else 0) * 1000, 'errors': len(errors)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--concurrency', type=int, default=50, help='number of concurrent clients')
+    parser.add_argument('--requests', type=int, default=200, help='number of requests per client')
+    parser.add_argument('--path', default='/liveness', help='REST API endpoint to call')
+    parser.add_argument('--thread-pool-size', type=int, default=5, help='value of restapi.thread_pool_size')
+    parser.add_argument('--certfile', help='serve HTTPS using this certificate')
+    parser.add_argument('--keyfile', help='key of the certificate')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = {mode: run(mode, args) for mode in ('threaded', 'asyncio')}
+
+    columns = list(results['threaded'].keys())
+    print('{0:<10}'.format('mode') + ''.join('{0:>12}'.format(c) for c in columns))
+    for mode, result in results.items():
+        print('{0:<10}'.format(mode) + ''.join('{0:>12.2f}'.format(result[c]) for c in columns))
+
+
+if __name__ == '__main__':
+    main()
@@ -212,7 +212,8 @@ class Patroni(AbstractPatroniDaemon, Tags):
             # Release the GIL so we don't starve anyone waiting on async_executor lock
             time.sleep(0.001)
             # Warn user that Patroni is not keeping up
-            logger.warning("Loop time exceeded, rescheduling immediately.")
+            logger.warning("Loop time exceeded, rescheduling immediately. Last HA cycle: %s",
+                           self.ha.cycle_timer.describe_last())
         elif self.ha.watch(nap_time):
             self.next_run = time.time()
 
@@ -228,15 +229,22 @@ class Patroni(AbstractPatroniDaemon, Tags):
     def _run_cycle(self) -> None:
         """Run a cycle of the ``patroni`` daemon main loop.
 
-        Run an HA cycle and schedule the next cycle run. If any dynamic configuration change request is detected, apply
-        the change and cache the new dynamic configuration values in ``patroni.dynamic.json`` file under Postgres data
-        directory.
+        Run an HA cycle, publish changes of the cluster topology to clients of the REST API ``/events`` endpoint, keep
+        connection pools to the REST API of current members, and schedule the next cycle run. If any dynamic
+        configuration change request is detected, apply the change and cache the new dynamic configuration values in
+        ``patroni.dynamic.json`` file under Postgres data directory.
         """
         from patroni.config import ROLE_CONFIG_SUFFIX_MAP
         from patroni.postgresql.misc import PostgresqlRole
         from patroni.utils import deep_compare
 
         logger.info(self.ha.run_cycle())
+        self.api.cluster_events.update(self.dcs.cluster, self.postgresql.role)
+        peers = [m.api_url for m in self.dcs.cluster.members if m.api_url] if self.dcs.cluster else []
+        failsafe = self.dcs.failsafe
+        if isinstance(failsafe, dict):
+            peers.extend(failsafe.values())
+        self.request.set_peers(peers)
 
         if self.dcs.cluster and self.dcs.cluster.config and self.dcs.cluster.config.data \
                 and self.config.set_dynamic_configuration(self.dcs.cluster.config):
@@ -6,6 +6,7 @@ Much of what can be achieved with the command line tool patronictl can be done v
 utilises the API to perform these functions.
 """
 
+import asyncio
 import base64
 import datetime
 import hmac
@@ -13,22 +14,26 @@ import json
 import logging
 import os
 import socket
+import stat
 import sys
 import time
 import traceback
 
 from http.server import BaseHTTPRequestHandler, HTTPServer
-from ipaddress import ip_address, ip_network, IPv4Network, IPv6Network
-from socketserver import ThreadingMixIn
-from typing import Any, Callable, cast, Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING, Union
+from io import BytesIO
+from ipaddress import ip_address, ip_network, IPv4Address, IPv4Network, IPv6Address, IPv6Network
+from socketserver import TCPServer, ThreadingMixIn
+from threading import Condition, Event, Lock, Thread
+from typing import Any, Callable, cast, Dict, FrozenSet, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING, Union
 from urllib.parse import parse_qs, urlparse
 
 import dateutil.parser
 
-from . import global_config, psycopg
+from . import global_config, psycopg, thread_pool
 from .__main__ import Patroni
-from .dcs import Cluster
+from .dcs import Cluster, DCSOperationStats
 from .exceptions import PostgresConnectionException, PostgresException
+from .postgresql.connection import ConnectionPoolExhausted
 from .postgresql.misc import postgres_version_to_int, PostgresqlRole, PostgresqlState
 from .thread_pool import PatroniThreadPoolExecutor
 from .utils import cluster_as_json, deep_compare, enable_keepalive, parse_bool, \
@@ -114,6 +119,8 @@ class RestApiHandler(BaseHTTPRequestHandler):
         """
         if TYPE_CHECKING:  # pragma: no cover
             assert isinstance(server, RestApiServer)
+        self.requests_served = 0
+        self.__connection_header_sent = False
         super(RestApiHandler, self).__init__(request, client_address, server)
         self.server: 'RestApiServer' = server  # pyright: ignore [reportIncompatibleVariableOverride]
         self.__start_time: float = 0.0
@@ -147,8 +154,14 @@ class RestApiHandler(BaseHTTPRequestHandler):
 
             * ``_write_status_code_only(200)`` would write a response like ``HTTP/1.0 200 OK``.
         """
-        message = self.responses[status_code][0]
-        self.wfile.write('{0} {1} {2}\r\n\r\n'.format(self.protocol_version, status_code, message).encode('utf-8'))
+        if self.close_connection:
+            message = self.responses[status_code][0]
+            self.wfile.write('{0} {1} {2}\r\n\r\n'.format(self.protocol_version, status_code, message)
+                             .encode('utf-8'))
+        else:  # persistent connection, the client must know where the response ends
+            self.send_response_only(status_code)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
         self.log_request(status_code)
 
     def write_response(self, status_code: int, body: str, content_type: str = 'text/html',
@@ -166,16 +179,18 @@ class RestApiHandler(BaseHTTPRequestHandler):
         :param headers: dictionary of additional HTTP headers to set for the response. Each key is the header name, and
             the corresponding value is the value for the header in the response.
         """
+        data = body.encode('utf-8')
         self.send_response(status_code)
         headers = headers or {}
         if content_type:
             headers['Content-Type'] = content_type
+        headers['Content-Length'] = str(len(data))
         for name, value in headers.items():
             self.send_header(name, value)
         for name, value in (self.server.http_extra_headers or {}).items():
             self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(body.encode('utf-8'))
+        self.wfile.write(data)
 
     def _write_json_response(self, status_code: int, response: Any) -> None:
         """Write an HTTP response with a JSON content type.
@@ -320,7 +335,7 @@ class RestApiHandler(BaseHTTPRequestHandler):
                                        Useful when health-checks are executed by HAProxy.
         """
         path = '/primary' if self.path == '/' else self.path
-        response = self.get_postgresql_status()
+        response = self.get_postgresql_status(use_snapshot=True)
         latest_end_lsn = response.pop('latest_end_lsn', 0)
 
         patroni = self.server.patroni
@@ -537,10 +552,13 @@ class RestApiHandler(BaseHTTPRequestHandler):
         """Handle a ``GET`` request to ``/patroni`` path.
 
         Write an HTTP response through :func:`_write_status_response`, with HTTP status ``200`` and the status of
-        Postgres.
+        Postgres. The ``ha_cycle`` key contains durations in seconds of phases of the last HA cycle.
         """
         response = self.get_postgresql_status(True)
         response.pop('latest_end_lsn', None)
+        last_cycle = self.server.patroni.ha.cycle_timer.last
+        if last_cycle:
+            response['ha_cycle'] = {phase: round(duration, 6) for phase, duration in last_cycle.items()}
         self._write_status_response(200, response)
 
     def do_GET_cluster(self) -> None:
@@ -555,6 +573,69 @@ class RestApiHandler(BaseHTTPRequestHandler):
         response['scope'] = self.server.patroni.postgresql.scope
         self._write_json_response(200, response)
 
+    def do_GET_events(self) -> None:
+        """Handle a ``GET`` request to ``/events`` path.
+
+        Stream changes of the cluster topology as `Server-Sent Events`, so that clients don't need to poll ``/cluster``
+        or ``/patroni``. Every ``cluster`` event contains the output of :meth:`ClusterEvents.cluster_state` with the
+        ``version``, ``scope`` and ``name`` keys added. The version is also sent as the event ``id``.
+
+        The following query parameters are supported:
+
+            * ``version``: resume from the given version, only newer state is sent. Browsers send it automatically in
+              the ``Last-Event-ID`` header when reconnecting;
+            * ``heartbeat``: interval in seconds of comment frames sent while nothing changes, ``10`` by default;
+            * ``poll``: long-poll instead of streaming. Wait up to the given number of seconds for a change and write
+              the new state as a JSON response with HTTP status ``200``, or ``304`` if nothing changed.
+
+        .. note::
+            With ``restapi.server_mode: asyncio`` at most one event, or heartbeat, is sent per connection, the client
+            is expected to reconnect.
+
+        Write HTTP status ``503`` if there are too many clients waiting for events.
+        """
+        def query_int(name: str, default: int) -> int:
+            value = parse_int(self.path_query.get(name, [''])[0])
+            return default if value is None else max(value, 1)
+
+        version = self.path_query.get('version', [None])[0] or self.headers.get('Last-Event-ID')
+        heartbeat = query_int('heartbeat', 10)
+        poll = query_int('poll', 0) if 'poll' in self.path_query else None
+        patroni = self.server.patroni
+        events = self.server.cluster_events
+
+        if not self.server.acquire_event_stream():
+            return self.write_response(503, 'Too many event streams')
+        try:
+            if poll is not None:
+                result = events.wait(version, poll)
+                if not result:
+                    return self._write_status_code_only(304)
+                return self._write_json_response(200, dict(result[1], version=result[0], scope=patroni.postgresql.scope,
+                                                           name=patroni.postgresql.name))
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            for name, value in (self.server.http_extra_headers or {}).items():
+                self.send_header(name, value)
+            self.close_connection = True  # the response has no length
+            self.end_headers()
+            self.wfile.write(b'retry: 1000\n\n')
+            while not events.closed:
+                result = events.wait(version, heartbeat)
+                if result:
+                    version = result[0]
+                    data = json.dumps(dict(result[1], version=version, scope=patroni.postgresql.scope,
+                                           name=patroni.postgresql.name), default=str)
+                    self.wfile.write('id: {0}\nevent: cluster\ndata: {1}\n\n'.format(version, data).encode('utf-8'))
+                elif not events.closed:
+                    self.wfile.write(b': heartbeat\n\n')
+                if isinstance(self.request, BufferedRequest):
+                    break
+        finally:
+            self.server.release_event_stream()
+
     def do_GET_history(self) -> None:
         """Handle a ``GET`` request to ``/history`` path.
 
@@ -615,12 +696,44 @@ class RestApiHandler(BaseHTTPRequestHandler):
             * ``patroni_failsafe_mode_is_active``: ``1`` if ``failsafe_mode`` is currently active, else ``0``;
             * ``patroni_failsafe_mode_enabled``: ``1`` if ``failsafe_mode`` is enabled in configuration, else ``0``;
             * ``patroni_failsafe_member``: ``1`` if this node is a member of failsafe topology, else ``0``;
+            * ``patroni_failsafe_member_response_seconds``: duration of the last ``POST /failsafe`` request sent by the
+              primary to every member of the failsafe topology;
             * ``patroni_failover_priority``: failover priority of this node (``0`` if ``nofailover`` is set, else value
               of ``failover_priority`` tag, defaulting to ``1``);
             * ``patroni_postgres_timeline``: PostgreSQL timeline based on current WAL file name;
             * ``patroni_dcs_last_seen``: epoch timestamp when DCS was last contacted successfully;
+            * ``patroni_dcs_lease_ttl_remaining_seconds``: time left before the DCS lease of this node expires, only
+              if known (Etcd v3 with ``lease_keepalive_stream`` enabled);
             * ``patroni_pending_restart``: ``1`` if this PostgreSQL node is pending a restart, else ``0``;
-            * ``patroni_is_paused``: ``1`` if Patroni is in maintenance node, else ``0``.
+            * ``patroni_is_paused``: ``1`` if Patroni is in maintenance node, else ``0``;
+            * ``patroni_allowlist_members_cache_hits``: number of ``allowlist_include_members`` checks that were
+              answered from the cache of resolved member addresses;
+            * ``patroni_allowlist_members_cache_misses``: number of ``allowlist_include_members`` checks that had
+              to synchronously resolve addresses of new members;
+            * ``patroni_allowlist_members_cache_refreshes``: number of expired cache entries re-resolved in background;
+            * ``patroni_restapi_connection_pool_size``, ``patroni_restapi_connection_pool_in_use`` and
+              ``patroni_restapi_connection_pool_max_size``: utilization of the pool of REST API connections to Postgres;
+            * ``patroni_restapi_connection_pool_checkouts``, ``patroni_restapi_connection_pool_exhausted`` and
+              ``patroni_restapi_connection_pool_wait_seconds``: number of successful checkouts, number of checkouts
+              that timed out, and total time spent waiting for a connection;
+            * ``patroni_ha_cycle_phase_seconds``: histogram of durations of the HA cycle phases, the ``phase`` label
+              is one of :attr:`~patroni.ha.CycleTimer.PHASES`;
+            * ``patroni_dcs_operation_seconds``: histogram of durations of DCS operations, the ``operation`` label is
+              one of :attr:`~patroni.dcs.AbstractDCS._INSTRUMENTED_OPERATIONS` without the leading underscore;
+            * ``patroni_dcs_operation_retries``: number of retries made while executing DCS operations;
+            * ``patroni_dcs_operation_errors``: number of failed DCS operations, the ``error`` label is the class name
+              of the raised exception or ``false`` if the operation returned ``False``;
+            * ``patroni_dcs_rpcs_saved``: number of DCS requests saved by combining writes into a single transaction;
+            * ``patroni_dcs_watch_relists``: number of times a watch cache had to be fully reloaded because the
+              watch could not be resumed, the ``cache`` label is the kind of cached objects;
+            * ``patroni_dcs_watch_lag_seconds``: histogram of time between a write made by this node and the moment
+              the watch delivered the corresponding event;
+            * ``patroni_restapi_keepalive_idle_connections``: number of persistent connections waiting for the next
+              request;
+            * ``patroni_restapi_keepalive_requests``: number of requests received on reused persistent connections;
+            * ``patroni_restapi_tls_handshakes`` and ``patroni_restapi_tls_session_hits``: number of completed TLS
+              handshakes and number of them that resumed a previous session, as counted by OpenSSL (only when REST
+              API uses HTTPS). Session resumption itself is left to the OpenSSL defaults.
 
         For PostgreSQL v9.6+ the response will also have the following:
 
@@ -628,7 +741,7 @@ class RestApiHandler(BaseHTTPRequestHandler):
             * ``patroni_postgres_in_archive_recovery``: ``1`` if Postgres isn't streaming and
               there is ``restore_command`` available, else ``0``.
         """
-        postgres = self.get_postgresql_status(True)
+        postgres = self.get_postgresql_status(True, use_snapshot=True)
         patroni = self.server.patroni
         epoch = datetime.datetime(1970, 1, 1, tzinfo=tzutc)
 
@@ -736,6 +849,13 @@ class RestApiHandler(BaseHTTPRequestHandler):
         metrics.append("# TYPE patroni_failsafe_member gauge")
         metrics.append("patroni_failsafe_member{0} {1}".format(labels, int(is_failsafe_member)))
 
+        metrics.append("# HELP patroni_failsafe_member_response_seconds Duration of the last failsafe check request "
+                       "to a member of failsafe topology.")
+        metrics.append("# TYPE patroni_failsafe_member_response_seconds gauge")
+        for member, duration in patroni.ha.failsafe_response_times.copy().items():
+            metrics.append('patroni_failsafe_member_response_seconds{0},member="{1}"}} {2}'
+                           .format(labels[:-1], member, duration))
+
         metrics.append("# HELP patroni_postgres_timeline Postgres timeline of this node (if running), 0 otherwise.")
         metrics.append("# TYPE patroni_postgres_timeline gauge")
         metrics.append("patroni_postgres_timeline{0} {1}".format(labels, postgres.get('timeline') or 0))
@@ -745,6 +865,13 @@ class RestApiHandler(BaseHTTPRequestHandler):
         metrics.append("# TYPE patroni_dcs_last_seen gauge")
         metrics.append("patroni_dcs_last_seen{0} {1}".format(labels, postgres.get('dcs_last_seen', 0)))
 
+        lease_ttl_remaining = getattr(patroni.dcs, 'lease_ttl_remaining', None)
+        if isinstance(lease_ttl_remaining, (int, float)):
+            metrics.append("# HELP patroni_dcs_lease_ttl_remaining_seconds Time left before the DCS lease of this"
+                           " node expires.")
+            metrics.append("# TYPE patroni_dcs_lease_ttl_remaining_seconds gauge")
+            metrics.append("patroni_dcs_lease_ttl_remaining_seconds{0} {1:.3f}".format(labels, lease_ttl_remaining))
+
         metrics.append("# HELP patroni_pending_restart Value is 1 if the node needs a restart, 0 otherwise.")
         metrics.append("# TYPE patroni_pending_restart gauge")
         metrics.append("patroni_pending_restart{0} {1}"
@@ -767,8 +894,112 @@ class RestApiHandler(BaseHTTPRequestHandler):
         metrics.append("# TYPE patroni_failover_priority gauge")
         metrics.append("patroni_failover_priority{0} {1}".format(labels, patroni.failover_priority))
 
+        members_ips_cache = self.server.members_ips_cache
+        for name, value, description in (
+                ('hits', members_ips_cache.hits, 'Number of member allowlist checks answered from the cache.'),
+                ('misses', members_ips_cache.misses, 'Number of member allowlist checks that resolved new members.'),
+                ('refreshes', members_ips_cache.refreshes, 'Number of member addresses refreshed in background.')):
+            metrics.append("# HELP patroni_allowlist_members_cache_{0} {1}".format(name, description))
+            metrics.append("# TYPE patroni_allowlist_members_cache_{0} counter".format(name))
+            metrics.append("patroni_allowlist_members_cache_{0}{1} {2}".format(name, labels, value))
+
+        pool = patroni.postgresql.connection_pool.get_pool('restapi')
+        for name, kind, value, description in (
+                ('size', 'gauge', pool.size, 'Number of REST API connections to Postgres in the pool.'),
+                ('in_use', 'gauge', pool.in_use, 'Number of REST API connections to Postgres in use.'),
+                ('max_size', 'gauge', pool.max_size, 'Maximum number of REST API connections to Postgres.'),
+                ('checkouts', 'counter', pool.checkouts, 'Number of REST API connections checked out from the pool.'),
+                ('exhausted', 'counter', pool.exhausted,
+                 'Number of requests that failed to check out a REST API connection in time.'),
+                ('wait_seconds', 'counter', pool.wait_time,
+                 'Total time spent waiting for a REST API connection to become available.')):
+            metrics.append("# HELP patroni_restapi_connection_pool_{0} {1}".format(name, description))
+            metrics.append("# TYPE patroni_restapi_connection_pool_{0} {1}".format(name, kind))
+            metrics.append("patroni_restapi_connection_pool_{0}{1} {2}".format(name, labels, value))
+
+        histograms, sums = patroni.ha.cycle_timer.snapshot()
+        self._append_histogram(metrics, 'patroni_ha_cycle_phase_seconds', 'Duration of phases of the HA cycle.',
+                               labels, 'phase', patroni.ha.cycle_timer.BUCKETS, histograms, sums)
+
+        operation_stats = getattr(patroni.dcs, 'operation_stats', None)
+        if isinstance(operation_stats, DCSOperationStats):
+            histograms, sums, retries, errors = operation_stats.snapshot()
+            self._append_histogram(metrics, 'patroni_dcs_operation_seconds', 'Duration of DCS operations.',
+                                   labels, 'operation', operation_stats.BUCKETS, histograms, sums)
+            metrics.append("# HELP patroni_dcs_operation_retries Number of retries of DCS operations.")
+            metrics.append("# TYPE patroni_dcs_operation_retries counter")
+            for operation, value in retries.items():
+                metrics.append('patroni_dcs_operation_retries{0},operation="{1}"}} {2}'
+                               .format(labels[:-1], operation, value))
+            metrics.append("# HELP patroni_dcs_operation_errors Number of failed DCS operations per error class.")
+            metrics.append("# TYPE patroni_dcs_operation_errors counter")
+            for (operation, error), value in errors.items():
+                metrics.append('patroni_dcs_operation_errors{0},operation="{1}",error="{2}"}} {3}'
+                               .format(labels[:-1], operation, error, value))
+            metrics.append("# HELP patroni_dcs_rpcs_saved Number of DCS requests saved by combining writes into "
+                           "a single transaction.")
+            metrics.append("# TYPE patroni_dcs_rpcs_saved counter")
+            metrics.append("patroni_dcs_rpcs_saved{0} {1}".format(labels, operation_stats.rpcs_saved))
+            relists, histograms, sums = operation_stats.watch_snapshot()
+            if relists:
+                metrics.append("# HELP patroni_dcs_watch_relists Number of times a watch cache was reloaded because "
+                               "the watch could not be resumed.")
+                metrics.append("# TYPE patroni_dcs_watch_relists counter")
+                for cache, value in relists.items():
+                    metrics.append('patroni_dcs_watch_relists{0},cache="{1}"}} {2}'.format(labels[:-1], cache, value))
+            if histograms:
+                self._append_histogram(metrics, 'patroni_dcs_watch_lag_seconds', 'Time between a write made by '
+                                       'this node and the moment the watch delivered it.', labels, 'cache',
+                                       operation_stats.BUCKETS, histograms, sums)
+
+        metrics.append("# HELP patroni_restapi_keepalive_idle_connections Number of persistent REST API connections "
+                       "waiting for the next request.")
+        metrics.append("# TYPE patroni_restapi_keepalive_idle_connections gauge")
+        metrics.append("patroni_restapi_keepalive_idle_connections{0} {1}"
+                       .format(labels, self.server.keepalive_idle_connections))
+
+        metrics.append("# HELP patroni_restapi_keepalive_requests Number of REST API requests received on reused "
+                       "persistent connections.")
+        metrics.append("# TYPE patroni_restapi_keepalive_requests counter")
+        metrics.append("patroni_restapi_keepalive_requests{0} {1}".format(labels, self.server.keepalive_requests))
+
+        tls_stats = self.server.tls_session_stats()
+        if tls_stats is not None:
+            for name, key, description in (
+                    ('handshakes', 'accept_good', 'Number of completed TLS handshakes.'),
+                    ('session_hits', 'hits', 'Number of TLS handshakes that resumed a session.')):
+                metrics.append("# HELP patroni_restapi_tls_{0} {1}".format(name, description))
+                metrics.append("# TYPE patroni_restapi_tls_{0} counter".format(name))
+                metrics.append("patroni_restapi_tls_{0}{1} {2}".format(name, labels, tls_stats.get(key, 0)))
+
         self.write_response(200, '\n'.join(metrics) + '\n', content_type='text/plain')
 
+    @staticmethod
+    def _append_histogram(metrics: List[str], name: str, description: str, labels: str, label: str,
+                          buckets: Tuple[float, ...], histograms: Dict[str, List[int]], sums: Dict[str, float]) -> None:
+        """Append a histogram in the Prometheus format to *metrics*.
+
+        :param metrics: list of metric lines to append to.
+        :param name: name of the metric.
+        :param description: help text of the metric.
+        :param labels: common labels of all metrics, i.e. ``{scope="batman",name="postgresql0"}``.
+        :param label: name of the label distinguishing the series.
+        :param buckets: upper bounds of histogram buckets.
+        :param histograms: per series counts of observations in every bucket, not cumulative, the last one is for
+            observations above the largest bucket.
+        :param sums: per series sums of observed values.
+        """
+        metrics.append("# HELP {0} {1}".format(name, description))
+        metrics.append("# TYPE {0} histogram".format(name))
+        for value, counts in histograms.items():
+            series_labels = '{0},{1}="{2}"'.format(labels[:-1], label, value)
+            total = 0
+            for le, count in zip(tuple(map(str, buckets)) + ('+Inf',), counts):
+                total += count
+                metrics.append('{0}_bucket{1},le="{2}"}} {3}'.format(name, series_labels, le, total))
+            metrics.append("{0}_sum{1}}} {2}".format(name, series_labels, sums[value]))
+            metrics.append("{0}_count{1}}} {2}".format(name, series_labels, total))
+
     def _read_json_content(self, body_is_optional: bool = False) -> Optional[Dict[Any, Any]]:
         """Read JSON from HTTP request body.
 
@@ -1329,6 +1560,10 @@ class RestApiHandler(BaseHTTPRequestHandler):
         """
         ret = BaseHTTPRequestHandler.parse_request(self)
         if ret:
+            # Persistent connections are only supported for requests without body, e.g. health checks, otherwise
+            # a handler which doesn't read the body would leave it in the stream.
+            if self.headers.get('Content-Length', '0').strip() not in ('', '0') or 'Transfer-Encoding' in self.headers:
+                self.close_connection = True
             urlpath = urlparse(self.path)
             self.path = urlpath.path
             self.path_query = parse_qs(urlpath.query) or {}
@@ -1351,12 +1586,18 @@ class RestApiHandler(BaseHTTPRequestHandler):
             return self.server.query(sql, *params)
         return Retry(delay=1, retry_exceptions=PostgresConnectionException)(self.server.query, sql, *params)
 
-    def get_postgresql_status(self, retry: bool = False) -> Dict[str, Any]:
+    def get_postgresql_status(self, retry: bool = False, use_snapshot: bool = False) -> Dict[str, Any]:
         """Builds an object representing a status of "postgres".
 
         Some of the values are collected by executing a query and other are taken from the state stored in memory.
 
+        .. note::
+            If *use_snapshot* is ``True`` the query result could be taken from :attr:`RestApiServer.status_snapshot`,
+            which is shared between concurrent requests with the same *retry* and refreshed every
+            ``restapi.status_snapshot_interval``.
+
         :param retry: whether the query should be retried if failed or give up immediately
+        :param use_snapshot: whether the result of the query could be taken from the shared snapshot.
 
         :returns: a dict with the status of Postgres/Patroni. The keys are:
 
@@ -1395,7 +1636,9 @@ class RestApiHandler(BaseHTTPRequestHandler):
             * ``pause``: ``True`` if cluster is in maintenance mode;
             * ``cluster_unlocked``: ``True`` if cluster has no node holding the leader lock;
             * ``failsafe_mode_is_active``: ``True`` if DCS failsafe mode is currently active;
-            * ``dcs_last_seen``: epoch timestamp DCS was last reached by Patroni.
+            * ``dcs_last_seen``: epoch timestamp DCS was last reached by Patroni;
+            * ``status_snapshot_age``: age of the shared snapshot in seconds, only if the snapshot is enabled and
+                *use_snapshot* is ``True``.
 
         """
         postgresql = self.server.patroni.postgresql
@@ -1419,8 +1662,11 @@ class RestApiHandler(BaseHTTPRequestHandler):
                     " FROM pg_catalog.pg_stat_get_wal_senders() w, pg_catalog.pg_stat_get_activity(pid)) AS ri)") +\
                 (" FROM pg_catalog.pg_stat_get_wal_receiver() AS wr" if postgresql.major_version >= 90600 else "")
 
-            row = self.query(stmt.format(postgresql.wal_name, postgresql.lsn_name,
-                                         postgresql.wal_flush), retry=retry)[0]
+            stmt = stmt.format(postgresql.wal_name, postgresql.lsn_name, postgresql.wal_flush)
+            if use_snapshot:
+                row, snapshot_age = self.server.status_snapshot.get(lambda: self.query(stmt, retry=retry)[0], retry)
+            else:
+                row, snapshot_age = self.query(stmt, retry=retry)[0], None
             result = {
                 'state': postgresql.state,
                 'postmaster_start_time': row[0],
@@ -1459,6 +1705,9 @@ class RestApiHandler(BaseHTTPRequestHandler):
             if row[11]:
                 result['replication'] = row[11]
 
+            if snapshot_age is not None and self.server.status_snapshot.interval > 0:
+                result['status_snapshot_age'] = round(snapshot_age, 3)
+
         except (psycopg.Error, RetryFailedError, PostgresConnectionException):
             state = postgresql.state
             if state == PostgresqlState.RUNNING:
@@ -1475,14 +1724,103 @@ class RestApiHandler(BaseHTTPRequestHandler):
         result['dcs_last_seen'] = self.server.patroni.dcs.last_seen
         return result
 
+    def setup(self) -> None:
+        """Prepare the handler for processing requests of a new client connection.
+
+        Switches to ``HTTP/1.1`` if persistent connections are enabled through ``restapi.keepalive_timeout``.
+        """
+        super(RestApiHandler, self).setup()
+        self.requests_served = getattr(self.request, 'requests_served', 0)
+        if self.server.keepalive_timeout > 0:
+            self.protocol_version = 'HTTP/1.1'
+
+    def send_header(self, keyword: str, value: str) -> None:
+        """Send an HTTP header and keep track of whether the ``Connection`` header was already sent.
+
+        :param keyword: header name.
+        :param value: header value.
+        """
+        if keyword.lower() == 'connection':
+            self.__connection_header_sent = True
+        super(RestApiHandler, self).send_header(keyword, value)
+
+    def end_headers(self) -> None:
+        """Send the ``Connection`` and ``Keep-Alive`` headers of a persistent connection and end the headers.
+
+        The connection is closed after ``restapi.keepalive_max_requests`` requests.
+        """
+        if self.protocol_version >= 'HTTP/1.1' and not self.__connection_header_sent:
+            if self.close_connection or self.requests_served >= self.server.keepalive_max_requests:
+                self.send_header('Connection', 'close')
+            else:
+                self.send_header('Connection', 'keep-alive')
+                self.send_header('Keep-Alive', 'timeout={0}, max={1}'.format(
+                    int(self.server.keepalive_timeout), self.server.keepalive_max_requests - self.requests_served))
+        super(RestApiHandler, self).end_headers()
+
+    def handle_expect_100(self) -> bool:
+        """Send the ``100 Continue`` interim response.
+
+        Unlike the final response it must not carry the ``Connection`` and ``Keep-Alive`` headers.
+
+        :returns: ``True``, the request is processed further.
+        """
+        self.send_response_only(100)
+        super(RestApiHandler, self).end_headers()
+        return True
+
+    def handle(self) -> None:
+        """Handle requests of a client connection.
+
+        .. note::
+            While waiting for the next request on a persistent connection the handler occupies a thread of the REST API
+            thread pool, therefore the number of such idle connections is limited by
+            ``restapi.keepalive_max_idle_connections``. Requests received by the ``asyncio`` server are processed
+            one by one, waiting for the next request is done by the event loop.
+        """
+        self.close_connection = True
+        self.handle_one_request()
+        if isinstance(self.request, BufferedRequest):
+            self.request.keep_alive = not self.close_connection
+            return
+        while not self.close_connection and self.__wait_for_next_request():
+            self.handle_one_request()
+
+    def __wait_for_next_request(self) -> bool:
+        """Wait until the next request arrives on a persistent connection.
+
+        :returns: ``True`` if there is data to read, ``False`` if the client closed the connection, it was idle for
+            longer than ``restapi.keepalive_timeout``, or there are already too many idle connections.
+        """
+        if not self.server.acquire_idle_connection():
+            return False
+        timeout = self.connection.gettimeout()
+        try:
+            self.connection.settimeout(self.server.keepalive_timeout)
+            return bool(self.rfile.peek(1))  # pyright: ignore [reportAttributeAccessIssue]
+        except OSError:
+            return False
+        finally:
+            self.server.release_idle_connection()
+            self.connection.settimeout(timeout)
+
     def handle_one_request(self) -> None:
         """Parse and dispatch a request to the appropriate ``do_*`` method.
 
         .. note::
-            This is only used to keep track of latency when logging messages through :func:`log_message`.
+            This is used to keep track of latency when logging messages through :func:`log_message`, and to respond
+            with HTTP status ``503`` when no connection to Postgres could be checked out from the ``restapi`` pool.
         """
         self.__start_time = time.time()
-        BaseHTTPRequestHandler.handle_one_request(self)
+        self.__connection_header_sent = False
+        self.requests_served += 1
+        if self.requests_served > 1:
+            self.server.keepalive_requests += 1
+        try:
+            BaseHTTPRequestHandler.handle_one_request(self)
+        except ConnectionPoolExhausted as e:
+            logger.warning('Failed to process %s %s: %s', self.command, self.path, e.value)
+            self.send_error(503, e.value)
 
     def log_message(self, format: str, *args: Any) -> None:
         """Log a custom ``debug`` message.
@@ -1496,10 +1834,421 @@ class RestApiHandler(BaseHTTPRequestHandler):
         logger.debug("API thread: %s - - %s latency: %0.3f ms", self.client_address[0], format % args, latency)
 
 
+class BufferedRequest(object):
+    """In-memory replacement of a client socket, used to process requests received by the ``asyncio`` server.
+
+    :class:`RestApiHandler` reads the request from and writes the response to this object as it would do with a
+    socket, while all network I/O, including TLS, is performed by the event loop.
+
+    :ivar response: bytes written by the request handler.
+    :ivar requests_served: number of requests that were already served on the same client connection.
+    :ivar keep_alive: whether the client connection should be kept open after sending the response.
+    :ivar family: address family of the client connection.
+    """
+
+    def __init__(self, data: bytes, peercert: Optional[Dict[str, Any]], requests_served: int = 0,
+                 family: int = socket.AF_INET) -> None:
+        """Create a :class:`BufferedRequest` instance.
+
+        :param data: the raw HTTP request, including the body.
+        :param peercert: validated client certificate, if any.
+        :param requests_served: number of requests that were already served on the same client connection.
+        :param family: address family of the client connection.
+        """
+        self._data = data
+        self._peercert = peercert
+        self.response = bytearray()
+        self.requests_served = requests_served
+        self.keep_alive = False
+        self.family = family
+
+    def makefile(self, *args: Any, **kwargs: Any) -> BytesIO:
+        """Get a file object to read the request from.
+
+        :returns: a file object with the raw HTTP request.
+        """
+        return BytesIO(self._data)
+
+    def sendall(self, data: bytes) -> None:
+        """Collect *data* written by the request handler.
+
+        :param data: a part of the response.
+        """
+        self.response += data
+
+    def getpeercert(self) -> Optional[Dict[str, Any]]:
+        """Get the client certificate.
+
+        :returns: the certificate that was validated by the TLS layer, or ``None``.
+        """
+        return self._peercert
+
+
+class ClusterEvents(object):
+    """Versioned state of the cluster topology as seen by this node, streamed by the ``/events`` endpoint.
+
+    The state is updated after every HA cycle from the cached :class:`~patroni.dcs.Cluster` object and the role of the
+    local Postgres, so clients waiting for changes don't cause any DCS or Postgres queries. While nobody is waiting the
+    update only remembers its arguments, and the state is built from them by the next :meth:`wait`.
+
+    :ivar version: opaque token identifying the current state, it changes every time the state changes.
+    :ivar closed: set when the REST API is shutting down, all waiting clients are woken up.
+    """
+
+    _VOLATILE_MEMBER_KEYS = ('lsn', 'receive_lsn', 'replay_lsn', 'lag', 'receive_lag', 'replay_lag')
+
+    def __init__(self) -> None:
+        """Create a :class:`ClusterEvents` instance."""
+        self._cond = Condition()
+        self._epoch = '{0:x}'.format(int(time.time()))
+        self._counter = 0
+        self._state: Optional[Dict[str, Any]] = None
+        self._source: Optional[Tuple[Optional[Cluster], str]] = None  # arguments of the last update not applied yet
+        self._waiters = 0
+        self.version = self._epoch + '-0'
+        self.closed = False
+
+    @classmethod
+    def cluster_state(cls, cluster: Optional[Cluster], role: str) -> Dict[str, Any]:
+        """Build the topology relevant part of *cluster*.
+
+        :param cluster: the cached cluster view, ``None`` if DCS is not accessible.
+        :param role: role of the local Postgres.
+
+        :returns: the same as :func:`~patroni.utils.cluster_as_json`, but without WAL positions and lags of members,
+            that change all the time, and with the role of the local Postgres and the ``failover`` key.
+        """
+        state = cluster_as_json(cluster) if cluster else {'members': []}
+        for member in state['members']:
+            for key in cls._VOLATILE_MEMBER_KEYS:
+                member.pop(key, None)
+        if cluster and cluster.failover:
+            state['failover'] = {k: v for k, v in (('leader', cluster.failover.leader),
+                                                   ('candidate', cluster.failover.candidate)) if v}
+        state['role'] = role
+        return state
+
+    def update(self, cluster: Optional[Cluster], role: str) -> bool:
+        """Update the state and wake up waiting clients if it changed.
+
+        :param cluster: the cached cluster view, ``None`` if DCS is not accessible.
+        :param role: role of the local Postgres.
+
+        :returns: ``True`` if the state has changed, ``False`` if it didn't or if nobody is waiting for changes.
+        """
+        with self._cond:
+            self._source = (cluster, role)
+            return self._waiters > 0 and self._apply()
+
+    def _apply(self) -> bool:
+        """Build the state from arguments of the last :meth:`update` and bump the version if it changed.
+
+        .. note::
+            Must be called only when holding the lock on ``_cond``.
+
+        :returns: ``True`` if the state has changed.
+        """
+        if self._source is None:
+            return False
+        state = self.cluster_state(*self._source)
+        self._source = None
+        if state == self._state:
+            return False
+        self._state = state
+        self._counter += 1
+        self.version = '{0}-{1}'.format(self._epoch, self._counter)
+        self._cond.notify_all()
+        return True
+
+    def wait(self, version: Optional[str], timeout: float) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Wait until the state is different from the one identified by *version*.
+
+        :param version: token of the state the client already knows, ``None`` if the client doesn't know any.
+        :param timeout: how long to wait, in seconds.
+
+        :returns: the new version token and state, or ``None`` if nothing changed within *timeout*.
+        """
+        with self._cond:
+            self._apply()
+            self._waiters += 1
+            try:
+                self._cond.wait_for(lambda: self.closed or self._state is not None and self.version != version,
+                                    timeout)
+            finally:
+                self._waiters -= 1
+            if self.closed or self._state is None or self.version == version:
+                return None
+            return self.version, self._state
+
+    def close(self) -> None:
+        """Wake up all clients waiting for changes, used on shutdown."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class StatusSnapshot(object):
+    """Short-lived snapshot of the result of the query executed by :func:`RestApiHandler.get_postgresql_status`.
+
+    Health-check endpoints may be called by many load-balancers and monitoring systems at the same time. Instead of
+    executing the same query for every request, the result is kept for *interval* seconds and shared by all callers.
+    When the snapshot is too old only one caller executes the query, while others are waiting for its result.
+
+    Callers executing the query differently (e.g. with or without retries) pass different keys, and a separate
+    snapshot is kept for every key.
+    """
+
+    def __init__(self, interval: float = 0) -> None:
+        """Create a :class:`StatusSnapshot` instance.
+
+        :param interval: for how long (in seconds) the snapshot could be reused. ``0`` disables the snapshot.
+        """
+        self.interval = interval
+        self._cond = Condition()
+        self._refreshing: Set[Any] = set()  # keys of snapshots being refreshed
+        self._values: Dict[Any, Tuple[Tuple[Any, ...], float]] = {}  # key -> (row, time when it was taken)
+
+    def get(self, func: Callable[[], Tuple[Any, ...]], key: Any = None) -> Tuple[Tuple[Any, ...], float]:
+        """Get the snapshot, or refresh it by calling *func* if it is older than :attr:`interval`.
+
+        .. note::
+            If a refresh executed by another thread fails, we try to refresh the snapshot on our own.
+
+        :param func: a function that executes the query and returns the resulting row.
+        :param key: identifies how *func* executes the query, only results of the same *key* are shared.
+
+        :returns: a tuple with the row and the age of the snapshot in seconds.
+        """
+        if self.interval <= 0:
+            return func(), 0.0
+
+        with self._cond:
+            while True:
+                if key in self._values:
+                    value, taken_at = self._values[key]
+                    age = time.time() - taken_at
+                    if 0 <= age < self.interval:
+                        return value, age
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    break
+                self._cond.wait(self.interval)
+
+        value = None
+        try:
+            value = func()
+            return value, 0.0
+        finally:
+            with self._cond:
+                if value is not None:
+                    self._values[key] = (value, time.time())
+                self._refreshing.discard(key)
+                self._cond.notify_all()
+
+
+class MembersIPsCache(object):
+    """Cache of IP addresses that cluster members' ``api_url`` resolve to.
+
+    Used to implement ``restapi.allowlist_include_members`` without calling :func:`socket.getaddrinfo` for every
+    member on every request.
+
+    The set of resolved addresses is rebuilt only when the list of members ``api_url`` changes, or when one of the
+    resolved hosts was refreshed. Each host is resolved independently and kept for *ttl* seconds (or for
+    :attr:`NEGATIVE_TTL` seconds if resolution failed). Expired entries keep being served while they are being
+    re-resolved in the background by the global thread pool, so only hosts that were never seen before are
+    resolved synchronously.
+
+    :cvar NEGATIVE_TTL: for how long (in seconds) a failure to resolve a host is remembered.
+    """
+
+    NEGATIVE_TTL = 10
+
+    def __init__(self, ttl: int = 60) -> None:
+        """Create a :class:`MembersIPsCache` instance.
+
+        :param ttl: for how long (in seconds) successfully resolved addresses should be kept.
+        """
+        self.ttl = ttl
+        self._lock = Lock()
+        self._api_urls: Optional[Tuple[str, ...]] = None
+        self._hosts: Set[Tuple[str, int]] = set()
+        # (host, port) -> (expiration time, resolved addresses)
+        self._entries: Dict[Tuple[str, int], Tuple[float, FrozenSet[Union[IPv4Address, IPv6Address]]]] = {}
+        self._refreshing: Set[Tuple[str, int]] = set()
+        self._ips: Optional[FrozenSet[Union[IPv4Address, IPv6Address]]] = None
+        self.hits = self.misses = self.refreshes = 0
+
+    @staticmethod
+    def _resolve(host: str, port: int) -> FrozenSet[Union[IPv4Address, IPv6Address]]:
+        """Resolve *host* + *port* to IP addresses.
+
+        :param host: hostname to be resolved.
+        :param port: port to be resolved.
+
+        :returns: set of IP addresses, empty if *host* could not be resolved.
+        """
+        try:
+            return frozenset(ip_address(sa[0]) for _, _, _, _, sa in
+                             socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM, socket.IPPROTO_TCP))
+        except Exception as e:
+            logger.error('Failed to resolve %s: %r', host, e)
+            return frozenset()
+
+    @staticmethod
+    def _members_hosts(api_urls: Tuple[str, ...]) -> Set[Tuple[str, int]]:
+        """Extract host and port from each member ``api_url``.
+
+        :param api_urls: ``api_url`` values of cluster members.
+
+        :returns: set of tuples with hostname and port.
+        """
+        ret: Set[Tuple[str, int]] = set()
+        for api_url in api_urls:
+            try:
+                r = urlparse(api_url)
+                if r.hostname:
+                    ret.add((r.hostname, r.port or (443 if r.scheme == 'https' else 80)))
+            except Exception as e:
+                logger.debug('Failed to parse url %s: %r', api_url, e)
+        return ret
+
+    def _store(self, host: Tuple[str, int], ips: FrozenSet[Union[IPv4Address, IPv6Address]]) -> None:
+        """Remember resolved *ips* of *host*.
+
+        .. note::
+            Results for hosts that in the meantime stopped being members of the cluster are discarded.
+
+        :param host: a tuple with hostname and port.
+        :param ips: addresses *host* resolves to, empty set if resolution failed.
+        """
+        expires = time.time() + (self.ttl if ips else min(self.ttl, self.NEGATIVE_TTL))
+        with self._lock:
+            self._refreshing.discard(host)
+            if host in self._hosts:
+                if host not in self._entries or self._entries[host][1] != ips:
+                    self._ips = None
+                self._entries[host] = (expires, ips)
+
+    def _refresh(self, host: Tuple[str, int]) -> None:
+        """Resolve *host* again and update the cache. Executed in the background.
+
+        :param host: a tuple with hostname and port.
+        """
+        self._store(host, self._resolve(*host))
+
+    def get(self, cluster: Cluster) -> FrozenSet[Union[IPv4Address, IPv6Address]]:
+        """Get IP addresses of all members of the *cluster* and its MPP workers.
+
+        :param cluster: the currently known cluster state.
+
+        :returns: set of IP addresses members ``api_url`` resolve to.
+        """
+        api_urls = tuple(m.api_url for c in [cluster] + list(cluster.workers.values()) for m in c.members if m.api_url)
+        now = time.time()
+        with self._lock:
+            if self._api_urls != api_urls:
+                self._api_urls = api_urls
+                self._hosts = self._members_hosts(api_urls)
+                # evict entries of members that left the cluster
+                for host in [h for h in self._entries if h not in self._hosts]:
+                    del self._entries[host]
+                self._ips = None
+            missing = [h for h in self._hosts if h not in self._entries]
+            expired = [h for h, (expires, _) in self._entries.items() if expires < now and h not in self._refreshing]
+            self._refreshing.update(expired)
+            self.refreshes += len(expired)
+            if missing:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        for host in expired:
+            try:
+                thread_pool.get_executor().submit(self._refresh, host)
+            except Exception as e:
+                logger.debug('Failed to schedule refresh of %s: %r', host[0], e)
+                self._refresh(host)
+
+        for host in missing:
+            self._store(host, self._resolve(*host))
+
+        with self._lock:
+            if self._ips is None:
+                self._ips = frozenset(ip for _, ips in self._entries.values() for ip in ips)
+            return self._ips
+
+
+def is_unix_socket(request: Any) -> bool:
+    """Check whether *request* was received on a Unix domain socket.
+
+    :param request: socket or :class:`BufferedRequest` of the client connection.
+
+    :returns: ``True`` if *request* is a Unix domain socket connection.
+    """
+    family = getattr(request, 'family', None)
+    return family is not None and family == getattr(socket, 'AF_UNIX', None)
+
+
+class RestApiUnixServer(TCPServer):
+    """Accept REST API connections on a Unix domain socket.
+
+    Accepted connections are handed over to :class:`RestApiServer`, so they are served by the same thread pool and
+    request handlers as connections to ``restapi.listen``.
+    """
+
+    def __init__(self, server: 'RestApiServer', path: str, mode: Optional[int]) -> None:
+        """Create a :class:`RestApiUnixServer` instance and start listening on *path*.
+
+        :param server: the REST API server which processes accepted connections.
+        :param path: path of the Unix domain socket, the value of ``restapi.unix_socket`` setting.
+        :param mode: permissions of the socket file, the value of ``restapi.unix_socket_mode`` setting. If not set,
+            permissions are based on the current umask.
+        """
+        self.rest_api_server = server
+        self.address_family = socket.AF_UNIX
+        try:  # remove the socket file left by a previous run
+            if stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path)
+        except OSError:
+            pass
+        super(RestApiUnixServer, self).__init__(path, RestApiHandler, bind_and_activate=False)
+        try:
+            self.server_bind()
+            if mode is not None:
+                os.chmod(path, mode)
+            self.server_activate()
+        except Exception:
+            logger.error("Couldn't start a service on '%s', please check your `restapi.unix_socket` configuration",
+                         path)
+            self.server_close()
+            raise
+
+    def process_request(self, request: Union[socket.socket, Tuple[bytes, socket.socket]],
+                        client_address: Any) -> None:
+        """Pass the accepted connection to :class:`RestApiServer`.
+
+        :param request: socket of the client connection.
+        :param client_address: ignored, clients of a Unix domain socket are usually unnamed. The socket path is
+            used instead.
+        """
+        self.rest_api_server.process_request(request, (self.server_address, 0))
+
+    def server_close(self) -> None:
+        """Stop listening and remove the socket file."""
+        super(RestApiUnixServer, self).server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
 class RestApiServer(ThreadingMixIn, HTTPServer):
     """Patroni REST API server.
 
-    An asynchronous thread-pool-based HTTP server.
+    An asynchronous thread-pool-based HTTP server. Depending on ``restapi.server_mode``, client connections are either
+    accepted and served by threads of the pool (``threaded``), or by an :mod:`asyncio` event loop that only hands
+    complete requests over to the pool (``asyncio``). Besides ``restapi.listen``, the server may also listen on a
+    Unix domain socket configured through ``restapi.unix_socket``.
     """
 
     def __init__(self, patroni: Patroni, config: Dict[str, Any]) -> None:
@@ -1514,6 +2263,9 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
         self.__auth_key = None
         self.__allowlist_include_members: Optional[bool] = None
         self.__allowlist: Tuple[Union[IPv4Network, IPv6Network], ...] = ()
+        self.members_ips_cache = MembersIPsCache()
+        self.status_snapshot = StatusSnapshot()
+        self.cluster_events = ClusterEvents()
         self.http_extra_headers: Dict[str, str] = {}
         self.patroni = patroni
         self.__listen = None
@@ -1526,8 +2278,25 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
         logger.info('REST API thread_pool_size = %d', thread_pool_size)
         self._executor = PatroniThreadPoolExecutor(max_workers=thread_pool_size + 1, thread_name_prefix='RestAPI')
         self.__ssl_options: Dict[str, Any] = {}
+        self.__ssl_context: Any = None
         self.__ssl_serial_number = None
         self._received_new_cert = False
+        self.__server_mode = None
+        self.__asyncio_shutdown_request = False
+        self.__asyncio_is_shut_down = Event()
+        self.__asyncio_is_shut_down.set()  # the event loop isn't running
+        self.__thread_pool_size = thread_pool_size
+        self.__unix_socket: Optional[Tuple[str, Optional[int]]] = None
+        self.__unix_server: Optional[RestApiUnixServer] = None
+        self.__unix_thread: Optional[Thread] = None
+        self.keepalive_timeout = 0.0
+        self.keepalive_max_requests = 100
+        self.keepalive_max_idle_connections = 0
+        self.keepalive_idle_connections = 0
+        self.keepalive_requests = 0
+        self.__keepalive_lock = Lock()
+        self.event_streams = 0
+        self.max_event_streams = max(1, thread_pool_size // 2)
         self.reload_config(config)
         self.daemon = True
 
@@ -1562,7 +2331,8 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
         """Execute *sql* query with *params* and optionally return results.
 
         .. note::
-            Prefer to use own connection to postgres and fallback to ``heartbeat`` when own isn't available.
+            Prefer to use own connection to postgres, checked out from the ``restapi`` connection pool, and fallback
+            to ``heartbeat`` when own isn't available.
 
         :param sql: the SQL statement to be run.
         :param params: positional arguments to be used as parameters for *sql*.
@@ -1572,6 +2342,7 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
         :raises:
             :class:`psycopg.Error`: if had issues while executing *sql*.
             :class:`~patroni.exceptions.PostgresConnectionException`: if had issues while connecting to the database.
+            :class:`~patroni.postgresql.connection.ConnectionPoolExhausted`: if all ``restapi`` connections are busy.
         """
         # We first try to get a heartbeat connection because it is always required for the main thread.
         try:
@@ -1580,14 +2351,14 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
         except psycopg.Error as exc:
             raise PostgresConnectionException('connection problems') from exc
 
-        try:
-            connection = self.patroni.postgresql.connection_pool.get('restapi')
-            connection.get()  # try to open psycopg connection to postgres
-        except psycopg.Error:
-            logger.debug('restapi connection to postgres is not available')
-            connection = heartbeat_connection
+        with self.patroni.postgresql.connection_pool.get_pool('restapi').checkout() as connection:
+            try:
+                connection.get()  # try to open psycopg connection to postgres
+            except psycopg.Error:
+                logger.debug('restapi connection to postgres is not available')
+                connection = heartbeat_connection
 
-        return connection.query(sql, *params)
+            return connection.query(sql, *params)
 
     @staticmethod
     def _set_fd_cloexec(fd: socket.socket) -> None:
@@ -1645,28 +2416,6 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
         except Exception as e:
             logger.error('Failed to resolve %s: %r', host, e)
 
-    def __members_ips(self) -> Iterator[Union[IPv4Network, IPv6Network]]:
-        """Resolve each Patroni node ``restapi.connect_address`` to IP networks.
-
-        .. note::
-            Only yields object if ``restapi.allowlist_include_members`` setting is enabled.
-
-        :yields: each node ``restapi.connect_address`` resolved to an IP network.
-        """
-        cluster = self.patroni.dcs.cluster
-        if self.__allowlist_include_members and cluster:
-            for cluster in [cluster] + list(cluster.workers.values()):
-                for member in cluster.members:
-                    if member.api_url:
-                        try:
-                            r = urlparse(member.api_url)
-                            if r.hostname:
-                                port = r.port or (443 if r.scheme == 'https' else 80)
-                                for ip in self.__resolve_ips(r.hostname, port):
-                                    yield ip
-                        except Exception as e:
-                            logger.debug('Failed to parse url %s: %r', member.api_url, e)
-
     def check_access(self, rh: RestApiHandler, allowlist_check_members: bool = True) -> Optional[bool]:
         """Ensure client has enough privileges to perform a given request.
 
@@ -1679,21 +2428,29 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
                 * ``restapi.allowlist_include_members`` is enabled, but client IP is not in the members list; or
                 * a client certificate is expected by the server, but is missing in the request.
 
+        .. note::
+            ``restapi.allowlist``, ``restapi.allowlist_include_members`` and client certificates are not checked for
+            connections to ``restapi.unix_socket``.
+
         :param rh: the request which access should be checked.
         :param allowlist_check_members: whether we should check the source ip against existing cluster members.
 
         :returns: ``True`` if client access verification succeeded, otherwise ``None``.
         """
+        # Access to the Unix domain socket is controlled by permissions of the socket file,
+        # there is no client IP address to check and no TLS.
+        local = is_unix_socket(rh.request)
         allowlist_check_members = allowlist_check_members and bool(self.__allowlist_include_members)
-        if self.__allowlist or allowlist_check_members:
+        if not local and (self.__allowlist or allowlist_check_members):
             incoming_ip = ip_address(rh.client_address[0])
 
-            members_ips = tuple(self.__members_ips()) if allowlist_check_members else ()
-
-            if not any(incoming_ip in net for net in self.__allowlist + members_ips):
+            cluster = self.patroni.dcs.cluster
+            if not (any(incoming_ip in net for net in self.__allowlist)
+                    or allowlist_check_members and cluster and incoming_ip in self.members_ips_cache.get(cluster)):
                 return rh.write_response(403, 'Access is denied')
 
-        if not hasattr(rh.request, 'getpeercert') or not rh.request.getpeercert():  # valid client cert isn't present
+        if not local and (not hasattr(rh.request, 'getpeercert')
+                          or not rh.request.getpeercert()):  # valid client cert isn't present
             if self.__protocol == 'https' and self.__ssl_options.get('verify_client') in ('required', 'optional'):
                 return rh.write_response(403, 'client certificate required')
 
@@ -1751,7 +2508,8 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
                 "Couldn't start a service on '%s:%s', please check your `restapi.listen` configuration", hostname, port)
             raise
 
-    def __initialize(self, listen: str, ssl_options: Dict[str, Any]) -> None:
+    def __initialize(self, listen: str, ssl_options: Dict[str, Any], server_mode: str,
+                     unix_socket: Optional[Tuple[str, Optional[int]]]) -> None:
         """Configure and start REST API HTTP server.
 
         .. note::
@@ -1774,6 +2532,10 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
                 * ``optional``: check client certificate only for unsafe REST API endpoints;
                 * ``required``: check client certificate for all REST API endpoints.
 
+        :param server_mode: value of ``restapi.server_mode`` setting, either ``threaded`` or ``asyncio``.
+        :param unix_socket: values of ``restapi.unix_socket`` and ``restapi.unix_socket_mode`` settings, if the REST
+            API should also listen on a Unix domain socket.
+
         :raises:
             :class:`ValueError`: if any issue is faced while parsing *listen*.
         """
@@ -1785,16 +2547,22 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
 
         reloading_config = self.__listen is not None  # changing config in runtime
         if reloading_config:
-            HTTPServer.shutdown(self)
+            self.__stop_serving()
             # Rely on TCPServer.server_close() to have all requests terminate before we continue
             self.server_close()
 
         self.__listen = listen
         self.__ssl_options = ssl_options
+        self.__server_mode = server_mode
+        self.__unix_socket = unix_socket
+        self.__ssl_context = None
         self._received_new_cert = False  # reset to False after reload_config()
 
         self.__httpserver_init(host, port)
         self._set_fd_cloexec(self.socket)
+        if unix_socket:
+            self.__unix_server = RestApiUnixServer(self, *unix_socket)
+            self._set_fd_cloexec(self.__unix_server.socket)
 
         # wrap socket with ssl if 'certfile' is defined in a config.yaml
         # Sometime it's also needed to pass reference to a 'keyfile'.
@@ -1814,12 +2582,215 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
                 else:
                     logger.error('Bad value in the "restapi.verify_client": %s', verify_client)
             self.__ssl_serial_number = self.get_certificate_serial_number()
-            self.socket = ctx.wrap_socket(self.socket, server_side=True, do_handshake_on_connect=False)
+            self.__ssl_context = ctx
+            if server_mode != 'asyncio':  # otherwise TLS handshakes are performed by the event loop
+                self.socket = ctx.wrap_socket(self.socket, server_side=True, do_handshake_on_connect=False)
         if reloading_config:
             self.start()
 
     def start(self) -> None:
-        self._executor.submit(self.serve_forever)
+        """Start serving requests in a thread of the REST API thread pool.
+
+        .. note::
+            In the ``threaded`` mode connections to ``restapi.unix_socket`` are accepted by a separate thread.
+        """
+        if self.__server_mode == 'asyncio':
+            # reset the state before the loop is started, so that a shutdown requested right away waits for it
+            self.__asyncio_shutdown_request = False
+            self.__asyncio_is_shut_down.clear()
+            self._executor.submit(self.serve_asyncio)
+        else:
+            self._executor.submit(self.serve_forever)
+            if self.__unix_server:
+                self.__unix_thread = Thread(target=self.__unix_server.serve_forever, name='RestAPIUnixSocket')
+                self.__unix_thread.daemon = True
+                self.__unix_thread.start()
+
+    def __stop_serving(self) -> None:
+        """Stop the loop started by :func:`start` and wait until it is finished."""
+        if self.__server_mode == 'asyncio':
+            if not self.__asyncio_is_shut_down.is_set():  # the loop could have already exited because of an error
+                self.__asyncio_shutdown_request = True
+                self.__asyncio_is_shut_down.wait()
+        else:
+            HTTPServer.shutdown(self)
+            if self.__unix_server and self.__unix_thread:
+                self.__unix_server.shutdown()
+                self.__unix_thread = None
+
+    def server_close(self) -> None:
+        """Stop listening on ``restapi.listen`` and ``restapi.unix_socket``."""
+        super(RestApiServer, self).server_close()
+        if self.__unix_server:
+            self.__unix_server.server_close()
+            self.__unix_server = None
+
+    @staticmethod
+    def _content_length(head: bytes) -> int:
+        """Get value of the ``Content-Length`` header.
+
+        :param head: the request line and headers of an HTTP request.
+
+        :returns: the length of the request body, ``0`` if the header is missing.
+
+        :raises:
+            :exc:`ValueError`: if the value is not a valid number.
+        """
+        for line in head.split(b'\r\n')[1:]:
+            name, _, value = line.partition(b':')
+            if name.strip().lower() == b'content-length':
+                return int(value.strip())
+        return 0
+
+    def acquire_idle_connection(self) -> bool:
+        """Register a persistent connection that starts waiting for the next request.
+
+        :returns: ``True`` if the number of idle connections is below ``restapi.keepalive_max_idle_connections``,
+            ``False`` if the connection should be closed instead.
+        """
+        with self.__keepalive_lock:
+            if self.keepalive_idle_connections >= self.keepalive_max_idle_connections:
+                return False
+            self.keepalive_idle_connections += 1
+            return True
+
+    def release_idle_connection(self) -> None:
+        """Unregister a persistent connection that stopped waiting for the next request."""
+        with self.__keepalive_lock:
+            self.keepalive_idle_connections -= 1
+
+    def acquire_event_stream(self) -> bool:
+        """Register a client waiting for cluster events.
+
+        :returns: ``True`` if the number of such clients is below the limit, which is half of
+            ``restapi.thread_pool_size``, so that waiting clients don't starve other REST API requests.
+        """
+        with self.__keepalive_lock:
+            if self.event_streams >= self.max_event_streams:
+                return False
+            self.event_streams += 1
+            return True
+
+    def release_event_stream(self) -> None:
+        """Unregister a client waiting for cluster events."""
+        with self.__keepalive_lock:
+            self.event_streams -= 1
+
+    def tls_session_stats(self) -> Optional[Dict[str, int]]:
+        """Get statistics of the TLS session cache of the REST API server.
+
+        :returns: the result of :func:`ssl.SSLContext.session_stats` if the REST API is served over HTTPS.
+        """
+        return self.__ssl_context.session_stats() if self.__ssl_context else None
+
+    def process_buffered_request(self, data: bytes, client_address: Tuple[str, int],
+                                 peercert: Optional[Dict[str, Any]], requests_served: int = 0,
+                                 family: int = socket.AF_INET) -> Tuple[bytes, bool]:
+        """Process a request received by the ``asyncio`` server.
+
+        Executed in a thread of the REST API thread pool, so request handlers may block as usual.
+
+        :param data: the raw HTTP request, including the body.
+        :param client_address: tuple containing the client IP and port.
+        :param peercert: validated client certificate, if any.
+        :param requests_served: number of requests that were already served on the same client connection.
+        :param family: address family of the client connection.
+
+        :returns: the raw HTTP response and whether the client connection should be kept open.
+        """
+        request = BufferedRequest(data, peercert, requests_served, family)
+        try:
+            self.finish_request(cast(socket.socket, request), client_address)
+        except Exception:
+            self.handle_error(cast(socket.socket, request), client_address)
+        return bytes(request.response), request.keep_alive
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read a request from the client connection, process it, and write back the response.
+
+        :param reader: the stream to read the request from.
+        :param writer: the stream to write the response to.
+        """
+        client_address = writer.get_extra_info('peername') or ('', 0)
+        sock = writer.get_extra_info('socket')
+        family = sock.family if sock is not None else socket.AF_INET
+        if is_unix_socket(sock):
+            client_address = (writer.get_extra_info('sockname'), 0)
+        elif sock is not None:
+            try:
+                enable_keepalive(sock, 10, 3)
+            except Exception as e:
+                logger.debug('Failed to enable keepalive on connection from %s: %r', client_address[0], e)
+        try:
+            requests_served = 0
+            while True:
+                if requests_served:  # persistent connection, wait for the next request
+                    if not self.acquire_idle_connection():
+                        break
+                    try:
+                        head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.keepalive_timeout)
+                    finally:
+                        self.release_idle_connection()
+                else:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                length = self._content_length(head)
+                body = await reader.readexactly(length) if length else b''
+                response, keep_alive = await asyncio.get_event_loop().run_in_executor(
+                    self._executor, self.process_buffered_request, head + body,
+                    client_address, writer.get_extra_info('peercert'), requests_served, family)
+                writer.write(response)
+                await writer.drain()
+                requests_served += 1
+                if not keep_alive:
+                    break
+        except asyncio.TimeoutError:
+            logger.debug('Closing idle connection from %s:%s', client_address[0], client_address[1])
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError, OSError) as e:
+            logger.debug('Connection from %s:%s was reset: %r', client_address[0], client_address[1], e)
+        finally:
+            writer.close()
+
+    async def _wait_for_shutdown_request(self, poll_interval: float = 0.5) -> None:
+        """Wait until :func:`shutdown` is called.
+
+        :param poll_interval: how often the shutdown request is checked, the same as in
+            :func:`~socketserver.BaseServer.serve_forever`.
+        """
+        while not self.__asyncio_shutdown_request:
+            await asyncio.sleep(poll_interval)
+
+    def serve_asyncio(self) -> None:
+        """Handle requests with an :mod:`asyncio` event loop until :func:`shutdown` is called.
+
+        .. note::
+            Unlike with :func:`~socketserver.BaseServer.serve_forever`, reading requests, writing responses and TLS
+            handshakes don't occupy threads of the REST API thread pool. Only request handlers are executed there.
+        """
+        self.__asyncio_is_shut_down.clear()
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            servers = [loop.run_until_complete(asyncio.start_server(self._handle_connection, sock=self.socket,
+                                                                    ssl=self.__ssl_context,
+                                                                    backlog=self.request_queue_size))]
+            if self.__unix_server:
+                servers.append(loop.run_until_complete(asyncio.start_unix_server(
+                    self._handle_connection, sock=self.__unix_server.socket, backlog=self.request_queue_size)))
+            loop.run_until_complete(self._wait_for_shutdown_request())
+            for server in servers:
+                server.close()
+            all_tasks = getattr(asyncio, 'all_tasks', None) or getattr(asyncio.Task, 'all_tasks')
+            tasks = list(all_tasks(loop))
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        except Exception:
+            logger.exception('Failed to serve REST API requests')
+        finally:
+            self.__asyncio_shutdown_request = False
+            asyncio.set_event_loop(None)
+            loop.close()
+            self.__asyncio_is_shut_down.set()
 
     def process_request_thread(self, request: Union[socket.socket, Tuple[bytes, socket.socket]],
                                client_address: Tuple[str, int]) -> None:
@@ -1833,7 +2804,7 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
         :param request: socket to handle the client request.
         :param client_address: tuple containing the client IP and port.
         """
-        if isinstance(request, socket.socket):
+        if isinstance(request, socket.socket) and not is_unix_socket(request):
             enable_keepalive(request, 10, 3)
         if hasattr(request, 'context'):  # SSLSocket
             from ssl import SSLSocket
@@ -1877,7 +2848,9 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
             logger.debug('Connection from %s:%s was reset: %r', client_address[0], client_address[1], e)
 
     def shutdown(self) -> None:
-        super(RestApiServer, self).shutdown()
+        """Stop serving requests and shut down the REST API thread pool."""
+        self.cluster_events.close()
+        self.__stop_serving()
         self._executor.shutdown(wait=True)
 
     def shutdown_request(self, request: Union[socket.socket, Tuple[bytes, socket.socket]]) -> None:
@@ -1957,6 +2930,13 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
 
         self.__allowlist = tuple(self._build_allowlist(config.get('allowlist')))
         self.__allowlist_include_members = config.get('allowlist_include_members')
+        members_cache_ttl = parse_int(config.get('allowlist_members_cache_ttl', 60), 's')
+        self.members_ips_cache.ttl = 60 if members_cache_ttl is None else members_cache_ttl
+        self.status_snapshot.interval = (parse_int(config.get('status_snapshot_interval', 0), 'ms') or 0) / 1000.0
+        self.patroni.postgresql.connection_pool.get_pool('restapi').configure(
+            parse_int(config.get('connection_pool_size', 1)) or 1,
+            parse_int(config.get('connection_pool_timeout', 5), 's') or 0,
+            parse_int(config.get('connection_pool_idle_timeout', 300), 's') or 0)
 
         ssl_options = {n: config[n] for n in ('certfile', 'keyfile', 'keyfile_password',
                                               'cafile', 'ciphers') if n in config}
@@ -1967,8 +2947,19 @@ class RestApiServer(ThreadingMixIn, HTTPServer):
         if isinstance(config.get('verify_client'), str):
             ssl_options['verify_client'] = config['verify_client'].lower()
 
-        if self.__listen != config['listen'] or self.__ssl_options != ssl_options or self._received_new_cert:
-            self.__initialize(config['listen'], ssl_options)
+        self.keepalive_timeout = parse_int(config.get('keepalive_timeout', 0), 's') or 0
+        self.keepalive_max_requests = parse_int(config.get('keepalive_max_requests', 100)) or 100
+        max_idle_connections = parse_int(config.get('keepalive_max_idle_connections', self.__thread_pool_size // 2))
+        self.keepalive_max_idle_connections = self.__thread_pool_size // 2\
+            if max_idle_connections is None else max_idle_connections
+
+        server_mode = 'asyncio' if str(config.get('server_mode', '')).lower() == 'asyncio' else 'threaded'
+        unix_socket = (config['unix_socket'], parse_int(config.get('unix_socket_mode')))\
+            if config.get('unix_socket') else None
+
+        if self.__listen != config['listen'] or self.__ssl_options != ssl_options or self._received_new_cert\
+                or self.__server_mode != server_mode or self.__unix_socket != unix_socket:
+            self.__initialize(config['listen'], ssl_options, server_mode, unix_socket)
 
         self.__auth_key = base64.b64encode(config['auth'].encode('utf-8')) if 'auth' in config else None
         # pyright -- ``__listen`` is initially created as ``None``, but right after that it is replaced with a string
@@ -549,7 +549,11 @@ class Config(object):
         _set_section_values('restapi', ['listen', 'connect_address', 'certfile', 'keyfile', 'keyfile_password',
                                         'cafile', 'ciphers', 'verify_client', 'http_extra_headers',
                                         'https_extra_headers', 'allowlist', 'allowlist_include_members',
-                                        'request_queue_size', 'server_tokens'])
+                                        'allowlist_members_cache_ttl', 'request_queue_size', 'server_tokens',
+                                        'status_snapshot_interval', 'connection_pool_size', 'connection_pool_timeout',
+                                        'connection_pool_idle_timeout', 'server_mode', 'keepalive_timeout',
+                                        'keepalive_max_requests', 'keepalive_max_idle_connections', 'unix_socket',
+                                        'unix_socket_mode'])
         _set_section_values('ctl', ['insecure', 'cacert', 'certfile', 'keyfile', 'keyfile_password'])
         _set_section_values('postgresql', ['listen', 'connect_address', 'proxy_address',
                                            'config_dir', 'data_dir', 'pgpass', 'bin_dir'])
@@ -574,7 +578,11 @@ class Config(object):
                 if value is not None:
                     ret[first][second] = value
 
-        for first, params in (('restapi', ('request_queue_size', 'thread_pool_size')),
+        for first, params in (('restapi', ('request_queue_size', 'thread_pool_size', 'allowlist_members_cache_ttl',
+                                           'status_snapshot_interval', 'connection_pool_size',
+                                           'connection_pool_timeout', 'connection_pool_idle_timeout',
+                                           'keepalive_timeout', 'keepalive_max_requests',
+                                           'keepalive_max_idle_connections', 'unix_socket_mode')),
                               ('log', ('max_queue_size', 'file_size', 'file_num', 'mode'))):
             for second in params:
                 value = ret.get(first, {}).pop(second, None)
@@ -686,20 +694,26 @@ class Config(object):
                               'SERVICE_TAGS', 'NAMESPACE', 'CONTEXT', 'USE_ENDPOINTS', 'SCOPE_LABEL', 'ROLE_LABEL',
                               'POD_IP', 'PORTS', 'LABELS', 'BYPASS_API_SERVICE', 'RETRIABLE_HTTP_CODES', 'KEY_PASSWORD',
                               'USE_SSL', 'SET_ACLS', 'GROUP', 'DATABASE', 'LEADER_LABEL_VALUE', 'FOLLOWER_LABEL_VALUE',
-                              'STANDBY_LEADER_LABEL_VALUE', 'TMP_ROLE_LABEL', 'AUTH_DATA', 'BOOTSTRAP_LABELS') and name:
+                              'STANDBY_LEADER_LABEL_VALUE', 'TMP_ROLE_LABEL', 'AUTH_DATA', 'BOOTSTRAP_LABELS',
+                              'BATCH_WRITES', 'LEASE_KEEPALIVE_STREAM', 'USE_LEASES', 'USE_STATUS_CONFIG_MAP',
+                              'STATUS_LSN_INTERVAL', 'STATUS_LSN_DELTA', 'USE_CACHE',
+                              'USE_PERSISTENT_WATCHES', 'LEADER_OPTIME_INTERVAL', 'LEADER_OPTIME_DELTA') and name:
                     value = os.environ.pop(param)
                     if name == 'CITUS':
                         if suffix == 'GROUP':
                             value = parse_int(value)
                         elif suffix != 'DATABASE':
                             continue
-                    elif suffix == 'PORT':
+                    elif suffix in ('PORT', 'STATUS_LSN_INTERVAL', 'STATUS_LSN_DELTA',
+                                    'LEADER_OPTIME_INTERVAL', 'LEADER_OPTIME_DELTA'):
                         value = value and parse_int(value)
                     elif suffix in ('HOSTS', 'PORTS', 'CHECKS', 'SERVICE_TAGS', 'RETRIABLE_HTTP_CODES'):
                         value = value and _parse_list(value)
                     elif suffix in ('LABELS', 'SET_ACLS', 'AUTH_DATA', 'BOOTSTRAP_LABELS'):
                         value = _parse_dict(value)
-                    elif suffix in ('USE_PROXIES', 'REGISTER_SERVICE', 'USE_ENDPOINTS', 'BYPASS_API_SERVICE', 'VERIFY'):
+                    elif suffix in ('USE_PROXIES', 'REGISTER_SERVICE', 'USE_ENDPOINTS', 'BYPASS_API_SERVICE', 'VERIFY',
+                                    'BATCH_WRITES', 'LEASE_KEEPALIVE_STREAM', 'USE_LEASES', 'USE_STATUS_CONFIG_MAP',
+                                    'USE_CACHE', 'USE_PERSISTENT_WATCHES'):
                         value = parse_bool(value)
                     if value is not None:
                         ret[name.lower()][suffix.lower()] = value
@@ -1,17 +1,20 @@
 """Abstract classes for Distributed Configuration Store."""
 import abc
 import datetime
+import functools
 import json
 import logging
 import re
 import time
 
-from collections import defaultdict
+from bisect import bisect_left
+from collections import defaultdict, OrderedDict
 from copy import deepcopy
 from random import randint
-from threading import Event, Lock
-from typing import Any, Callable, cast, Collection, Dict, Iterator, \
-    List, NamedTuple, Optional, Set, Tuple, Type, TYPE_CHECKING, Union
+from threading import Event, local, Lock
+from types import MappingProxyType
+from typing import Any, Callable, cast, Collection, Dict, FrozenSet, Iterator, \
+    List, Mapping, NamedTuple, Optional, Set, Tuple, Type, TYPE_CHECKING, Union
 from urllib.parse import parse_qsl, urlparse, urlunparse
 
 import dateutil.parser
@@ -20,7 +23,7 @@ from .. import global_config
 from ..dynamic_loader import iter_classes, iter_modules
 from ..exceptions import PatroniAssertionError, PatroniFatalException
 from ..tags import Tags
-from ..utils import deep_compare, parse_int, uri
+from ..utils import deep_compare, parse_int, retry_attempts_in_thread, uri
 
 if TYPE_CHECKING:  # pragma: no cover
     from ..config import Config
@@ -146,6 +149,69 @@ _Version = Union[int, str]
 _Session = Union[int, float, str, None]
 
 
+class NodeParseCache(object):
+    """Bounded cache of objects parsed from values of DCS nodes.
+
+    Cached ``from_node()`` factory methods return the previously parsed object if they are called again with the same
+    arguments, i.e. the same key version and value, instead of parsing the JSON value again. Values are part of the
+    cache key because versions of keys are not unique across all DCS types, e.g. in ZooKeeper. Values that are not
+    hashable (Kubernetes annotations) are always parsed.
+
+    The least recently used entries are evicted when the cache is full, therefore outdated versions of keys and keys
+    that disappeared from DCS are removed first. They are never hit again, so keeping them until then costs only
+    memory, which is bounded by :attr:`MAX_SIZE`. Returned objects are shared and must not be modified.
+
+    :cvar MAX_SIZE: maximum number of cached objects.
+    """
+
+    MAX_SIZE = 4096
+
+    def __init__(self) -> None:
+        """Create a :class:`NodeParseCache` instance."""
+        self._lock = Lock()
+        self._cache: OrderedDict[Tuple[Any, ...], Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Decorate a ``from_node()`` factory method to cache its results.
+
+        :param func: function to be wrapped.
+
+        :returns: wrapped function.
+        """
+        @functools.wraps(func)
+        def wrapper(*args: Any) -> Any:
+            key = (func.__qualname__,) + args
+            try:
+                hash(key)
+            except TypeError:
+                return func(*args)
+
+            with self._lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return self._cache[key]
+
+            ret = func(*args)
+            with self._lock:
+                self.misses += 1
+                self._cache[key] = ret
+                while len(self._cache) > self.MAX_SIZE:
+                    self._cache.popitem(last=False)
+            return ret
+        return wrapper
+
+    def clear(self) -> None:
+        """Remove all cached objects."""
+        with self._lock:
+            self._cache.clear()
+
+
+node_parse_cache = NodeParseCache()
+
+
 class Member(Tags, NamedTuple('Member',
                               [('version', _Version),
                                ('name', str),
@@ -174,6 +240,7 @@ class Member(Tags, NamedTuple('Member',
     """
 
     @staticmethod
+    @node_parse_cache
     def from_node(version: _Version, name: str, session: _Session, value: str) -> 'Member':
         """Factory method for instantiating :class:`Member` from a JSON serialised string or object.
 
@@ -485,6 +552,7 @@ class Failover(NamedTuple):
     scheduled_at: Optional[datetime.datetime]
 
     @staticmethod
+    @node_parse_cache
     def from_node(version: _Version, value: Union[str, Dict[str, str]]) -> 'Failover':
         """Factory method to parse *value* as failover configuration.
 
@@ -554,6 +622,7 @@ class ClusterConfig(NamedTuple):
     modify_version: _Version
 
     @staticmethod
+    @node_parse_cache
     def from_node(version: _Version, value: str, modify_version: Optional[_Version] = None) -> 'ClusterConfig':
         """Factory method to parse *value* as configuration information.
 
@@ -597,6 +666,7 @@ class SyncState(NamedTuple):
     quorum: int
 
     @staticmethod
+    @node_parse_cache
     def from_node(version: Optional[_Version], value: Union[str, Dict[str, Any], None]) -> 'SyncState':
         """Factory method to parse *value* as synchronisation state information.
 
@@ -744,6 +814,7 @@ class TimelineHistory(NamedTuple):
     lines: List[_HistoryTuple]
 
     @staticmethod
+    @node_parse_cache
     def from_node(version: _Version, value: str) -> 'TimelineHistory':
         """Parse the given JSON serialized string as a list of timeline history lines.
 
@@ -802,6 +873,7 @@ class Status(NamedTuple):
         return self.last_lsn == 0 and self.slots is None and not self.retain_slots
 
     @staticmethod
+    @node_parse_cache
     def from_node(value: Union[str, Dict[str, Any], None]) -> 'Status':
         """Factory method to parse *value* as :class:`Status` object.
 
@@ -847,6 +919,48 @@ class Status(NamedTuple):
         return Status(last_lsn, slots, retain_slots)
 
 
+_slots_errors = local()
+
+
+class _ClusterViews(NamedTuple):
+    """Lookup structures derived from :attr:`Cluster.members`, built once per :class:`Cluster` object.
+
+    :ivar size: number of members the views were built from.
+    :ivar by_name: members indexed by name. If names are duplicated the first member wins.
+    :ivar running: members with PostgreSQL in the ``running`` state.
+    :ivar failover_candidates: members without ``nofailover`` tag and with REST API URL.
+    :ivar slot_names: names of physical replication slots indexed by member name.
+    :ivar cascading: members indexed by the value of their ``replicatefrom`` tag.
+    """
+
+    size: int
+    by_name: Mapping[str, Member]
+    running: Tuple[Member, ...]
+    failover_candidates: Tuple[Member, ...]
+    slot_names: Mapping[str, str]
+    cascading: Mapping[str, Tuple[Member, ...]]
+
+    @staticmethod
+    def from_members(members: List[Member]) -> '_ClusterViews':
+        """Build all views with a single pass over *members*.
+
+        :param members: list of :class:`Member` objects.
+
+        :returns: a new :class:`_ClusterViews` object.
+        """
+        by_name: Dict[str, Member] = {}
+        cascading: Dict[str, List[Member]] = defaultdict(list)
+        for m in members:
+            by_name.setdefault(m.name, m)
+            if m.replicatefrom:
+                cascading[m.replicatefrom].append(m)
+        return _ClusterViews(len(members), MappingProxyType(by_name),
+                             tuple(m for m in members if m.is_running),
+                             tuple(m for m in members if not m.nofailover and m.api_url),
+                             MappingProxyType({m.name: slot_name_from_member_name(m.name) for m in members}),
+                             MappingProxyType({k: tuple(v) for k, v in cascading.items()}))
+
+
 class Cluster(NamedTuple('Cluster',
                          [('initialize', Optional[str]),
                           ('config', Optional[ClusterConfig]),
@@ -932,6 +1046,110 @@ class Cluster(NamedTuple('Cluster',
         """
         return int(not self.is_empty())
 
+    @property
+    def _views(self) -> _ClusterViews:
+        """Lookup structures derived from :attr:`members`.
+
+        .. note::
+            They are built on the first access and shared by all consumers of this :class:`Cluster` object.
+            :attr:`members` is expected to never change, but we are trying to be foolproof here and rebuild
+            views if the number of members doesn't match.
+        """
+        views: Optional[_ClusterViews] = self.__dict__.get('_cluster_views')
+        if views is None or views.size != len(self.members):
+            views = self.__dict__['_cluster_views'] = _ClusterViews.from_members(self.members)
+        return views
+
+    @property
+    def running_members(self) -> Tuple[Member, ...]:
+        """Members with PostgreSQL in the ``running`` state."""
+        return self._views.running
+
+    @property
+    def failover_candidates(self) -> Tuple[Member, ...]:
+        """Members that could be considered for failover: without ``nofailover`` tag and with REST API URL."""
+        return self._views.failover_candidates
+
+    def slot_name(self, member_name: str) -> str:
+        """Get the name of physical replication slot for the given member.
+
+        :param member_name: name of the member.
+
+        :returns: the value of :func:`slot_name_from_member_name`, precomputed for known members.
+        """
+        return self._views.slot_names.get(member_name) or slot_name_from_member_name(member_name)
+
+    def get_cascading_replicas(self, member_name: str) -> Tuple[Member, ...]:
+        """Get members that have ``replicatefrom`` tag pointing to the given member.
+
+        :param member_name: name of the member.
+
+        :returns: a tuple of :class:`Member` objects.
+        """
+        return self._views.cascading.get(member_name, ())
+
+    @staticmethod
+    def _slots_error(msg: str, *args: Any) -> None:
+        """Log an error found while calculating replication slots.
+
+        .. note::
+            The error is also recorded by all :meth:`_memoize` calls in progress in the current thread,
+            so that it is repeated every time the memoized result is reused.
+
+        :param msg: message to log.
+        :param args: arguments of the message.
+        """
+        for errors in getattr(_slots_errors, 'stack', ()):
+            errors.append((msg,) + args)
+        logger.error(msg, *args)
+
+    def _memoize(self, key: Tuple[Any, ...], func: Callable[[], Any]) -> Any:
+        """Calculate replication slots related value only once per this :class:`Cluster` object.
+
+        .. note::
+            Besides the *key*, the result depends on the number of :attr:`members` and on the global configuration,
+            which is expected to be replaced and not modified in-place, therefore we compare it by identity.
+
+        :param key: tuple describing the node and arguments the value is calculated for.
+        :param func: function that calculates the value.
+
+        :returns: the value returned by *func*, either just now or by the previous call with the same *key*.
+        """
+        cache: Dict[Tuple[Any, ...], Tuple[Any, Any, List[Tuple[Any, ...]]]] = \
+            self.__dict__.setdefault('_slots_cache', {})
+        key += (len(self.members), global_config.use_slots, global_config.member_slots_ttl,
+                global_config.is_standby_cluster)
+        config = global_config.get('permanent_replication_slots') or global_config.get('permanent_slots')\
+            or global_config.get('slots')
+        cached = cache.get(key)
+        if cached and cached[0] is config:
+            for args in cached[2]:
+                self._slots_error(*args)
+            return cached[1]
+
+        stack: List[List[Tuple[Any, ...]]] = _slots_errors.__dict__.setdefault('stack', [])
+        errors: List[Tuple[Any, ...]] = []
+        stack.append(errors)
+        try:
+            value = func()
+        finally:
+            stack.pop()
+        cache[key] = (config, value, errors)
+        return value
+
+    def _slots_key(self, name: str, postgresql: 'Postgresql', member: Tags, *args: Any) -> Tuple[Any, ...]:
+        """Build a key for :meth:`_memoize` from properties of the node affecting replication slots.
+
+        :param name: name of the calling method.
+        :param postgresql: reference to :class:`Postgresql` object.
+        :param member: reference to an object implementing :class:`Tags` interface.
+        :param args: other arguments affecting the result.
+
+        :returns: a tuple with node name, member name, relevant tags, capabilities and *args*.
+        """
+        return (name, postgresql.name, member.name if isinstance(member, Member) else None, member.nofailover,
+                member.nostream, member.replicatefrom, postgresql.can_advance_slots) + args
+
     @property
     def leader_name(self) -> Optional[str]:
         """The name of the leader if defined otherwise ``None``."""
@@ -951,7 +1169,7 @@ class Cluster(NamedTuple('Cluster',
 
         :returns: ``True`` if the member name is found.
         """
-        return any(m for m in self.members if m.name == member_name)
+        return member_name in self._views.by_name
 
     def get_member(self, member_name: str, fallback_to_leader: bool = True) -> Union[Member, Leader, None]:
         """Get :class:`Member` object by name or the :class:`Leader`.
@@ -961,8 +1179,8 @@ class Cluster(NamedTuple('Cluster',
 
         :returns: the :class:`Member` if found or :class:`Leader` object.
         """
-        return next((m for m in self.members if m.name == member_name),
-                    self.leader if fallback_to_leader else None)
+        member = self._views.by_name.get(member_name)
+        return member if member is not None else self.leader if fallback_to_leader else None
 
     def get_clone_member(self, exclude_name: str) -> Union[Member, Leader, None]:
         """Get member or leader object to use as clone source.
@@ -974,7 +1192,7 @@ class Cluster(NamedTuple('Cluster',
                  leader is used.
         """
         exclude = [exclude_name] + ([self.leader.name] if self.leader else [])
-        candidates = [m for m in self.members if m.clonefrom and m.is_running and m.name not in exclude]
+        candidates = [m for m in self.running_members if m.clonefrom and m.name not in exclude]
         return candidates[randint(0, len(candidates) - 1)] if candidates else self.leader
 
     @staticmethod
@@ -1003,11 +1221,18 @@ class Cluster(NamedTuple('Cluster',
 
     @property
     def __permanent_slots(self) -> Dict[str, Union[Dict[str, Any], Any]]:
-        """Dictionary of permanent replication slots with their known LSN."""
+        """Dictionary of permanent replication slots with their known LSN.
+
+        .. note::
+            The value is calculated only once and shared, therefore it must not be modified.
+        """
+        return self._memoize(('permanent_slots',), self.__calculate_permanent_slots)
+
+    def __calculate_permanent_slots(self) -> Dict[str, Union[Dict[str, Any], Any]]:
+        """Calculate dictionary of permanent replication slots with their known LSN."""
         ret: Dict[str, Union[Dict[str, Any], Any]] = global_config.permanent_slots
 
-        members: Dict[str, int] = {slot_name_from_member_name(m.name): m.lsn or 0
-                                   for m in self.members if m.replicatefrom}
+        members: Dict[str, int] = {self.slot_name(m.name): m.lsn or 0 for m in self.members if m.replicatefrom}
         slots: Dict[str, int] = self.slots
         for name, value in list(ret.items()):
             if not value:
@@ -1053,21 +1278,24 @@ class Cluster(NamedTuple('Cluster',
 
         :returns: final dictionary of slot names, after merging with permanent slots and performing sanity checks.
         """
-        name = member.name if isinstance(member, Member) else postgresql.name
         role = role or postgresql.role
 
-        slots: Dict[str, Dict[str, Any]] = self._get_members_slots(name, role,
-                                                                   member.nofailover, postgresql.can_advance_slots)
-        permanent_slots: Dict[str, Any] = self._get_permanent_slots(postgresql, member, role)
+        def calculate() -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+            name = member.name if isinstance(member, Member) else postgresql.name
+            slots: Dict[str, Dict[str, Any]] = self._get_members_slots(name, role, member.nofailover,
+                                                                       postgresql.can_advance_slots)
+            permanent_slots: Dict[str, Any] = self._get_permanent_slots(postgresql, member, role)
+            return slots, self._merge_permanent_slots(slots, permanent_slots, name, role, postgresql.can_advance_slots)
 
-        disabled_permanent_logical_slots: List[str] = self._merge_permanent_slots(
-            slots, permanent_slots, name, role, postgresql.can_advance_slots)
+        slots, disabled_permanent_logical_slots = self._memoize(
+            self._slots_key('get_replication_slots', postgresql, member, role), calculate)
 
         if disabled_permanent_logical_slots and show_error:
             logger.error("Permanent logical replication slots supported by Patroni only starting from PostgreSQL 11. "
                          "Following slots will not be created: %s.", disabled_permanent_logical_slots)
 
-        return slots
+        # callers are modifying the result, therefore we return a copy of the memoized value
+        return {name: dict(value) for name, value in slots.items()}
 
     def _merge_permanent_slots(self, slots: Dict[str, Dict[str, Any]], permanent_slots: Dict[str, Any],
                                name: str, role: 'PostgresqlRole', can_advance_slots: bool) -> List[str]:
@@ -1089,16 +1317,15 @@ class Cluster(NamedTuple('Cluster',
         """
         from ..postgresql.misc import PostgresqlRole
 
-        name = slot_name_from_member_name(name)
-        topology = {slot_name_from_member_name(m.name): m.replicatefrom and slot_name_from_member_name(m.replicatefrom)
-                    for m in self.members}
+        name = self.slot_name(name)
+        topology = {self.slot_name(m.name): m.replicatefrom and self.slot_name(m.replicatefrom) for m in self.members}
 
         disabled_permanent_logical_slots: List[str] = []
 
         for slot_name, value in permanent_slots.items():
             if not slot_name_re.match(slot_name):
-                logger.error("Invalid permanent replication slot name '%s'", slot_name)
-                logger.error("Slot name may only contain lower case letters, numbers, and the underscore chars")
+                self._slots_error("Invalid permanent replication slot name '%s'", slot_name)
+                self._slots_error("Slot name may only contain lower case letters, numbers, and the underscore chars")
                 continue
 
             tmp = deepcopy(value) if value else {'type': 'physical'}
@@ -1124,13 +1351,13 @@ class Cluster(NamedTuple('Cluster',
                     if not can_advance_slots:
                         disabled_permanent_logical_slots.append(slot_name)
                     elif slot_name in slots:
-                        logger.error("Permanent logical replication slot {'%s': %s} is conflicting with"
-                                     " physical replication slot for cluster member", slot_name, value)
+                        self._slots_error("Permanent logical replication slot {'%s': %s} is conflicting with"
+                                          " physical replication slot for cluster member", slot_name, value)
                     else:
                         slots[slot_name] = value
                     continue
 
-            logger.error("Bad value for slot '%s' in permanent_slots: %s", slot_name, permanent_slots[slot_name])
+            self._slots_error("Bad value for slot '%s' in permanent_slots: %s", slot_name, permanent_slots[slot_name])
         return disabled_permanent_logical_slots
 
     def _get_permanent_slots(self, postgresql: 'Postgresql', tags: Tags, role: 'PostgresqlRole') -> Dict[str, Any]:
@@ -1246,7 +1473,7 @@ class Cluster(NamedTuple('Cluster',
         slots: Dict[str, int] = self.slots
         ret: Dict[str, Dict[str, Any]] = {}
         for member in members:
-            slot_name = slot_name_from_member_name(member.name)
+            slot_name = self.slot_name(member.name)
             lsn = slots.get(slot_name, 0)
             if member.replicatefrom or leader_patroni_version and leader_patroni_version < (4, 0, 0):
                 # `/status` key is maintained by the leader, but `member` may be connected to some other node.
@@ -1255,7 +1482,7 @@ class Cluster(NamedTuple('Cluster',
                 # `max` is only a fallback so we take the LSN from the slot when there is no feedback from the member.
                 lsn = max(member.lsn or 0, lsn)
             ret[slot_name] = {'type': 'physical', 'lsn': lsn, 'expected_active': expected_active(member)}
-        slot_name = slot_name_from_member_name(name)
+        slot_name = self.slot_name(name)
         ret.update({slot: {'type': 'physical'} for slot in self.status.retain_slots
                     if not nofailover and slot not in ret and slot != slot_name})
 
@@ -1263,10 +1490,10 @@ class Cluster(NamedTuple('Cluster',
             # Find which names are conflicting for a nicer error message
             slot_conflicts: Dict[str, List[str]] = defaultdict(list)
             for member in members:
-                slot_conflicts[slot_name_from_member_name(member.name)].append(member.name)
-            logger.error("Following cluster members share a replication slot name: %s",
-                         "; ".join(f"{', '.join(v)} map to {k}"
-                                   for k, v in slot_conflicts.items() if len(v) > 1))
+                slot_conflicts[self.slot_name(member.name)].append(member.name)
+            self._slots_error("Following cluster members share a replication slot name: %s",
+                              "; ".join(f"{', '.join(v)} map to {k}"
+                                        for k, v in slot_conflicts.items() if len(v) > 1))
         return ret
 
     def has_permanent_slots(self, postgresql: 'Postgresql', member: Tags) -> bool:
@@ -1280,13 +1507,17 @@ class Cluster(NamedTuple('Cluster',
         from ..postgresql.misc import PostgresqlRole
 
         role = PostgresqlRole.REPLICA
-        members_slots: Dict[str, Dict[str, str]] = self._get_members_slots(postgresql.name, role,
-                                                                           member.nofailover,
-                                                                           postgresql.can_advance_slots)
-        permanent_slots: Dict[str, Any] = self._get_permanent_slots(postgresql, member, role)
-        slots = deepcopy(members_slots)
-        self._merge_permanent_slots(slots, permanent_slots, postgresql.name, role, postgresql.can_advance_slots)
-        return len(slots) > len(members_slots) or any(self.is_physical_slot(v) for v in permanent_slots.values())
+
+        def calculate() -> bool:
+            members_slots: Dict[str, Dict[str, str]] = self._get_members_slots(postgresql.name, role,
+                                                                               member.nofailover,
+                                                                               postgresql.can_advance_slots)
+            permanent_slots: Dict[str, Any] = self._get_permanent_slots(postgresql, member, role)
+            slots = deepcopy(members_slots)
+            self._merge_permanent_slots(slots, permanent_slots, postgresql.name, role, postgresql.can_advance_slots)
+            return len(slots) > len(members_slots) or any(self.is_physical_slot(v) for v in permanent_slots.values())
+
+        return self._memoize(self._slots_key('has_permanent_slots', postgresql, member), calculate)
 
     def maybe_filter_permanent_slots(self, postgresql: 'Postgresql', slots: Dict[str, int]) -> Dict[str, int]:
         """Filter out all non-permanent slots from provided *slots* dict.
@@ -1307,7 +1538,7 @@ class Cluster(NamedTuple('Cluster',
 
         permanent_slots: Dict[str, Any] = self._get_permanent_slots(postgresql, RemoteMember('', {}),
                                                                     PostgresqlRole.REPLICA)
-        members_slots = {slot_name_from_member_name(m.name) for m in self.members}
+        members_slots = set(self._views.slot_names.values())
 
         return {name: value for name, value in slots.items() if name in permanent_slots
                 and (self.is_physical_slot(permanent_slots[name])
@@ -1340,18 +1571,21 @@ class Cluster(NamedTuple('Cluster',
         :returns: ``True`` if this node or any member replicating from this node has
                   permanent logical slots, otherwise ``False``.
         """
-        if self._has_permanent_logical_slots(postgresql, member):
-            return True
+        def calculate() -> bool:
+            if self._has_permanent_logical_slots(postgresql, member):
+                return True
 
-        if global_config.use_slots:
-            name = member.name if isinstance(member, Member) else postgresql.name
+            if global_config.use_slots:
+                name = member.name if isinstance(member, Member) else postgresql.name
+
+                if not self.get_slot_name_on_primary(name, member):
+                    return False
 
-            if not self.get_slot_name_on_primary(name, member):
-                return False
+                members = [m for m in self.get_cascading_replicas(name) if m.name != self.leader_name]
+                return any(self.should_enforce_hot_standby_feedback(postgresql, m) for m in members)
+            return False
 
-            members = [m for m in self.members if m.replicatefrom == name and m.name != self.leader_name]
-            return any(self.should_enforce_hot_standby_feedback(postgresql, m) for m in members)
-        return False
+        return self._memoize(self._slots_key('should_enforce_hot_standby_feedback', postgresql, member), calculate)
 
     def get_slot_name_on_primary(self, name: str, tags: Tags) -> Optional[str]:
         """Get the name of physical replication slot for this node on the primary.
@@ -1375,7 +1609,7 @@ class Cluster(NamedTuple('Cluster',
             replicatefrom = self.get_member(tags.replicatefrom, False) \
                 if tags.replicatefrom and tags.replicatefrom != name else None
             if not isinstance(replicatefrom, Member):
-                return slot_name_from_member_name(name)
+                return self.slot_name(name)
             if replicatefrom.name in seen_nodes:
                 return None
             name, tags = replicatefrom.name, replicatefrom
@@ -1423,6 +1657,51 @@ class Cluster(NamedTuple('Cluster',
         return next(iter(sorted(m.patroni_version for m in self.members if m.patroni_version)), None)
 
 
+class ClusterSnapshots(object):
+    """Reuse :class:`Cluster` objects built from DCS nodes that didn't change.
+
+    DCS implementations mirroring the DCS content in memory from watch events (etcd3 and Kubernetes) would otherwise
+    build every :class:`Cluster` from scratch on every HA cycle and REST API call. Snapshots are kept per cluster path,
+    i.e. per MPP group, and are reused as long as the set of nodes and their revisions stays the same, so only groups
+    that actually changed are rebuilt. :class:`Cluster` objects must be treated as immutable, what makes them safe to
+    share between threads.
+    """
+
+    def __init__(self) -> None:
+        """Create a :class:`ClusterSnapshots` instance."""
+        self._lock = Lock()
+        self._snapshots: Dict[str, Tuple[FrozenSet[Tuple[str, Any]], Cluster]] = {}
+
+    def get(self, path: str, revisions: FrozenSet[Tuple[str, Any]], build: Callable[[], Cluster]) -> Cluster:
+        """Get the :class:`Cluster` object for *path*.
+
+        :param path: path of the cluster in DCS.
+        :param revisions: names and revisions of all nodes the cluster is built from.
+        :param build: function building the :class:`Cluster` object if it isn't yet known for given *revisions*.
+
+        :returns: previously built :class:`Cluster` object if *revisions* didn't change, otherwise the result of
+            *build*.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(path)
+        if snapshot and snapshot[0] == revisions:
+            return snapshot[1]
+        cluster = build()
+        with self._lock:
+            self._snapshots[path] = (revisions, cluster)
+        return cluster
+
+    def retain(self, prefix: str, paths: Collection[str]) -> None:
+        """Forget snapshots of clusters under *prefix* that are not in *paths*, i.e. of removed MPP groups.
+
+        :param prefix: common prefix of cluster paths.
+        :param paths: paths of clusters that still exist.
+        """
+        with self._lock:
+            for path in [path for path in self._snapshots if path.startswith(prefix) and path not in paths]:
+                del self._snapshots[path]
+
+
 class ReturnFalseException(Exception):
     """Exception to be caught by the :func:`catch_return_false_exception` decorator."""
 
@@ -1444,6 +1723,136 @@ def catch_return_false_exception(func: Callable[..., Any]) -> Any:
     return wrapper
 
 
+class DCSOperationStats(object):
+    """Latency histograms, retry and error counters of DCS operations.
+
+    Every operation of :attr:`AbstractDCS._INSTRUMENTED_OPERATIONS` implemented by a DCS class is timed automatically,
+    counters are exposed through ``GET /metrics``.
+    """
+
+    BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self) -> None:
+        """Create a :class:`DCSOperationStats` instance."""
+        self._lock = Lock()
+        self.histograms: Dict[str, List[int]] = {}
+        self.sums: Dict[str, float] = {}
+        self.retries: Dict[str, int] = {}
+        self.errors: Dict[Tuple[str, str], int] = {}
+        self.rpcs_saved = 0
+        self.relists: Dict[str, int] = {}
+        self.watch_lag_histograms: Dict[str, List[int]] = {}
+        self.watch_lag_sums: Dict[str, float] = {}
+
+    def save_rpcs(self, count: int) -> None:
+        """Account requests to DCS that were not made because writes were combined into a single one.
+
+        :param count: number of requests saved.
+        """
+        with self._lock:
+            self.rpcs_saved += count
+
+    def relisted(self, cache: str) -> None:
+        """Account a full reload of the watch *cache* after the watch could not be resumed.
+
+        :param cache: name of the cache, i.e. kind of objects in it.
+        """
+        with self._lock:
+            self.relists[cache] = self.relists.get(cache, 0) + 1
+
+    def observe_watch_lag(self, cache: str, lag: float) -> None:
+        """Account the time between a write and the moment when the watch of the *cache* delivered it.
+
+        :param cache: name of the cache, i.e. kind of objects in it.
+        :param lag: time in seconds.
+        """
+        with self._lock:
+            if cache not in self.watch_lag_histograms:
+                self.watch_lag_histograms[cache] = [0] * (len(self.BUCKETS) + 1)
+                self.watch_lag_sums[cache] = 0.0
+            self.watch_lag_histograms[cache][bisect_left(self.BUCKETS, lag)] += 1
+            self.watch_lag_sums[cache] += lag
+
+    def watch_snapshot(self) -> Tuple[Dict[str, int], Dict[str, List[int]], Dict[str, float]]:
+        """Get a consistent copy of watch counters.
+
+        :returns: per cache numbers of relists, per cache counts of watch lag observations in every bucket of
+            :attr:`BUCKETS` and per cache sums of observed lags.
+        """
+        with self._lock:
+            return (dict(self.relists), {cache: list(counts) for cache, counts in self.watch_lag_histograms.items()},
+                    dict(self.watch_lag_sums))
+
+    def observe(self, operation: str, duration: float, retries: int, error: Optional[str]) -> None:
+        """Account a single execution of *operation*.
+
+        :param operation: name of the operation.
+        :param duration: time spent in seconds.
+        :param retries: number of retries made while executing the operation.
+        :param error: class name of the exception raised by the operation, ``false`` if it returned ``False``, or
+            ``None`` if it succeeded.
+        """
+        with self._lock:
+            if operation not in self.histograms:
+                self.histograms[operation] = [0] * (len(self.BUCKETS) + 1)
+                self.sums[operation] = 0.0
+                self.retries[operation] = 0
+            self.histograms[operation][bisect_left(self.BUCKETS, duration)] += 1
+            self.sums[operation] += duration
+            self.retries[operation] += retries
+            if error:
+                self.errors[(operation, error)] = self.errors.get((operation, error), 0) + 1
+
+    def snapshot(self) -> Tuple[Dict[str, List[int]], Dict[str, float], Dict[str, int], Dict[Tuple[str, str], int]]:
+        """Get a consistent copy of counters.
+
+        :returns: per operation counts of observations in every bucket of :attr:`BUCKETS` (not cumulative, the last one
+            is for durations above the largest bucket), per operation sums of durations, per operation numbers of
+            retries and numbers of errors per operation and error class.
+        """
+        with self._lock:
+            return ({operation: list(counts) for operation, counts in self.histograms.items()},
+                    dict(self.sums), dict(self.retries), dict(self.errors))
+
+
+_operation_context = local()
+
+
+def _instrument_operation(operation: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a DCS method to account its executions in :attr:`AbstractDCS.operation_stats`.
+
+    Nested calls of the same operation, i.e. from an overridden method calling ``super()``, are accounted only once.
+
+    :param operation: name of the operation.
+    :param func: method to be wrapped.
+
+    :returns: wrapped method.
+    """
+    @functools.wraps(func)
+    def wrapper(self: 'AbstractDCS', *args: Any, **kwargs: Any) -> Any:
+        active: Set[str] = getattr(_operation_context, 'active', None) or set()
+        if operation in active:
+            return func(self, *args, **kwargs)
+        _operation_context.active = active | {operation}
+        error = None
+        retries = retry_attempts_in_thread()
+        start = time.monotonic()
+        try:
+            ret = func(self, *args, **kwargs)
+            if ret is False:
+                error = 'false'
+            return ret
+        except Exception as e:
+            error = e.__class__.__name__
+            raise
+        finally:
+            _operation_context.active = active
+            self.operation_stats.observe(operation, time.monotonic() - start,
+                                         retry_attempts_in_thread() - retries, error)
+    setattr(wrapper, '_dcs_operation', operation)
+    return wrapper
+
+
 class AbstractDCS(abc.ABC):
     """Abstract representation of DCS modules.
 
@@ -1526,6 +1935,24 @@ class AbstractDCS(abc.ABC):
     _SYNC = 'sync'
     _FAILSAFE = 'failsafe'
 
+    _INSTRUMENTED_OPERATIONS = ('_load_cluster', 'touch_member', '_update_leader', 'attempt_to_acquire_leader',
+                                'take_leader', '_delete_leader', '_write_leader_optime', '_write_status',
+                                '_write_failsafe', 'set_failover_value', 'set_config_value', 'set_history_value',
+                                'set_sync_state_value', 'delete_sync_state', 'initialize', 'cancel_initialization',
+                                'delete_cluster')
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Instrument operations of :attr:`_INSTRUMENTED_OPERATIONS` implemented by the DCS class.
+
+        Only methods defined by the class itself are wrapped, so every backend is timed uniformly without having to be
+        aware of it.
+        """
+        super().__init_subclass__(**kwargs)
+        for name in cls._INSTRUMENTED_OPERATIONS:
+            func = cls.__dict__.get(name)
+            if callable(func) and not hasattr(func, '_dcs_operation'):
+                setattr(cls, name, _instrument_operation(name.lstrip('_'), func))
+
     def __init__(self, config: Dict[str, Any], mpp: 'AbstractMPP') -> None:
         """Prepare DCS paths, MPP object, initial values for state information and processing dependencies.
 
@@ -1548,6 +1975,7 @@ class AbstractDCS(abc.ABC):
         self._last_retain_slots: Dict[str, float] = {}
         self._last_failsafe: Optional[Dict[str, str]] = {}
         self.event = Event()
+        self.operation_stats = DCSOperationStats()
 
     @property
     def mpp(self) -> 'AbstractMPP':
@@ -1663,6 +2091,11 @@ class AbstractDCS(abc.ABC):
         """The time recorded when the DCS was last reachable."""
         return self._last_seen
 
+    @property
+    def lease_ttl_remaining(self) -> Optional[float]:
+        """Time in seconds left before the session (lease) of this node expires, if the DCS implementation knows it."""
+        return None
+
     @abc.abstractmethod
     def _postgresql_cluster_loader(self, path: Any) -> Cluster:
         """Load and build the :class:`Cluster` object from DCS, which represents a single PostgreSQL cluster.
@@ -1746,8 +2179,8 @@ class AbstractDCS(abc.ABC):
         if TYPE_CHECKING:  # pragma: no cover
             assert isinstance(groups, dict)
         cluster = groups.pop(self._mpp.coordinator_group_id, Cluster.empty())
-        cluster.workers.update(groups)
-        return cluster
+        # the coordinator Cluster object could be a snapshot shared with other consumers, therefore it is copied
+        return Cluster(*cluster[:-1], workers={**cluster.workers, **groups})
 
     def get_cluster(self) -> Cluster:
         """Retrieve a fresh view of DCS.
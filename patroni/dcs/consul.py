@@ -1,6 +1,8 @@
+import base64
 import json
 import logging
 import os
+import random
 import re
 import socket
 import ssl
@@ -8,6 +10,7 @@ import time
 
 from collections import defaultdict
 from http.client import HTTPException
+from threading import Condition, Lock, Thread
 from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple, TYPE_CHECKING, Union
 from urllib.parse import quote, urlencode, urlparse
 
@@ -16,6 +19,7 @@ import urllib3
 from consul import base, Check, ConsulException, NotFound
 from urllib3.exceptions import HTTPError
 
+from ..collections import EMPTY_DICT
 from ..exceptions import DCSError
 from ..postgresql.misc import PostgresqlRole, PostgresqlState
 from ..postgresql.mpp import AbstractMPP
@@ -73,6 +77,9 @@ class HTTPClient(object):
         kwargs['cert_reqs'] = ssl.CERT_REQUIRED if verify or ca_cert else ssl.CERT_NONE
         self.http = urllib3.PoolManager(num_pools=10, maxsize=10, headers={}, **kwargs)
         self._ttl = 30
+        # called after every request that could change KV with the method, path, params, body and the result
+        # of the request, the result is ``None`` if the request failed
+        self.on_write: Optional[Callable[[str, str, Dict[str, Any], Union[str, bytes], Any], None]] = None
 
     def set_read_timeout(self, timeout: float) -> None:
         self._read_timeout = timeout / 3.0
@@ -138,7 +145,14 @@ class HTTPClient(object):
             token = params.pop('token', self.token) if isinstance(params, dict) else self.token
             if token:
                 kwargs['headers']['X-Consul-Token'] = token
-            return callback(self.response(self.http.request(method.upper(), self.uri(path, params), **kwargs)))
+            result = None
+            try:
+                result = callback(self.response(self.http.request(method.upper(), self.uri(path, params), **kwargs)))
+                return result
+            finally:
+                # also failed requests, the write could have been applied even if we didn't get the response
+                if self.on_write and method in ('put', 'delete') and (path.startswith('/v1/kv/') or path == '/v1/txn'):
+                    self.on_write(method, path, params if isinstance(params, dict) else {}, data, result)
         return wrapper
 
 
@@ -234,6 +248,249 @@ def service_name_from_scope_name(scope_name: str) -> str:
     return service_name[0:230]
 
 
+class ConsulCache(Thread):
+    """Mirror of keys under :attr:`Consul.cluster_prefix`, kept up to date with blocking queries.
+
+    Every blocking query is sent with the ``X-Consul-Index`` of the previous response and returns only when something
+    under the prefix was changed (or when the wait time expired), therefore the HA loop reads the cluster from memory
+    and an idle cluster doesn't cause any reads. Changes of the leader key, of the leader status and of the global
+    configuration made by other members wake up the HA loop.
+
+    Our own writes reach the mirror only with the next response of the blocking query, therefore they are kept
+    separately and applied on top of the mirror until the mirror sees a newer ``ModifyIndex`` of the key (see
+    :meth:`written`). Values written with ``/v1/txn`` come with their ``ModifyIndex``. A plain ``PUT`` doesn't return
+    it, which is fine for keys which version is never used, but keys written with CAS (the leader, config, failover
+    and sync keys) and keys for which the result of the write is unknown are read back before the next read of the
+    cluster (see :meth:`unknown_keys` and :meth:`read_back`).
+    """
+
+    _MAX_DELAY = 16
+
+    def __init__(self, dcs: 'Consul', client: 'ConsulClient') -> None:
+        """Create and start the :class:`ConsulCache` thread.
+
+        :param dcs: reference to the :class:`Consul` object.
+        :param client: reference to the :class:`ConsulClient` object used to run queries.
+        """
+        super(ConsulCache, self).__init__()
+        self.daemon = True
+        self._dcs = dcs
+        self._client = client
+        self.condition = Condition()
+        self._prefix = dcs.cluster_prefix
+        self._leader_key = dcs.leader_path
+        self._status_keys = (dcs.leader_optime_path, dcs.status_path)
+        self._config_key = dcs.config_path
+        self._versioned_keys = (dcs.leader_path, dcs.config_path, dcs.failover_path, dcs.sync_path)
+        self._name = getattr(dcs, '_name').encode('utf-8')  # pyright
+        self._is_ready = False
+        self._index: Optional[int] = None  # X-Consul-Index of the last response, None if a full read is required
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        self._nodes_lock = Lock()
+        # our own writes not seen by the mirror yet: key => (``ModifyIndex`` of the key in the mirror at the time of
+        # the write, the node written by us or ``None`` if the key was deleted)
+        self._written: Dict[str, Tuple[int, Optional[Dict[str, Any]]]] = {}
+        # keys written by us which must be read back: key => (``ModifyIndex`` in the mirror, sequence number of write)
+        self._unknown: Dict[str, Tuple[int, int]] = {}
+        self._write_seq = 0
+        self.start()
+
+    def _modify_index(self, key: str) -> int:
+        """Must be called only when holding the :attr:`_nodes_lock`."""
+        node = self._nodes.get(key)
+        return node['ModifyIndex'] if node else 0
+
+    def _set_unknown(self, key: str) -> None:
+        """Must be called only when holding the :attr:`_nodes_lock`."""
+        self._write_seq += 1
+        self._unknown[key] = (self._modify_index(key), self._write_seq)
+        self._written.pop(key, None)
+
+    def _set_written(self, key: str, node: Optional[Dict[str, Any]]) -> None:
+        """Must be called only when holding the :attr:`_nodes_lock`."""
+        modify_index = self._modify_index(key)
+        if node or modify_index:
+            self._written[key] = (modify_index, node)
+        else:  # the key doesn't exist in the mirror
+            self._written.pop(key, None)
+        self._unknown.pop(key, None)
+
+    def written(self, method: str, path: str, params: Dict[str, Any], data: Union[str, bytes], result: Any) -> None:
+        """Apply our own write to Consul KV on top of the mirror.
+
+        :param method: ``put`` or ``delete``.
+        :param path: path of the request, ``/v1/kv/<key>`` or ``/v1/txn``.
+        :param params: query parameters of the request.
+        :param data: body of the request.
+        :param result: the result of the request or ``None`` if it failed.
+        """
+        with self._nodes_lock:
+            if path == '/v1/txn':
+                results = {r['KV']['Key']: r['KV'] for r in (result or EMPTY_DICT).get('Results') or [] if r.get('KV')}
+                for op in json.loads(data):
+                    op = op.get('KV') or EMPTY_DICT
+                    key, verb = op.get('Key', ''), op.get('Verb', '')
+                    if not self.covers(key) or verb in ('get', 'get-tree', 'check-index', 'check-session',
+                                                        'check-not-exists'):
+                        continue
+                    if result is None:
+                        self._set_unknown(key)
+                    elif verb.startswith('delete'):
+                        self._set_written(key, None)
+                    elif key in results:
+                        node = {**results[key], 'Value': base64.b64decode(op['Value']) if op.get('Value') else b''}
+                        if verb == 'lock':
+                            node['Session'] = op['Session']
+                        self._set_written(key, node)
+                    else:
+                        self._set_unknown(key)
+                return
+
+            key = path[len('/v1/kv/'):]
+            if not self.covers(key) or result is False:  # CAS or acquire failed, nothing was changed
+                return
+            if method == 'delete' and params.get('recurse'):
+                for k in set(self._nodes) | set(self._written):
+                    if k.startswith(key):
+                        self._set_unknown(k)
+            elif result is None or key in self._versioned_keys:
+                self._set_unknown(key)
+            elif method == 'delete':
+                self._set_written(key, None)
+            else:
+                if 'acquire' in params:
+                    session = params['acquire']
+                elif 'release' in params:
+                    session = None
+                else:
+                    old = self._written[key][1] if key in self._written else self._nodes.get(key)
+                    session = old and old.get('Session')
+                node = {'Key': key, 'Value': data.encode('utf-8') if isinstance(data, str) else data or b'',
+                        'ModifyIndex': self._modify_index(key)}
+                if session:
+                    node['Session'] = session
+                self._set_written(key, node)
+
+    def unknown_keys(self) -> Dict[str, Tuple[int, int]]:
+        """Get keys written by us which must be read back.
+
+        :returns: a copy of the :attr:`_unknown` dict.
+        """
+        with self._nodes_lock:
+            return self._unknown.copy()
+
+    def read_back(self, key: str, unknown: Tuple[int, int], node: Optional[Dict[str, Any]]) -> None:
+        """Apply the *node* read back from Consul on top of the mirror.
+
+        :param key: the key.
+        :param unknown: the value from :meth:`unknown_keys`, the *node* is ignored if the key was written again.
+        :param node: the node or ``None`` if the key doesn't exist.
+        """
+        with self._nodes_lock:
+            if self._unknown.get(key) == unknown:
+                del self._unknown[key]
+                if node or unknown[0]:
+                    self._written[key] = (unknown[0], node)
+
+    @staticmethod
+    def _value(nodes: Dict[str, Dict[str, Any]], key: str) -> Optional[bytes]:
+        node = nodes.get(key)
+        return node and node['Value']
+
+    def _process_changes(self, old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> None:
+        """Wake up the HA loop if keys important for it were changed.
+
+        :param old: nodes known before the last response.
+        :param new: nodes from the last response.
+        """
+        leader = self._value(new, self._leader_key)
+        old_config, new_config = self._value(old, self._config_key), self._value(new, self._config_key)
+        # We also want to wake up HA loop on replicas if leader optime (or status key) was updated
+        if self._value(old, self._leader_key) != leader\
+                or old_config is not None and new_config is not None and old_config != new_config\
+                or leader != self._name and any(self._value(old, key) != self._value(new, key)
+                                                and self._value(new, key) is not None for key in self._status_keys):
+            self._dcs.event.set()
+
+    def _do_query(self) -> None:
+        """Run the next blocking query and apply its results."""
+        kwargs: Dict[str, Any] = {'recurse': True, 'consistency': getattr(self._dcs, '_consistency')}  # pyright
+        if self._index is not None:
+            kwargs.update(index=self._index, wait='{0}s'.format(int(self._dcs.ttl)))
+        index, results = self._client.kv.get(self._prefix, **kwargs)
+        index = int(index or 0)
+        if self._index is not None and index == self._index:  # the wait time has expired and nothing was changed
+            return
+
+        nodes: Dict[str, Dict[str, Any]] = {node['Key']: node for node in results or []}
+        with self._nodes_lock:
+            old, self._nodes = self._nodes, nodes
+            # forget our own writes once the mirror has seen them or something newer
+            for written in (self._written, self._unknown):
+                for key in [key for key, value in written.items() if self._modify_index(key) != value[0]]:
+                    del written[key]
+        # Index could go backwards, for example if the Consul state was restored from a snapshot.
+        # In this case the next query must not block, so that we read the prefix again.
+        was_ready, self._index = self._index is not None, None if index < (self._index or 0) else max(index, 1)
+        with self.condition:
+            self._is_ready = True
+            self.condition.notify()
+        if was_ready or old:
+            self._process_changes(old, nodes)
+
+    def run(self) -> None:
+        delay = 0
+        while True:
+            try:
+                self._do_query()
+                delay = 0
+            except Exception as e:
+                logger.error('ConsulCache.run %r', e)
+                with self.condition:
+                    self._is_ready = False
+                self._index = None
+                # jittered exponential backoff, so that all members don't hit Consul at the same time
+                delay = min(delay * 2 or 1, self._MAX_DELAY)
+                time.sleep(random.uniform(delay / 2.0, delay))
+
+    def covers(self, path: str) -> bool:
+        """Check whether keys under the *path* are kept in the cache.
+
+        :param path: path in Consul KV.
+
+        :returns: ``True`` if *path* is under the watched prefix.
+        """
+        return path.startswith(self._prefix)
+
+    def get(self, path: str, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        """Get copies of cached nodes under the *path*.
+
+        :param path: path in Consul KV.
+        :param timeout: how long to wait for the cache to become ready.
+
+        :returns: nodes under the *path*, or ``None`` if there are no such nodes.
+
+        :raises:
+            :exc:`RetryFailedError`: if the cache didn't become ready within *timeout*.
+        """
+        stop_time = time.time() + timeout
+        with self.condition:
+            while not self._is_ready:
+                timeout = stop_time - time.time()
+                if timeout <= 0:
+                    raise RetryFailedError('Exceeded retry deadline')
+                self.condition.wait(timeout)
+        with self._nodes_lock:
+            nodes = {key: node for key, node in self._nodes.items() if key.startswith(path)}
+            for key, (_, node) in self._written.items():
+                if key.startswith(path):
+                    if node:
+                        nodes[key] = node
+                    else:
+                        nodes.pop(key, None)
+            return [nodes[key].copy() for key in sorted(nodes)] or None
+
+
 class Consul(AbstractDCS):
 
     def __init__(self, config: Dict[str, Any], mpp: AbstractMPP) -> None:
@@ -287,6 +544,11 @@ class Consul(AbstractDCS):
         if not self._ctl:
             self.create_session()
         self._previous_loop_token = self._client.token
+        self._batch_writes = parse_bool(config.get('batch_writes', True)) is not False
+        self._write_batch: Optional[List[Dict[str, Any]]] = None
+        self._cache = ConsulCache(self, self._client) if not self._ctl and config.get('use_cache') else None
+        if self._cache:
+            self._client.http.on_write = self._cache.written
 
     def retry(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
         return self._retry.copy()(method, *args, **kwargs)
@@ -369,6 +631,14 @@ class Consul(AbstractDCS):
             logger.exception('refresh_session')
         raise ConsulError('Failed to renew/create session')
 
+    @property
+    def cluster_prefix(self) -> str:
+        """Construct the cluster prefix for the cluster.
+
+        :returns: path in Consul KV under which we store information about this Patroni cluster.
+        """
+        return self._base_path + '/' if self.is_mpp_coordinator() else self.client_path('')
+
     @staticmethod
     def member(node: Dict[str, str]) -> Member:
         return Member.from_node(node['ModifyIndex'], os.path.basename(node['Key']), node.get('Session'), node['Value'])
@@ -423,6 +693,24 @@ class Consul(AbstractDCS):
     def _consistency(self) -> str:
         return 'consistent' if self._ctl else self._client.consistency
 
+    def _get_prefix(self, path: str) -> Optional[List[Dict[str, Any]]]:
+        """Get all nodes under the *path*, from the cache if it covers the *path*.
+
+        :param path: the path in Consul KV.
+
+        :returns: nodes under the *path*, or ``None`` if there are no such nodes.
+        """
+        if self._cache and self._cache.covers(path):
+            # stale reads could miss our own writes too
+            consistency = 'default' if self._consistency == 'stale' else self._consistency
+            for key, unknown in self._cache.unknown_keys().items():
+                if key.startswith(path):
+                    _, node = self.retry(self._client.kv.get, key, consistency=consistency)
+                    self._cache.read_back(key, unknown, node)
+            return self._cache.get(path, self._retry.deadline or 0)
+        _, results = self.retry(self._client.kv.get, path, recurse=True, consistency=self._consistency)
+        return results
+
     def _postgresql_cluster_loader(self, path: str) -> Cluster:
         """Load and build the :class:`Cluster` object from DCS, which represents a single PostgreSQL cluster.
 
@@ -430,7 +718,7 @@ class Consul(AbstractDCS):
 
         :returns: :class:`Cluster` instance.
         """
-        _, results = self.retry(self._client.kv.get, path, recurse=True, consistency=self._consistency)
+        results = self._get_prefix(path)
         if results is None:
             return Cluster.empty()
         nodes: Dict[str, Dict[str, Any]] = {}
@@ -447,8 +735,7 @@ class Consul(AbstractDCS):
 
         :returns: all MPP groups as :class:`dict`, with group IDs as keys and :class:`Cluster` objects as values.
         """
-        results: Optional[List[Dict[str, Any]]]
-        _, results = self.retry(self._client.kv.get, path, recurse=True, consistency=self._consistency)
+        results = self._get_prefix(path)
         clusters: Dict[int, Dict[str, Dict[str, Any]]] = defaultdict(dict)
         for node in results or []:
             key = node['Key'][len(path):].split('/', 1)
@@ -616,17 +903,101 @@ class Consul(AbstractDCS):
     def set_config_value(self, value: str, version: Optional[int] = None) -> bool:
         return self._client.kv.put(self.config_path, value, cas=version)
 
+    @staticmethod
+    def _txn_kv(verb: str, key: str, value: Optional[str] = None, **kwargs: Any) -> Dict[str, Any]:
+        """Build a ``KV`` operation of the ``/v1/txn`` request.
+
+        :param verb: the operation, e.g. ``set``, ``cas``, ``lock`` or ``check-session``.
+        :param key: the key.
+        :param value: the value, it is encoded with base64.
+        :param kwargs: other fields of the operation, e.g. ``Index`` or ``Session``.
+
+        :returns: the operation.
+        """
+        operation: Dict[str, Any] = {'Verb': verb, 'Key': key, **kwargs}
+        if value is not None:
+            operation['Value'] = base64.b64encode(value.encode('utf-8')).decode('utf-8')
+        return {'KV': operation}
+
+    def _put_or_batch(self, key: str, value: str) -> bool:
+        """Write *value* to the *key* or add it to the write batch if one is being collected.
+
+        :param key: key to write.
+        :param value: value to write.
+
+        :returns: ``True`` if the *value* was written or added to the batch.
+        """
+        if self._write_batch is not None:
+            self._write_batch.append(self._txn_kv('set', key, value))
+            return True
+        return self._client.kv.put(key, value)
+
     @catch_consul_errors
     def _write_leader_optime(self, last_lsn: str) -> bool:
-        return self._client.kv.put(self.leader_optime_path, last_lsn)
+        return self._put_or_batch(self.leader_optime_path, last_lsn)
 
     @catch_consul_errors
     def _write_status(self, value: str) -> bool:
-        return self._client.kv.put(self.status_path, value)
+        return self._put_or_batch(self.status_path, value)
 
     @catch_consul_errors
     def _write_failsafe(self, value: str) -> bool:
-        return self._client.kv.put(self.failsafe_path, value)
+        return self._put_or_batch(self.failsafe_path, value)
+
+    @catch_consul_errors
+    def _commit_write_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        """Execute all writes collected in the *batch* with a single transaction.
+
+        The transaction starts with the ``check-session`` operation on the leader key, so that keys maintained by
+        the leader are not overwritten if our session doesn't hold the leader lock anymore.
+
+        :param batch: list of ``KV`` operations.
+
+        :returns: ``True`` if the transaction succeeded.
+        """
+        if not self._session:
+            return False
+        self._client.txn.put([self._txn_kv('check-session', self.leader_path, Session=self._session)] + batch)
+        self.operation_stats.save_rpcs(len(batch) - 1)
+        return True
+
+    def update_leader(self, cluster: Cluster, last_lsn: Optional[int],
+                      slots: Optional[Dict[str, int]] = None, failsafe: Optional[Dict[str, str]] = None) -> bool:
+        """Update session TTL, ``/status``, ``/optime/leader`` and ``/failsafe`` keys.
+
+        .. note::
+            Unless ``batch_writes`` is disabled, writes to ``/status``, ``/optime/leader`` and ``/failsafe`` keys
+            are collected while the :meth:`~AbstractDCS.update_leader` is running and executed afterwards with a
+            single transaction. If it fails, values are written again on the next HA cycle.
+
+        :param cluster: :class:`Cluster` object with information about the current cluster state.
+        :param last_lsn: absolute WAL LSN in bytes.
+        :param slots: dictionary with permanent slots ``confirmed_flush_lsn``.
+        :param failsafe: if defined dictionary passed to :meth:`~AbstractDCS.write_failsafe`.
+
+        :returns: ``True`` if session TTL has been updated successfully.
+        """
+        if not self._batch_writes:
+            return super(Consul, self).update_leader(cluster, last_lsn, slots, failsafe)
+
+        last_written = self._last_status, self._last_failsafe, self._last_lsn
+        batch: Optional[List[Dict[str, Any]]] = []
+        self._write_batch = batch
+        try:
+            ret = super(Consul, self).update_leader(cluster, last_lsn, slots, failsafe)
+            if batch and not self._commit_write_batch(batch):
+                logger.warning('Failed to write %s keys with a single transaction',
+                               ', '.join(op['KV']['Key'] for op in batch))
+                batch = None
+        except Exception:
+            batch = None
+            raise
+        finally:
+            self._write_batch = None
+            if batch is None:
+                # make sure that values will be written again on the next HA cycle
+                self._last_status, self._last_failsafe, self._last_lsn = last_written
+        return ret
 
     @staticmethod
     def _run_and_handle_exceptions(method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
@@ -648,11 +1019,19 @@ class Consul(AbstractDCS):
             retry.ensure_deadline(1, ConsulError('update_leader timeout'))
 
             logger.warning('Recreating the leader key due to session mismatch')
-            self._run_and_handle_exceptions(self._client.kv.delete, self.leader_path, cas=leader.version)
+            if self._batch_writes:
+                # delete and create the key atomically
+                self._run_and_handle_exceptions(self._client.txn.put, [
+                    self._txn_kv('delete-cas', self.leader_path, Index=int(leader.version)),
+                    self._txn_kv('lock', self.leader_path, self._name, Session=self._session)])
+                self.operation_stats.save_rpcs(1)
+            else:
+                self._run_and_handle_exceptions(self._client.kv.delete, self.leader_path, cas=leader.version)
 
-            retry.ensure_deadline(0.5, ConsulError('update_leader timeout'))
+                retry.ensure_deadline(0.5, ConsulError('update_leader timeout'))
 
-            self._run_and_handle_exceptions(self._client.kv.put, self.leader_path, self._name, acquire=self._session)
+                self._run_and_handle_exceptions(self._client.kv.put, self.leader_path, self._name,
+                                                acquire=self._session)
 
         return bool(self._session)
 
@@ -679,6 +1058,17 @@ class Consul(AbstractDCS):
 
     @catch_consul_errors
     def set_sync_state_value(self, value: str, version: Optional[int] = None) -> Union[int, bool]:
+        if self._batch_writes:
+            # the response of the transaction contains the new ModifyIndex, the key doesn't need to be read back
+            operation = self._txn_kv('set', self.sync_path, value) if version is None\
+                else self._txn_kv('cas', self.sync_path, value, Index=int(version))
+            ret = self.retry(self._client.txn.put, [operation])
+            results = ret and ret.get('Results') or []
+            if results:
+                self.operation_stats.save_rpcs(1)
+                return results[0]['KV']['ModifyIndex']
+            return False
+
         retry = self._retry.copy()
         ret = retry(self._client.kv.put, self.sync_path, value, cas=version)
         if ret:  # We have no other choice, only read after write :(
@@ -699,7 +1089,8 @@ class Consul(AbstractDCS):
             self.__do_not_watch = False
             return True
 
-        if leader_version:
+        # with the cache the HA loop is woken up by the cache thread
+        if leader_version and not self._cache:
             end_time = time.time() + timeout
             while timeout >= 1:
                 try:
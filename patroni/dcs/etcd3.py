@@ -9,8 +9,9 @@ import time
 
 from collections import defaultdict
 from enum import IntEnum
+from http.client import HTTPResponse
 from threading import Condition, Lock, Thread
-from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Tuple, Type, TYPE_CHECKING, Union
+from typing import Any, Callable, cast, Collection, Dict, Iterator, List, Optional, Tuple, Type, TYPE_CHECKING, Union
 
 import etcd
 import urllib3
@@ -20,10 +21,10 @@ from urllib3.exceptions import ProtocolError, ReadTimeoutError
 from ..collections import EMPTY_DICT
 from ..exceptions import DCSError, PatroniException
 from ..postgresql.mpp import AbstractMPP
-from ..utils import deep_compare, enable_keepalive, iter_response_objects, \
-    parse_bool, RetryFailedError, USER_AGENT, WHITESPACE_RE
+from ..utils import deep_compare, enable_keepalive, iter_json_objects, \
+    iter_response_objects, parse_bool, RetryFailedError, USER_AGENT, WHITESPACE_RE
 from . import catch_return_false_exception, Cluster, ClusterConfig, \
-    Failover, Leader, Member, Status, SyncState, TimelineHistory
+    ClusterSnapshots, Failover, Leader, Member, Status, SyncState, TimelineHistory
 from .etcd import AbstractEtcd, AbstractEtcdClientWithFailover, catch_etcd_errors, \
     DnsCachingResolver, Retry, StaleEtcdNode, StaleEtcdNodeGuard
 
@@ -198,6 +199,23 @@ def prefix_range_end(v: str) -> bytes:
     return bytes(ret)
 
 
+def shutdown_socket(conn_sock: Any) -> None:
+    """Shut down and close the socket of a streaming connection to interrupt blocking reads from another thread.
+
+    :param conn_sock: socket object of the connection.
+    """
+    # python-etcd forces usage of pyopenssl if the last one is available.
+    # In this case HTTPConnection.socket is not inherited from socket.socket, but urllib3 uses custom
+    # class `WrappedSocket`, which shutdown() method could be incompatible with socket.shutdown().
+    # Therefore we use WrappedSocket.socket, which points to original `socket` object.
+    sock: socket.socket = conn_sock.socket if conn_sock.__class__.__name__ == 'WrappedSocket' else conn_sock
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+        sock.close()
+    except Exception as e:
+        logger.debug('Error on socket.shutdown: %r', e)
+
+
 def base64_encode(v: Union[str, bytes]) -> str:
     return base64.b64encode(to_bytes(v)).decode('utf-8')
 
@@ -476,6 +494,20 @@ class Etcd3Client(AbstractEtcdClientWithFailover):
         ret = self.call_rpc('/kv/txn', fields, retry)
         return ret if failure or ret.get('succeeded') else {}
 
+    @_handle_auth_errors
+    def txn_batch(self, compare: Dict[str, Any], success: List[Dict[str, Any]],
+                  *, retry: Optional[Retry] = None) -> Dict[str, Any]:
+        """Execute all *success* requests in a single transaction if the *compare* holds.
+
+        :param compare: condition guarding the transaction.
+        :param success: list of ``request_put`` and ``request_delete_range`` requests.
+        :param retry: optional :class:`Retry` object.
+
+        :returns: response of the transaction if it succeeded, otherwise an empty :class:`dict`.
+        """
+        ret = self.call_rpc('/kv/txn', {'compare': [compare], 'success': success}, retry)
+        return ret if ret.get('succeeded') else {}
+
     @_handle_auth_errors
     def put(self, key: str, value: str, lease: Optional[str] = None, create_revision: Optional[str] = None,
             mod_revision: Optional[str] = None, *, retry: Optional[Retry] = None) -> Dict[str, Any]:
@@ -503,6 +535,24 @@ class Etcd3Client(AbstractEtcdClientWithFailover):
     def deleteprefix(self, key: str, *, retry: Optional[Retry] = None) -> Dict[str, Any]:
         return self.deleterange(key, prefix_range_end(key), retry=retry)
 
+    def watch(self, requests: List[Dict[str, Any]],
+              read_timeout: Optional[float] = None) -> urllib3.response.HTTPResponse:
+        """Open a single ``/watch`` stream with one watcher per create request.
+
+        Etcd allows to create multiple watchers on the same stream, the gRPC-gateway reads create requests one by
+        one from the request body and events of all watchers are sent back in the same response.
+
+        :param requests: ``create_request`` objects.
+        :param read_timeout: read timeout of the stream.
+
+        :returns: response object.
+        """
+        kwargs = self._prepare_common_parameters(1, self.read_timeout)
+        request_executor = self._prepare_request(kwargs, {})
+        kwargs['body'] = ''.join(json.dumps({'create_request': params}) for params in requests)
+        kwargs.update(timeout=urllib3.Timeout(connect=kwargs['timeout'], read=read_timeout), retries=0)
+        return request_executor(self._MPOST, self._base_uri + self.version_prefix + '/watch', **kwargs)
+
     def watchrange(self, key: str, range_end: Union[bytes, str, None] = None,
                    start_revision: Optional[str] = None, filters: Optional[List[Dict[str, Any]]] = None,
                    read_timeout: Optional[float] = None) -> urllib3.response.HTTPResponse:
@@ -511,10 +561,7 @@ class Etcd3Client(AbstractEtcdClientWithFailover):
         if start_revision is not None:
             params['start_revision'] = start_revision
         params['filters'] = filters or []
-        kwargs = self._prepare_common_parameters(1, self.read_timeout)
-        request_executor = self._prepare_request(kwargs, {'create_request': params})
-        kwargs.update(timeout=urllib3.Timeout(connect=kwargs['timeout'], read=read_timeout), retries=0)
-        return request_executor(self._MPOST, self._base_uri + self.version_prefix + '/watch', **kwargs)
+        return self.watch([params], read_timeout)
 
     def watchprefix(self, key: str, start_revision: Optional[str] = None,
                     filters: Optional[List[Dict[str, Any]]] = None,
@@ -523,6 +570,12 @@ class Etcd3Client(AbstractEtcdClientWithFailover):
 
 
 class KVCache(StaleEtcdNodeGuard, Thread):
+    """Cache of keys under one or more prefixes, kept up to date with a single ``/watch`` stream.
+
+    Besides :attr:`Etcd3.cluster_prefix` more prefixes could be added with :meth:`add_prefix`, for example the
+    coordinator cluster on MPP workers. Every prefix gets its own watcher, but all of them are multiplexed over the
+    same stream, therefore watching another cluster doesn't cost another connection or periodic range reads.
+    """
 
     def __init__(self, dcs: 'Etcd3', client: 'PatroniEtcd3Client') -> None:
         Thread.__init__(self)
@@ -536,6 +589,7 @@ class KVCache(StaleEtcdNodeGuard, Thread):
         self._optime_key = base64_encode(dcs.leader_optime_path)
         self._status_key = base64_encode(dcs.status_path)
         self._name = base64_encode(getattr(dcs, '_name'))  # pyright
+        self._prefixes = [dcs.cluster_prefix]
         self._is_ready = False
         self._response = None
         self._response_lock = Lock()
@@ -612,7 +666,7 @@ class KVCache(StaleEtcdNodeGuard, Thread):
         finally:
             response.release_conn()
 
-    def _do_watch(self, revision: str) -> None:
+    def _do_watch(self, revisions: Dict[str, str]) -> None:
         with self._response_lock:
             self._response = None
         # We do most of requests with timeouts. The only exception /watch requests to Etcd v3.
@@ -622,7 +676,9 @@ class KVCache(StaleEtcdNodeGuard, Thread):
         # Setting it to lower value is not nice because for idling clusters it will increase
         # the numbers of interrupts and reconnects.
         read_timeout = self._dcs.ttl if os.name == 'nt' else None
-        response = self._client.watchprefix(self._dcs.cluster_prefix, revision, read_timeout=read_timeout)
+        requests = [{**build_range_request(prefix, prefix_range_end(prefix)), 'start_revision': revision}
+                    for prefix, revision in revisions.items()]
+        response = self._client.watch(requests, read_timeout=read_timeout)
         with self._response_lock:
             if self._response is None:
                 self._response = response
@@ -634,18 +690,22 @@ class KVCache(StaleEtcdNodeGuard, Thread):
             self._process_message(message)
 
     def _build_cache(self) -> None:
-        result = self._dcs.retry(self._client.prefix, self._dcs.cluster_prefix)
-        header = result.get('header', EMPTY_DICT)
+        with self.condition:
+            prefixes = self._prefixes[:]
+        results = [self._dcs.retry(self._client.prefix, prefix) for prefix in prefixes]
         with self._object_cache_lock:
             self._reset_cluster_raft_term()
-            self._object_cache = {node['key']: node for node in result.get('kvs', [])}
-            self._check_cluster_raft_term(header.get('cluster_id'), header.get('raft_term'))
+            self._object_cache = {node['key']: node for result in results for node in result.get('kvs', [])}
+            for result in results:
+                header = result.get('header', EMPTY_DICT)
+                self._check_cluster_raft_term(header.get('cluster_id'), header.get('raft_term'))
         with self.condition:
-            self._is_ready = True
+            # the list of prefixes could have been changed while we were reading them
+            self._is_ready = self._prefixes == prefixes
             self.condition.notify()
 
         try:
-            self._do_watch(result['header']['revision'])
+            self._do_watch({prefix: result['header']['revision'] for prefix, result in zip(prefixes, results)})
         except Etcd3WatchCanceled:
             logger.info('Watch request canceled')
         except Exception as e:
@@ -679,16 +739,32 @@ class KVCache(StaleEtcdNodeGuard, Thread):
             else:
                 self._response = False
         if conn_sock:
-            # python-etcd forces usage of pyopenssl if the last one is available.
-            # In this case HTTPConnection.socket is not inherited from socket.socket, but urllib3 uses custom
-            # class `WrappedSocket`, which shutdown() method could be incompatible with socket.shutdown().
-            # Therefore we use WrappedSocket.socket, which points to original `socket` object.
-            sock: socket.socket = conn_sock.socket if conn_sock.__class__.__name__ == 'WrappedSocket' else conn_sock
-            try:
-                sock.shutdown(socket.SHUT_RDWR)
-                sock.close()
-            except Exception as e:
-                logger.debug('Error on socket.shutdown: %r', e)
+            shutdown_socket(conn_sock)
+
+    def covers(self, path: str) -> bool:
+        """Check whether keys under the *path* are kept in the cache.
+
+        :param path: path in DCS.
+
+        :returns: ``True`` if *path* is under one of watched prefixes.
+        """
+        with self.condition:
+            return any(path.startswith(prefix) for prefix in self._prefixes)
+
+    def add_prefix(self, prefix: str) -> None:
+        """Start watching keys under the *prefix*.
+
+        The stream is restarted, so that the watcher for the new *prefix* is created on the same stream.
+
+        :param prefix: path in DCS.
+        """
+        with self.condition:
+            if any(prefix.startswith(p) for p in self._prefixes):
+                return
+            logger.info('Adding %s to watched prefixes', prefix)
+            self._prefixes = [p for p in self._prefixes if not p.startswith(prefix)] + [prefix]
+            self._is_ready = False
+        self.kill_stream()
 
     def is_ready(self) -> bool:
         """Must be called only when holding the lock on `condition`"""
@@ -701,10 +777,174 @@ class KVCache(StaleEtcdNodeGuard, Thread):
         return self._is_ready
 
 
+class LeaseKeepAliveStream(Thread):
+    """Keep leases alive with a single long-lived ``/lease/keepalive`` stream.
+
+    Etcd gRPC-gateway supports bidirectional streaming over HTTP/1.1: keepalive requests are written as chunks of
+    the request body and responses are read from the chunked response. Therefore refreshing the lease doesn't cost
+    a new HTTP request. The thread connects when the first lease is known and reads responses, while requests are
+    sent by :meth:`keepalive` from the HA loop.
+
+    Every response contains the TTL of the lease, which allows to know how much time is left before it expires.
+    """
+
+    def __init__(self, dcs: 'Etcd3', client: 'PatroniEtcd3Client') -> None:
+        """Create and start the :class:`LeaseKeepAliveStream` thread.
+
+        :param dcs: reference to the :class:`Etcd3` object.
+        :param client: reference to the :class:`PatroniEtcd3Client` object used to connect.
+        """
+        super(LeaseKeepAliveStream, self).__init__()
+        self.daemon = True
+        self._dcs = dcs
+        self._client = client
+        self.condition = Condition()
+        self._send_lock = Lock()
+        self._conn: Any = None
+        self._is_ready = False
+        self._lease: Optional[str] = None
+        self._responses = 0
+        self._ttl: Optional[str] = None
+        self._expires = 0.0
+        self.start()
+
+    def _send(self, conn: Any, lease: str) -> None:
+        """Write a keepalive request for the *lease* as a chunk of the request body.
+
+        :param conn: connection of the stream.
+        :param lease: ID of the lease.
+        """
+        data = json.dumps({'ID': lease}).encode('utf-8')
+        with self._send_lock:
+            conn.send('{0:x}\r\n'.format(len(data)).encode('utf-8') + data + b'\r\n')
+
+    def _connect(self, lease: str) -> Tuple[Any, HTTPResponse]:
+        """Open the stream and send the first keepalive request for the *lease*.
+
+        :param lease: ID of the lease.
+
+        :returns: the connection and the response object with status and headers already read.
+        """
+        pool = self._client.http.connection_from_url(getattr(self._client, '_base_uri'))
+        conn = pool._new_conn()  # pyright: ignore [reportPrivateUsage]
+        conn.connect()
+        conn.putrequest('POST', self._client.version_prefix + '/lease/keepalive', skip_accept_encoding=True)
+        headers = {**self._client._get_headers(),  # pyright: ignore [reportPrivateUsage]
+                   'Content-Type': 'application/json', 'Transfer-Encoding': 'chunked'}
+        for name, value in headers.items():
+            conn.putheader(name, value)
+        conn.endheaders()
+        with self.condition:
+            self._conn = conn
+        self._send(conn, lease)
+        # headers must come with the response to the first request, otherwise we would wait for them forever,
+        # because the stream isn't ready and :meth:`keepalive` doesn't kill it.
+        conn.sock.settimeout(self._client.read_timeout)
+        response = HTTPResponse(conn.sock, method='POST')
+        response.begin()
+        # further responses are only expected after requests, the HA loop takes care of timeouts.
+        conn.sock.settimeout(None)
+        if response.status != 200:
+            raise _raise_for_data(response.read(), response.status)
+        return conn, response
+
+    def _process_message(self, message: Dict[str, Any]) -> None:
+        """Remember the TTL reported in the keepalive response *message* and wake up waiting :meth:`keepalive`.
+
+        :param message: keepalive response.
+        """
+        logger.debug('Received message: %s', message)
+        if 'error' in message:
+            raise _raise_for_data(message)
+        result = message.get('result', EMPTY_DICT)
+        self._client._check_cluster_raft_term(  # pyright: ignore [reportPrivateUsage]
+            result.get('header', EMPTY_DICT).get('cluster_id'), result.get('header', EMPTY_DICT).get('raft_term'))
+        with self.condition:
+            # TTL is not present in the response if the lease doesn't exist anymore
+            self._ttl = result.get('TTL')
+            self._expires = time.time() + int(self._ttl or 0)
+            self._responses += 1
+            self.condition.notify_all()
+
+    def _do_stream(self) -> None:
+        """Wait for a lease, open the stream and process responses until it is closed."""
+        with self.condition:
+            while not self._lease:
+                self.condition.wait()
+            lease = self._lease
+        conn, response = self._connect(lease)
+        try:
+            with self.condition:
+                self._is_ready = True
+            for message in iter_json_objects(iter(lambda: response.read1(65536), b'')):
+                self._process_message(message)
+        finally:
+            with self.condition:
+                self._is_ready = False
+                self._conn = None
+                self.condition.notify_all()
+            conn.close()
+
+    def run(self) -> None:
+        while True:
+            try:
+                self._do_stream()
+            except Exception as e:
+                logger.error('lease keepalive stream failed: %r', e)
+            time.sleep(1)
+
+    def kill_stream(self) -> None:
+        """Interrupt the stream, it will be reopened by the thread."""
+        with self.condition:
+            conn = self._conn
+        if conn and conn.sock:
+            shutdown_socket(conn.sock)
+
+    def keepalive(self, lease: str, timeout: float) -> Union[str, None, bool]:
+        """Refresh the *lease* via the stream.
+
+        :param lease: ID of the lease.
+        :param timeout: how long to wait for the response.
+
+        :returns: TTL of the lease, ``None`` if the lease doesn't exist anymore, or ``False`` if the stream
+                  is not available and unary ``/lease/keepalive`` request must be used instead.
+        """
+        with self.condition:
+            if self._lease != lease:
+                self._lease = lease
+                self.condition.notify_all()
+            if not self._is_ready:
+                return False
+            conn, responses = self._conn, self._responses
+        try:
+            self._send(conn, lease)
+        except Exception as e:
+            logger.error('Failed to send lease keepalive: %r', e)
+        else:
+            stop_time = time.time() + timeout
+            with self.condition:
+                while self._is_ready and self._responses == responses and time.time() < stop_time:
+                    self.condition.wait(stop_time - time.time())
+                if self._responses != responses:
+                    return self._ttl
+            logger.warning('Did not get lease keepalive response in %s seconds', timeout)
+        self.kill_stream()
+        return False
+
+    @property
+    def ttl_remaining(self) -> Optional[float]:
+        """Time in seconds left before the lease expires, or ``None`` if unknown."""
+        with self.condition:
+            if self._is_ready and self._ttl:
+                return max(0.0, self._expires - time.time())
+        return None
+
+
 class PatroniEtcd3Client(Etcd3Client):
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self._kv_cache = None
+        self._lease_stream = None
         super(PatroniEtcd3Client, self).__init__(*args, **kwargs)
 
     def configure(self, etcd3: 'Etcd3') -> None:
@@ -714,9 +954,14 @@ class PatroniEtcd3Client(Etcd3Client):
         if self._cluster_version >= (3, 1):
             self._kv_cache = KVCache(self._etcd3, self)
 
+    def start_lease_stream(self) -> None:
+        self._lease_stream = LeaseKeepAliveStream(self._etcd3, self)
+
     def _restart_watcher(self) -> None:
         if self._kv_cache:
             self._kv_cache.kill_stream()
+        if self._lease_stream:
+            self._lease_stream.kill_stream()
 
     def set_base_uri(self, value: str) -> None:
         super(PatroniEtcd3Client, self).set_base_uri(value)
@@ -731,24 +976,41 @@ class PatroniEtcd3Client(Etcd3Client):
             self._kv_cache.condition.wait(timeout)
 
     def get_cluster(self, path: str) -> List[Dict[str, Any]]:
-        if self._kv_cache and path.startswith(self._etcd3.cluster_prefix):
+        if self._kv_cache and self._kv_cache.covers(path):
             with self._kv_cache.condition:
                 self._wait_cache(self.read_timeout)
                 ret = self._kv_cache.copy()
         else:
+            # keys of other clusters are also cached from now on, watchers share the same stream
+            if self._kv_cache:
+                self._kv_cache.add_prefix(path)
             serializable = not getattr(self._etcd3, '_ctl')  # use linearizable for patronictl
             ret = self._etcd3.retry(self.prefix, path, serializable).get('kvs', [])
         for node in ret:
-            node.update({'key': base64_decode(node['key']),
-                         'value': base64_decode(node.get('value', '')),
-                         'lease': node.get('lease')})
+            node['key'] = base64_decode(node['key'])
+        # the cache could also contain keys of other watched prefixes
+        ret = [node for node in ret if node['key'].startswith(path)]
+        for node in ret:
+            node.update({'value': base64_decode(node.get('value', '')), 'lease': node.get('lease')})
         return ret
 
+    def lease_keepalive(self, ID: str, *, retry: Optional[Retry] = None) -> Optional[str]:
+        if self._lease_stream:
+            ttl = self._lease_stream.keepalive(ID, self.read_timeout)
+            if ttl is not False:
+                return cast(Optional[str], ttl)
+        return super(PatroniEtcd3Client, self).lease_keepalive(ID, retry=retry)
+
+    @property
+    def lease_ttl_remaining(self) -> Optional[float]:
+        return self._lease_stream.ttl_remaining if self._lease_stream else None
+
     def call_rpc(self, method: str, fields: Dict[str, Any], retry: Optional[Retry] = None) -> Dict[str, Any]:
         ret = super(PatroniEtcd3Client, self).call_rpc(method, fields, retry)
 
         if self._kv_cache:
-            value = delete = None
+            values: List[Dict[str, Any]] = []
+            deletes: List[Dict[str, Any]] = []
             # For the 'failure' case we only support a second (nested) transaction that attempts to
             # update/delete the same keys. Anything more complex than that we don't need and therefore it doesn't
             # make sense to write a universal response analyzer and we can just check expected JSON path.
@@ -756,19 +1018,23 @@ class PatroniEtcd3Client(Etcd3Client):
                     and (ret.get('succeeded') or 'failure' in fields and 'request_txn' in fields['failure'][0]
                          and ret.get('responses', [{'response_txn': {'succeeded': False}}])[0]
                          .get('response_txn', {}).get('succeeded')):
-                on_success = fields['success'][0]
-                value = on_success.get('request_put')
-                delete = on_success.get('request_delete_range')
+                # batched transactions (see `txn_batch()`) have more than one request on success
+                for on_success in fields['success']:
+                    if 'request_put' in on_success:
+                        values.append(on_success['request_put'])
+                    elif 'request_delete_range' in on_success:
+                        deletes.append(on_success['request_delete_range'])
             elif method == '/kv/put' and ret:
-                value = fields
+                values.append(fields)
             elif method == '/kv/deleterange' and ret:
-                delete = fields
+                deletes.append(fields)
 
-            if value:
+            for value in values:
                 value['mod_revision'] = ret['header']['revision']
                 self._kv_cache.set(value)
-            elif delete and 'range_end' not in delete:
-                self._kv_cache.delete(delete['key'], ret['header']['revision'])
+            for delete in deletes:
+                if 'range_end' not in delete:
+                    self._kv_cache.delete(delete['key'], ret['header']['revision'])
 
         return ret
 
@@ -787,13 +1053,18 @@ class Etcd3(AbstractEtcd):
 
     def __init__(self, config: Dict[str, Any], mpp: AbstractMPP) -> None:
         super(Etcd3, self).__init__(config, mpp, PatroniEtcd3Client, (DeadlineExceeded, FailedPrecondition))
+        self._cluster_snapshots = ClusterSnapshots()
         self.__do_not_watch = False
         self._lease = None
         self._last_lease_refresh = 0
+        self._batch_writes = parse_bool(config.get('batch_writes', True)) is not False
+        self._write_batch: Optional[List[Dict[str, Any]]] = None
 
         self._client.configure(self)
         if not self._ctl:
             self._client.start_watcher()
+            if parse_bool(config.get('lease_keepalive_stream')):
+                self._client.start_lease_stream()
             self.create_lease()
 
     @property
@@ -828,6 +1099,10 @@ class Etcd3(AbstractEtcd):
         self._last_lease_refresh = time.time()
         return ret
 
+    @property
+    def lease_ttl_remaining(self) -> Optional[float]:
+        return self._client.lease_ttl_remaining
+
     def refresh_lease(self) -> bool:
         try:
             return self.retry(self._do_refresh_lease)
@@ -877,9 +1152,6 @@ class Etcd3(AbstractEtcd):
 
         # get leader
         leader = nodes.get(self._LEADER)
-        if not self._ctl and leader and leader['value'] == self._name and self._lease != leader.get('lease'):
-            logger.warning('I am the leader but not owner of the lease')
-
         if leader:
             member = Member(-1, leader['value'], None, {})
             member = ([m for m in members if m.name == leader['value']] or [member])[0]
@@ -903,6 +1175,23 @@ class Etcd3(AbstractEtcd):
 
         return Cluster(initialize, config, leader, status, members, failover, sync, history, failsafe)
 
+    def _cluster_snapshot(self, path: str, nodes: Dict[str, Any]) -> Cluster:
+        """Get the :class:`Cluster` object built from *nodes*.
+
+        The object built on the previous call for the same *path* is reused if no node was changed, added or removed.
+
+        :param path: the path in DCS where *nodes* were loaded from.
+        :param nodes: nodes of the cluster, keys are relative to *path*.
+
+        :returns: :class:`Cluster` instance.
+        """
+        leader = nodes.get(self._LEADER)
+        if not self._ctl and leader and leader['value'] == self._name and self._lease != leader.get('lease'):
+            logger.warning('I am the leader but not owner of the lease')
+
+        revisions = frozenset((key, node['mod_revision']) for key, node in nodes.items())
+        return self._cluster_snapshots.get(path, revisions, lambda: self._cluster_from_nodes(nodes))
+
     def _postgresql_cluster_loader(self, path: str) -> Cluster:
         """Load and build the :class:`Cluster` object from DCS, which represents a single PostgreSQL cluster.
 
@@ -913,7 +1202,7 @@ class Etcd3(AbstractEtcd):
         nodes = {node['key'][len(path):]: node
                  for node in self._client.get_cluster(path)
                  if node['key'].startswith(path)}
-        return self._cluster_from_nodes(nodes)
+        return self._cluster_snapshot(path, nodes)
 
     def _mpp_cluster_loader(self, path: str) -> Dict[int, Cluster]:
         """Load and build all PostgreSQL clusters from a single MPP cluster.
@@ -928,7 +1217,9 @@ class Etcd3(AbstractEtcd):
             key = node['key'][len(path):].split('/', 1)
             if len(key) == 2 and self._mpp.group_re.match(key[0]):
                 clusters[int(key[0])][key[1]] = node
-        return {group: self._cluster_from_nodes(nodes) for group, nodes in clusters.items()}
+        paths = {group: '{0}{1}/'.format(path, group) for group in clusters}
+        self._cluster_snapshots.retain(path, paths.values())
+        return {group: self._cluster_snapshot(paths[group], nodes) for group, nodes in clusters.items()}
 
     def _load_cluster(
             self, path: str, loader: Callable[[str], Union[Cluster, Dict[int, Cluster]]]
@@ -1015,17 +1306,85 @@ class Etcd3(AbstractEtcd):
     def set_config_value(self, value: str, version: Optional[str] = None) -> bool:
         return bool(self._client.put(self.config_path, value, mod_revision=version))
 
+    def _put_or_batch(self, key: str, value: str) -> bool:
+        """Write *value* to the *key* or add it to the write batch if one is being collected.
+
+        :param key: key to write.
+        :param value: value to write.
+
+        :returns: ``True`` if the *value* was written or added to the batch.
+        """
+        if self._write_batch is not None:
+            self._write_batch.append({'request_put': {'key': base64_encode(key), 'value': base64_encode(value)}})
+            return True
+        return bool(self._client.put(key, value))
+
     @catch_etcd_errors
     def _write_leader_optime(self, last_lsn: str) -> bool:
-        return bool(self._client.put(self.leader_optime_path, last_lsn))
+        return self._put_or_batch(self.leader_optime_path, last_lsn)
 
     @catch_etcd_errors
     def _write_status(self, value: str) -> bool:
-        return bool(self._client.put(self.status_path, value))
+        return self._put_or_batch(self.status_path, value)
 
     @catch_etcd_errors
     def _write_failsafe(self, value: str) -> bool:
-        return bool(self._client.put(self.failsafe_path, value))
+        return self._put_or_batch(self.failsafe_path, value)
+
+    @catch_etcd_errors
+    def _commit_write_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        """Execute all writes collected in the *batch* with a single transaction.
+
+        The transaction is guarded by the comparison of the leader key value with our name, so that keys maintained
+        by the leader are not overwritten if somebody else took the leader lock in the meantime.
+
+        :param batch: list of ``request_put`` requests.
+
+        :returns: ``True`` if the transaction succeeded.
+        """
+        compare = {'key': base64_encode(self.leader_path), 'target': 'VALUE', 'value': base64_encode(self._name)}
+        ret = bool(self._client.txn_batch(compare, batch))
+        if ret:
+            self.operation_stats.save_rpcs(len(batch) - 1)
+        return ret
+
+    def update_leader(self, cluster: Cluster, last_lsn: Optional[int],
+                      slots: Optional[Dict[str, int]] = None, failsafe: Optional[Dict[str, str]] = None) -> bool:
+        """Update leader key TTL, ``/status``, ``/optime/leader`` and ``/failsafe`` keys.
+
+        .. note::
+            Unless ``batch_writes`` is disabled, writes to ``/status``, ``/optime/leader`` and ``/failsafe`` keys
+            are collected while the :meth:`~AbstractDCS.update_leader` is running and executed afterwards with a
+            single transaction. If it fails, values are written again on the next HA cycle.
+
+        :param cluster: :class:`Cluster` object with information about the current cluster state.
+        :param last_lsn: absolute WAL LSN in bytes.
+        :param slots: dictionary with permanent slots ``confirmed_flush_lsn``.
+        :param failsafe: if defined dictionary passed to :meth:`~AbstractDCS.write_failsafe`.
+
+        :returns: ``True`` if leader key TTL has been updated successfully.
+        """
+        if not self._batch_writes:
+            return super(Etcd3, self).update_leader(cluster, last_lsn, slots, failsafe)
+
+        last_written = self._last_status, self._last_failsafe, self._last_lsn
+        batch: Optional[List[Dict[str, Any]]] = []
+        self._write_batch = batch
+        try:
+            ret = super(Etcd3, self).update_leader(cluster, last_lsn, slots, failsafe)
+            if batch and not self._commit_write_batch(batch):
+                logger.warning('Failed to write %s keys with a single transaction',
+                               ', '.join(base64_decode(r['request_put']['key']) for r in batch))
+                batch = None
+        except Exception:
+            batch = None
+            raise
+        finally:
+            self._write_batch = None
+            if batch is None:
+                # make sure that values will be written again on the next HA cycle
+                self._last_status, self._last_failsafe, self._last_lsn = last_written
+        return ret
 
     @catch_return_false_exception
     def _update_leader(self, leader: Leader) -> bool:
@@ -27,7 +27,8 @@ from ..postgresql.misc import PostgresqlRole, PostgresqlState
 from ..postgresql.mpp import AbstractMPP
 from ..utils import deep_compare, iter_response_objects, \
     keepalive_socket_options, Retry, RetryFailedError, tzutc, uri, USER_AGENT
-from . import AbstractDCS, Cluster, ClusterConfig, Failover, Leader, Member, Status, SyncState, TimelineHistory
+from . import AbstractDCS, Cluster, ClusterConfig, ClusterSnapshots, \
+    Failover, Leader, Member, Status, SyncState, TimelineHistory
 
 if TYPE_CHECKING:  # pragma: no cover
     from ..config import Config
@@ -440,18 +441,22 @@ class K8sClient(object):
 
         def call_api(self, method: str, path: str, headers: Optional[Dict[str, str]] = None,
                      body: Optional[Any] = None, _retry: Optional[Retry] = None, _preload_content: bool = True,
-                     _request_timeout: Optional[float] = None, **kwargs: Any) -> Union[urllib3.HTTPResponse, K8sObject]:
+                     _request_timeout: Optional[float] = None, _api_url_prefix: Optional[str] = None,
+                     **kwargs: Any) -> Union[urllib3.HTTPResponse, K8sObject]:
             headers = self._make_headers(headers)
             fields = {to_camel_case(k): v for k, v in kwargs.items()}  # resource_version => resourceVersion
             body = json.dumps(body, default=lambda o: o.to_dict()) if body is not None else None
 
-            response = self.request(_retry, method, self._API_URL_PREFIX + path, headers=headers, fields=fields,
+            path = (_api_url_prefix or self._API_URL_PREFIX) + path
+            response = self.request(_retry, method, path, headers=headers, fields=fields,
                                     body=body, preload_content=_preload_content, timeout=_request_timeout)
 
             return self._handle_server_response(response, _preload_content)
 
     class CoreV1Api(object):
 
+        _API_URL_PREFIX: Optional[str] = None  # the default of the ApiClient, i.e. /api/v1/namespaces/
+
         def __init__(self, api_client: Optional['K8sClient.ApiClient'] = None) -> None:
             self._api_client = api_client or k8s_client.ApiClient()
 
@@ -480,9 +485,14 @@ class K8sClient(object):
                 else:
                     body = None
 
-                return self._api_client.call_api(method, path, headers, body, **kwargs)
+                return self._api_client.call_api(method, path, headers, body,
+                                                 _api_url_prefix=self._API_URL_PREFIX, **kwargs)
             return wrapper
 
+    class CoordinationV1Api(CoreV1Api):
+
+        _API_URL_PREFIX = '/apis/coordination.k8s.io/v1/namespaces/'
+
     class _K8sObjectTemplate(K8sObject):
         """The template for objects which we create locally, e.g. k8s_client.V1ObjectMeta & co"""
         def __init__(self, **kwargs: Any) -> None:
@@ -526,6 +536,7 @@ class CoreV1ApiProxy(object):
     def __init__(self, use_endpoints: Optional[bool] = False, bypass_api_service: Optional[bool] = False) -> None:
         self._api_client = k8s_client.ApiClient(bypass_api_service)
         self._core_v1_api = k8s_client.CoreV1Api(self._api_client)
+        self._coordination_v1_api = k8s_client.CoordinationV1Api(self._api_client)
         self._use_endpoints = bool(use_endpoints)
         self._retriable_http_codes = set(self._DEFAULT_RETRIABLE_HTTP_CODES)
 
@@ -551,16 +562,18 @@ class CoreV1ApiProxy(object):
         Handles two important cases:
         1. Depending on whether Patroni is configured to work with `ConfigMaps` or `Endpoints`
            it remaps "virtual" method names from `*_kind` to `*_endpoints` or `*_config_map`.
+           Methods working with `Leases` are sent to `CoordinationV1Api`.
         2. It handles HTTP error codes and raises `KubernetesRetriableException`
            if the given error is supposed to be handled with retry."""
 
         if func.endswith('_kind'):
             func = func[:-4] + ('endpoints' if self._use_endpoints else 'config_map')
+        api = self._coordination_v1_api if func.endswith('_lease') else self._core_v1_api
 
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             retriable_http_codes = self._retriable_http_codes | set(kwargs.pop('_retriable_http_codes', None) or [])
             try:
-                return getattr(self._core_v1_api, func)(*args, **kwargs)
+                return getattr(api, func)(*args, **kwargs)
             except k8s_client.rest.ApiException as e:
                 if e.status in retriable_http_codes or e.headers and 'retry-after' in e.headers:
                     raise KubernetesRetriableException(e)
@@ -595,9 +608,17 @@ def catch_kubernetes_errors(func: Callable[..., Any]) -> Callable[..., Any]:
 
 
 class ObjectCache(Thread):
+    """Cache of K8s objects kept up to date by the watch.
+
+    The cache is filled by a LIST request and then the watch is started from its ``resourceVersion``. Watch requests
+    ask for bookmarks, therefore the last seen ``resourceVersion`` is kept moving forward even if none of watched
+    objects is changed. When the watch stream ends it is resumed from the last seen ``resourceVersion`` and the full
+    LIST is repeated only if K8s API reports that this version is too old (``410 Gone``), either by the response to
+    the watch request or by the ``ERROR`` event in the stream.
+    """
 
     def __init__(self, dcs: 'Kubernetes', func: Callable[..., Any], retry: Retry,
-                 condition: Condition, name: Optional[str] = None) -> None:
+                 condition: Condition, name: Optional[str] = None, kind: str = '') -> None:
         super(ObjectCache, self).__init__()
         self.daemon = True
         self._dcs = dcs
@@ -605,13 +626,19 @@ class ObjectCache(Thread):
         self._retry = retry
         self._condition = condition
         self._name = name  # name of this pod
+        self._kind = kind  # used as a label of metrics
         self._is_ready = False
+        self._resource_version: Optional[str] = None  # the last seen resourceVersion, None if LIST is required
+        self._listed = False
+        self._writes: Dict[str, float] = {}  # resourceVersion of objects written by us => time of the write
         self._response: Union[urllib3.HTTPResponse, bool, None] = None  # needs to be accessible from the `kill_stream`
         self._response_lock = Lock()  # protect the `self._response` from concurrent access
         self._object_cache: Dict[str, K8sObject] = {}
         self._object_cache_lock = Lock()
         self._annotations_map = {self._dcs.leader_path: getattr(self._dcs, '_LEADER'),
                                  self._dcs.config_path: getattr(self._dcs, '_CONFIG')}  # pyright
+        # the object holding the leader lock, updates of it wake up the HA loop
+        self._leader_path = dcs.leader_path if not dcs.use_leases else dcs.lease_path if kind == 'leases' else None
         self.start()
 
     def _list(self) -> K8sObject:
@@ -622,8 +649,13 @@ class ObjectCache(Thread):
             raise
 
     def _watch(self, resource_version: str) -> urllib3.HTTPResponse:
-        return self._func(_request_timeout=(self._retry.deadline, urllib3.Timeout.DEFAULT_TIMEOUT),
-                          _preload_content=False, watch=True, resource_version=resource_version)
+        try:
+            return self._func(_request_timeout=(self._retry.deadline, urllib3.Timeout.DEFAULT_TIMEOUT),
+                              _preload_content=False, watch=True, resource_version=resource_version,
+                              allow_watch_bookmarks='true')
+        except Exception:
+            time.sleep(1)
+            raise
 
     def set(self, name: str, value: K8sObject) -> Tuple[bool, Optional[K8sObject]]:
         with self._object_cache_lock:
@@ -641,6 +673,21 @@ class ObjectCache(Thread):
                 del self._object_cache[name]
         return bool(not old_value or ret), old_value
 
+    def written(self, name: str, value: K8sObject) -> None:
+        """Put the object returned by a write request into the cache and remember when it was written.
+
+        The time passed until the watch delivers the event with the same ``resourceVersion`` is accounted as
+        the watch lag.
+
+        :param name: name of the object.
+        :param value: the object.
+        """
+        self.set(name, value)
+        with self._object_cache_lock:
+            if len(self._writes) >= 100:  # events for some writes might never come, i.e. if the watch was restarted
+                self._writes.clear()
+            self._writes[value.metadata.resource_version] = time.time()
+
     def copy(self) -> Dict[str, K8sObject]:
         with self._object_cache_lock:
             return self._object_cache.copy()
@@ -649,17 +696,39 @@ class ObjectCache(Thread):
         with self._object_cache_lock:
             return self._object_cache.get(name)
 
+    def _value(self, name: str, obj: K8sObject) -> Optional[str]:
+        """Get the value from the *obj* which changes should be tracked.
+
+        :param name: name of the object.
+        :param obj: the object.
+
+        :returns: the holder of the ``Lease`` or the value of the annotation for the leader and config objects.
+        """
+        if self._kind == 'leases':
+            return obj.spec and obj.spec.holder_identity
+        return (obj.metadata.annotations or EMPTY_DICT).get(self._annotations_map.get(name, ''))
+
     def _process_event(self, event: Dict[str, Any]) -> None:
         ev_type = event['type']
         obj = event['object']
-        name = obj['metadata']['name']
+        resource_version = obj['metadata'].get('resourceVersion')
+        if resource_version:
+            self._resource_version = resource_version
+            with self._object_cache_lock:
+                written = self._writes.pop(resource_version, None)
+            if written:
+                self._dcs.operation_stats.observe_watch_lag(self._kind, time.time() - written)
 
+        if ev_type == 'BOOKMARK':
+            return
+
+        name = obj['metadata']['name']
         new_value = None
         if ev_type in ('ADDED', 'MODIFIED'):
             obj = K8sObject(obj)
             success, old_value = self.set(name, obj)
             if success:
-                new_value = (obj.metadata.annotations or EMPTY_DICT).get(self._annotations_map.get(name, ''))
+                new_value = self._value(name, obj)
         elif ev_type == 'DELETED':
             success, old_value = self.delete(name, obj['metadata']['resourceVersion'])
         else:
@@ -667,7 +736,7 @@ class ObjectCache(Thread):
 
         if success and obj.get('kind') != 'Pod':
             if old_value:
-                old_value = (old_value.metadata.annotations or EMPTY_DICT).get(self._annotations_map.get(name, ''))
+                old_value = self._value(name, old_value)
 
             value_changed = old_value != new_value and \
                 (name != self._dcs.config_path or old_value is not None and new_value is not None)
@@ -676,7 +745,7 @@ class ObjectCache(Thread):
                 logger.debug('%s changed from %s to %s', name, old_value, new_value)
 
             # Do not wake up HA loop if we run as leader and received leader object update event
-            if value_changed or name == self._dcs.leader_path and self._name != new_value:
+            if value_changed or name == self._leader_path and self._name != new_value:
                 self._dcs.event.set()
 
     @staticmethod
@@ -686,32 +755,59 @@ class ObjectCache(Thread):
         finally:
             response.release_conn()
 
-    def _do_watch(self, resource_version: str) -> None:
+    def _do_watch(self, resource_version: str) -> bool:
+        """Watch for changes starting from the *resource_version* and apply them to the cache.
+
+        :param resource_version: the last seen ``resourceVersion``.
+
+        :returns: ``False`` if the *resource_version* is too old and the cache must be rebuilt with a LIST request,
+                  ``True`` if the watch could be resumed.
+        """
         with self._response_lock:
             self._response = None
-        response = self._watch(resource_version)
+        try:
+            response = self._watch(resource_version)
+        except k8s_client.rest.ApiException as e:
+            if e.status == 410:  # K8s API may reject the watch request itself if the version is too old
+                return False
+            raise
         with self._response_lock:
             if self._response is None:
                 self._response = response
 
         if not self._response:
-            return self._finish_response(response)
+            self._finish_response(response)
+            return True
+
+        with self._condition:
+            self._is_ready = True
+            self._condition.notify()
 
         for event in iter_response_objects(response):
             if event['object'].get('code') == 410:
+                return False
+            if event.get('type') == 'ERROR':
+                logger.warning('Watch failed: %s', event['object'].get('message'))
+                time.sleep(1)
                 break
             self._process_event(event)
+        return True
 
     def _build_cache(self) -> None:
-        objects = self._list()
-        with self._object_cache_lock:
-            self._object_cache = {item.metadata.name: item for item in objects.items}
-        with self._condition:
-            self._is_ready = True
-            self._condition.notify()
+        if not self._resource_version:
+            objects = self._list()
+            with self._object_cache_lock:
+                self._object_cache = {item.metadata.name: item for item in objects.items}
+                self._writes.clear()
+            self._resource_version = objects.metadata.resource_version
+            if self._listed:
+                self._dcs.operation_stats.relisted(self._kind)
+            self._listed = True
 
         try:
-            self._do_watch(objects.metadata.resource_version)
+            if not self._do_watch(self._resource_version):
+                logger.info('resourceVersion %s is too old, reloading %s', self._resource_version, self._kind)
+                self._resource_version = None
         finally:
             with self._condition:
                 self._is_ready = False
@@ -761,6 +857,14 @@ class Kubernetes(AbstractDCS):
         self._follower_label_value = config.get('follower_label_value', 'replica')
         self._standby_leader_label_value = config.get('standby_leader_label_value', 'primary')
         self._tmp_role_label = config.get('tmp_role_label')
+        self._use_leases = bool(config.get('use_leases'))
+        self._leader_optime_interval = int(config.get('leader_optime_interval') or 0)
+        self._leader_optime_delta = int(config.get('leader_optime_delta') or 0)
+        self._leader_optime_written_at = 0.0
+        self._use_status_config_map = bool(config.get('use_status_config_map'))
+        self._status_lsn_interval = int(config.get('status_lsn_interval') or 0)
+        self._status_lsn_delta = int(config.get('status_lsn_delta') or 0)
+        self._status_published_at = 0.0
         self._bootstrap_labels: Dict[str, str] = {str(k): str(v)
                                                   for k, v in (config.get('bootstrap_labels') or EMPTY_DICT).items()}
         self._ca_certs = os.environ.get('PATRONI_KUBERNETES_CACERT', config.get('cacert')) or SERVICE_CERT_FILENAME
@@ -792,17 +896,36 @@ class Kubernetes(AbstractDCS):
         self._leader_observed_record: Dict[str, str] = {}
         self._leader_observed_time = None
         self._leader_resource_version = None
+        self._cluster_snapshots = ClusterSnapshots()
         self.__do_not_watch = False
 
         self._condition = Condition()
 
         pods_func = functools.partial(self._api.list_namespaced_pod, self._namespace,
                                       label_selector=self._label_selector)
-        self._pods = ObjectCache(self, pods_func, self._retry, self._condition)
+        self._pods = ObjectCache(self, pods_func, self._retry, self._condition, kind='pods')
 
         kinds_func = functools.partial(self._api.list_namespaced_kind, self._namespace,
                                        label_selector=self._label_selector)
-        self._kinds = ObjectCache(self, kinds_func, self._retry, self._condition, self._name)
+        self._kinds = ObjectCache(self, kinds_func, self._retry, self._condition, self._name,
+                                  'endpoints' if self._api.use_endpoints else 'configmaps')
+
+        self._leases = None
+        if self._use_leases:
+            leases_func = functools.partial(self._api.list_namespaced_lease, self._namespace,
+                                            label_selector=self._label_selector)
+            self._leases = ObjectCache(self, leases_func, self._retry, self._condition, self._name, 'leases')
+
+        # ConfigMap holding the status of members, if it is not kept in annotations of Pods
+        self._status_maps = None
+        if self._use_status_config_map:
+            if self._api.use_endpoints:
+                status_func = functools.partial(self._api.list_namespaced_config_map, self._namespace,
+                                                label_selector=self._label_selector)
+                self._status_maps = ObjectCache(self, status_func, self._retry, self._condition,
+                                                self._name, 'configmaps')
+            else:
+                self._status_maps = self._kinds
 
     def retry(self, method: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
         retry = self._retry.copy()
@@ -816,6 +939,21 @@ class Kubernetes(AbstractDCS):
     def leader_path(self) -> str:
         return super(Kubernetes, self).leader_path[:-7 if self._api.use_endpoints else None]
 
+    @property
+    def use_leases(self) -> bool:
+        """``True`` if the leader lock is kept in a ``Lease`` object instead of annotations of the leader object."""
+        return self._use_leases
+
+    @property
+    def lease_path(self) -> str:
+        """Name of the ``Lease`` object holding the leader lock, i.e. ``$SCOPE-leader``."""
+        return super(Kubernetes, self).leader_path
+
+    @property
+    def status_path(self) -> str:
+        """Name of the ``ConfigMap`` holding the status of members, i.e. ``$SCOPE-members``."""
+        return self.client_path(self._MEMBERS[:-1])
+
     def set_ttl(self, ttl: int) -> Optional[bool]:
         ttl = int(ttl)
         self.__do_not_watch = self._ttl != ttl
@@ -850,25 +988,45 @@ class Kubernetes(AbstractDCS):
             logger.warning('Invalid value of retriable_http_codes = %s: %r', config['retriable_http_codes'], e)
 
     @staticmethod
-    def member(pod: K8sObject) -> Member:
+    def member(pod: K8sObject, status: Optional[str] = None) -> Member:
         annotations = pod.metadata.annotations or EMPTY_DICT
-        member = Member.from_node(pod.metadata.resource_version, pod.metadata.name, None, annotations.get('status', ''))
-        member.data['pod_labels'] = pod.metadata.labels
-        return member
+        member = Member.from_node(pod.metadata.resource_version, pod.metadata.name, None,
+                                  status or annotations.get('status', ''))
+        # objects returned by from_node() are shared, labels are added to the copy of data
+        return member._replace(data={**member.data, 'pod_labels': pod.metadata.labels})
+
+    def _lease_record(self, lease: Optional[K8sObject]) -> Dict[str, str]:
+        """Get the leader record from the *lease* in the same format as it is stored in annotations.
+
+        :param lease: the ``Lease`` object.
+
+        :returns: leader name, TTL, acquire and renew times and number of transitions.
+        """
+        spec = lease and lease.spec
+        if not spec:
+            return {}
+        record = {self._LEADER: spec.holder_identity, 'acquireTime': spec.acquire_time,
+                  'ttl': spec.lease_duration_seconds, 'renewTime': spec.renew_time,
+                  'transitions': spec.lease_transitions}
+        return {n: str(v) for n, v in record.items() if v is not None}
 
     def _wait_caches(self, stop_time: float) -> None:
-        while not (self._pods.is_ready() and self._kinds.is_ready()):
+        while not (self._pods.is_ready() and self._kinds.is_ready() and (not self._leases or self._leases.is_ready())
+                   and (not self._status_maps or self._status_maps.is_ready())):
             timeout = stop_time - time.time()
             if timeout <= 0:
                 raise RetryFailedError('Exceeded retry deadline')
             self._condition.wait(timeout)
 
     def _cluster_from_nodes(self, group: str, nodes: Dict[str, K8sObject], pods: Collection[K8sObject]) -> Cluster:
-        members = [self.member(pod) for pod in pods]
         path = self._base_path[1:] + '-'
         if group:
             path += group + '-'
 
+        status = self._status_maps and nodes.get(path + self._MEMBERS[:-1])
+        status = status and status.data or EMPTY_DICT
+        members = [self.member(pod, status.get(pod.metadata.name)) for pod in pods]
+
         config = nodes.get(path + self._CONFIG)
         metadata = config and config.metadata
         annotations = metadata and metadata.annotations or {}
@@ -888,8 +1046,6 @@ class Kubernetes(AbstractDCS):
         leader_path = path[:-1] if self._api.use_endpoints else path + self._LEADER
         leader = nodes.get(leader_path)
         metadata = leader and leader.metadata
-        if leader_path == self.leader_path:  # We want to memorize leader_resource_version only for our cluster
-            self._leader_resource_version = metadata.resource_version if metadata else None
         annotations: Dict[str, str] = metadata and metadata.annotations or {}
 
         # get last known leader lsn and slots
@@ -902,10 +1058,22 @@ class Kubernetes(AbstractDCS):
             failsafe = None
 
         # get leader
-        leader_record: Dict[str, str] = {n: annotations[n] for n in (self._LEADER, 'acquireTime',
-                                         'ttl', 'renewTime', 'transitions') if n in annotations}
+        if self._leases:
+            leader_path = path + self._LEADER
+            lease = nodes.get('lease/' + leader_path)
+            metadata = lease and lease.metadata
+            leader_record = self._lease_record(lease)
+            own_cluster = leader_path == self.lease_path
+        else:
+            leader_record: Dict[str, str] = {n: annotations[n] for n in (self._LEADER, 'acquireTime',
+                                             'ttl', 'renewTime', 'transitions') if n in annotations}
+            own_cluster = leader_path == self.leader_path
+
+        if own_cluster:  # We want to memorize leader_resource_version only for our cluster
+            self._leader_resource_version = metadata.resource_version if metadata else None
+
         # We want to memorize leader_observed_record and update leader_observed_time only for our cluster
-        if leader_path == self.leader_path and (leader_record or self._leader_observed_record)\
+        if own_cluster and (leader_record or self._leader_observed_record)\
                 and leader_record != self._leader_observed_record:
             self._leader_observed_record = leader_record
             self._leader_observed_time = time.time()
@@ -917,7 +1085,7 @@ class Kubernetes(AbstractDCS):
             ttl = self._ttl
 
         # We want to check validity of the leader record only for our own cluster
-        if leader_path == self.leader_path and\
+        if own_cluster and\
                 not (metadata and self._leader_observed_time and self._leader_observed_time + ttl >= time.time()):
             leader = None
 
@@ -941,6 +1109,28 @@ class Kubernetes(AbstractDCS):
 
         return Cluster(initialize, config, leader, status, members, failover, sync, history, failsafe)
 
+    def _cluster_snapshot(self, group: str, nodes: Dict[str, K8sObject], pods: Dict[str, K8sObject]) -> Cluster:
+        """Get the :class:`Cluster` object built from *nodes* and *pods*.
+
+        The object built on the previous call for the same *group* is reused if no object was changed, added or
+        removed. The validity of the leader lock depends on the current time, therefore our own cluster is always
+        rebuilt.
+
+        :param group: MPP group or empty string.
+        :param nodes: config, leader, failover and sync objects of the cluster.
+        :param pods: pods of the cluster members.
+
+        :returns: :class:`Cluster` instance.
+        """
+        path = self._base_path[1:] + '-' + (group + '-' if group else '')
+        if (path[:-1] if self._api.use_endpoints else path + self._LEADER) == self.leader_path:
+            return self._cluster_from_nodes(group, nodes, pods.values())
+
+        revisions = frozenset([(name, obj.metadata.resource_version) for name, obj in nodes.items()]
+                              + [('pod/' + name, obj.metadata.resource_version) for name, obj in pods.items()])
+        return self._cluster_snapshots.get(path, revisions,
+                                           lambda: self._cluster_from_nodes(group, nodes, pods.values()))
+
     def _postgresql_cluster_loader(self, path: Dict[str, Any]) -> Cluster:
         """Load and build the :class:`Cluster` object from DCS, which represents a single PostgreSQL cluster.
 
@@ -948,7 +1138,7 @@ class Kubernetes(AbstractDCS):
 
         :returns: :class:`Cluster` instance.
         """
-        return self._cluster_from_nodes(path['group'], path['nodes'], path['pods'].values())
+        return self._cluster_snapshot(path['group'], path['nodes'], path['pods'])
 
     def _mpp_cluster_loader(self, path: Dict[str, Any]) -> Dict[int, Cluster]:
         """Load and build all PostgreSQL clusters from a single MPP cluster.
@@ -968,7 +1158,9 @@ class Kubernetes(AbstractDCS):
             group = kind.metadata.labels.get(self._mpp.k8s_group_label)
             if group and self._mpp.group_re.match(group):
                 clusters[group]['nodes'][name] = kind
-        return {int(group): self._cluster_from_nodes(group, value['nodes'], value['pods'].values())
+        self._cluster_snapshots.retain(self._base_path[1:] + '-', [self._base_path[1:] + '-' + group + '-'
+                                                                   for group in clusters])
+        return {int(group): self._cluster_snapshot(group, value['nodes'], value['pods'])
                 for group, value in clusters.items()}
 
     def __load_cluster(
@@ -985,6 +1177,16 @@ class Kubernetes(AbstractDCS):
                         if not group or pod.metadata.labels.get(self._mpp.k8s_group_label) == group}
                 nodes = {name: kind for name, kind in self._kinds.copy().items()
                          if not group or kind.metadata.labels.get(self._mpp.k8s_group_label) == group}
+                if self._leases:
+                    # names of Leases could be the same as names of ConfigMaps
+                    nodes.update({'lease/' + name: lease for name, lease in self._leases.copy().items()
+                                  if not group or lease.metadata.labels.get(self._mpp.k8s_group_label) == group})
+                if self._status_maps and self._status_maps is not self._kinds:
+                    suffix = '-' + self._MEMBERS[:-1]
+                    for name, status in self._status_maps.copy().items():
+                        if name.endswith(suffix) and \
+                                (not group or status.metadata.labels.get(self._mpp.k8s_group_label) == group):
+                            nodes.setdefault(name, status)
             return loader({'group': group, 'pods': pods, 'nodes': nodes})
         except Exception:
             logger.exception('get_cluster')
@@ -1126,7 +1328,7 @@ class Kubernetes(AbstractDCS):
             body = k8s_client.V1ConfigMap(metadata=metadata)
         ret = retry(func, self._namespace, body) if retry else func(self._namespace, body)
         if ret:
-            self._kinds.set(name, ret)
+            self._kinds.written(name, ret)
         return ret
 
     @catch_kubernetes_errors
@@ -1245,33 +1447,204 @@ class Kubernetes(AbstractDCS):
     def _isotime() -> str:
         return datetime.datetime.now(tzutc).isoformat()
 
-    def update_leader(self, cluster: Cluster, last_lsn: Optional[int],
-                      slots: Optional[Dict[str, int]] = None, failsafe: Optional[Dict[str, str]] = None) -> bool:
+    @staticmethod
+    def _microtime() -> str:
+        """Current time in the format of ``MicroTime`` fields of K8s objects."""
+        return datetime.datetime.now(tzutc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+    def _lease_spec(self, record: Dict[str, Any]) -> K8sObject:
+        """Build the ``Lease`` spec from the leader *record*, the reverse of :meth:`_lease_record`.
+
+        :param record: leader name, TTL, acquire and renew times and number of transitions, ``None`` values
+                       remove fields from the ``Lease``.
+
+        :returns: ``V1LeaseSpec`` object.
+        """
+        fields = {self._LEADER: 'holder_identity', 'acquireTime': 'acquire_time', 'ttl': 'lease_duration_seconds',
+                  'renewTime': 'renew_time', 'transitions': 'lease_transitions'}
+        return k8s_client.V1LeaseSpec(**{fields[n]: int(v) if n in ('ttl', 'transitions') and v is not None else v
+                                         for n, v in record.items()})
+
+    def _patch_or_create_lease(self, record: Dict[str, Any], resource_version: Optional[str],
+                               retry: Callable[..., Any]) -> K8sObject:
+        """Patch or create the ``Lease`` holding the leader lock.
+
+        :param record: leader record to write, see :meth:`_lease_spec`.
+        :param resource_version: the ``Lease`` should be updated only if the ``resource_version`` matches, if
+                                 ``None`` the ``Lease`` is created.
+        :param retry: a callable that will take care of retries.
+
+        :returns: the new ``V1Lease`` object.
+        """
+        metadata = {'namespace': self._namespace, 'name': self.lease_path, 'labels': self._labels}
+        if resource_version:
+            metadata['resource_version'] = resource_version
+            func = functools.partial(self._api.patch_namespaced_lease, self.lease_path)
+        else:
+            func = self._api.create_namespaced_lease
+        body = k8s_client.V1Lease(metadata=k8s_client.V1ObjectMeta(**metadata), spec=self._lease_spec(record))
+        ret = retry(func, self._namespace, body)
+        if ret and self._leases:
+            self._leases.written(self.lease_path, ret)
+        return ret
+
+    def _update_lease_with_retry(self, record: Dict[str, Any], resource_version: Optional[str]) -> bool:
+        """Write the leader *record* to the ``Lease`` if it wasn't changed since *resource_version*.
+
+        :param record: leader record to write, see :meth:`_lease_spec`.
+        :param resource_version: the last known ``resource_version`` of the ``Lease``.
+
+        :returns: ``True`` if the ``Lease`` was updated.
+        """
+        retry = self._retry.copy()
+
+        def _retry(*args: Any, **kwargs: Any) -> Any:
+            kwargs['_retry'] = retry
+            return retry(*args, **kwargs)
+
+        try:
+            return bool(self._patch_or_create_lease(record, resource_version, _retry))
+        except k8s_client.rest.ApiException as e:
+            if e.status != 409:
+                logger.exception('Unexpected error from Kubernetes API')
+                return False
+            logger.warning('Concurrent update of %s', self.lease_path)
+        except (RetryFailedError, K8sException) as e:
+            raise KubernetesError(e)
+
+        # if we are here, that means update failed with 409
+        if not retry.ensure_deadline(1):
+            return False
+
+        # We can get 409 because we do at least one retry, and the first update might have succeeded,
+        # therefore we will check if the Lease read directly from K8s API matches expectations.
+        try:
+            lease = _retry(self._api.read_namespaced_lease, self.lease_path, self._namespace)
+        except (RetryFailedError, K8sException) as e:
+            raise KubernetesError(e)
+        except Exception as e:
+            logger.error('Failed to get the lease "%s": %r', self.lease_path, e)
+            return False
+
+        if self._leases:
+            self._leases.set(self.lease_path, lease)
+        lease_record = self._lease_record(lease)
+        return lease.metadata.resource_version != resource_version\
+            and all(lease_record.get(n) == (v if v is None else str(v)) for n, v in record.items())
+
+    def _optime_due(self, old: Optional[str], new: str) -> bool:
+        """Check whether the changed ``optime`` should be written to the leader object.
+
+        The ``optime`` is written not more often than ``leader_optime_interval`` seconds, unless it has moved by at
+        least ``leader_optime_delta`` bytes.
+
+        :param old: the ``optime`` currently stored in the leader object.
+        :param new: the current ``optime``.
+
+        :returns: ``True`` if *new* value should be written.
+        """
+        if not old or not (self._leader_optime_interval or self._leader_optime_delta):
+            return True
+        if self._leader_optime_interval\
+                and time.time() - self._leader_optime_written_at >= self._leader_optime_interval:
+            return True
+        try:
+            return bool(self._leader_optime_delta) and abs(int(new) - int(old)) >= self._leader_optime_delta
+        except ValueError:
+            return True
+
+    def _update_leader_object(self, annotations: Dict[str, Any], ips: List[str], throttle: bool = False) -> None:
+        """Write the leader state to the leader object when the leader lock is kept in the ``Lease``.
+
+        The object is patched only if some of *annotations* or subsets of the leader ``Endpoints`` changed.
+
+        :param annotations: annotations to write, i.e. ``optime``, ``slots`` and ``failsafe``.
+        :param ips: see :meth:`_patch_or_create`.
+        :param throttle: whether a change of only the ``optime`` could be postponed, see :meth:`_optime_due`.
+        """
         kind = self._kinds.get(self.leader_path)
         kind_annotations = kind and kind.metadata.annotations or EMPTY_DICT
+        annotations = {n: v for n, v in annotations.items() if kind_annotations.get(n) != v}
+        endpoints: Dict[str, Any] = {}
+        if self._api.use_endpoints:
+            self._map_subsets(endpoints, ips)
+        if throttle and not endpoints and list(annotations) == [self._OPTIME]\
+                and not self._optime_due(kind_annotations.get(self._OPTIME), annotations[self._OPTIME]):
+            return
+        if annotations or endpoints:
+            if self.patch_or_create(self.leader_path, annotations, None, bool(kind), False, ips)\
+                    and self._OPTIME in annotations:
+                self._leader_optime_written_at = time.time()
 
-        if kind and kind_annotations.get(self._LEADER) != self._name:
-            return False
+    def update_leader(self, cluster: Cluster, last_lsn: Optional[int],
+                      slots: Optional[Dict[str, int]] = None, failsafe: Optional[Dict[str, str]] = None) -> bool:
+        if self._leases:
+            lease = self._leases.get(self.lease_path)
+            lease_record = self._lease_record(lease)
+            if lease and lease_record.get(self._LEADER) != self._name:
+                return False
+            leader_observed_record = lease_record or self._leader_observed_record
+            now = self._microtime()
+        else:
+            kind = self._kinds.get(self.leader_path)
+            kind_annotations = kind and kind.metadata.annotations or EMPTY_DICT
+
+            if kind and kind_annotations.get(self._LEADER) != self._name:
+                return False
+            leader_observed_record = kind_annotations or self._leader_observed_record
+            now = self._isotime()
 
-        now = self._isotime()
-        leader_observed_record = kind_annotations or self._leader_observed_record
         annotations = {self._LEADER: self._name, 'ttl': str(self._ttl), 'renewTime': now,
                        'acquireTime': leader_observed_record.get('acquireTime') or now,
                        'transitions': leader_observed_record.get('transitions') or '0'}
+        status: Dict[str, Any] = {}
         if last_lsn:
-            annotations[self._OPTIME] = str(last_lsn)
-            annotations['slots'] = json.dumps(slots, separators=(',', ':')) if slots else None
+            status[self._OPTIME] = str(last_lsn)
+            status['slots'] = json.dumps(slots, separators=(',', ':')) if slots else None
             retain_slots = self._build_retain_slots(cluster, slots)
-            annotations['retain_slots'] = json.dumps(retain_slots) if retain_slots else None
+            status['retain_slots'] = json.dumps(retain_slots) if retain_slots else None
 
         if failsafe is not None:
-            annotations[self._FAILSAFE] = json.dumps(failsafe, separators=(',', ':')) if failsafe else None
+            status[self._FAILSAFE] = json.dumps(failsafe, separators=(',', ':')) if failsafe else None
 
+        if self._leases:
+            # the leader state is written separately and only if it was changed, the Lease is renewed every time
+            ret = self._update_lease_with_retry(annotations, lease and lease.metadata.resource_version)
+            if ret:
+                self._update_leader_object(status, self.__ips, True)
+            return ret
+
+        annotations.update(status)
         resource_version = kind and kind.metadata.resource_version
         return self._update_leader_with_retry(annotations, resource_version, self.__ips)
 
+    def _acquire_lease(self, record: Dict[str, Any]) -> bool:
+        """Take the leader lock kept in the ``Lease``.
+
+        :param record: leader record to write, see :meth:`_lease_spec`.
+
+        :returns: ``True`` if the lock was acquired.
+        """
+        resource_version = self._leader_resource_version
+        if resource_version:
+            lease = self._leases and self._leases.get(self.lease_path)
+            # If the Lease in cache was updated we should better use fresh resource_version
+            if lease and lease.metadata.resource_version != resource_version:
+                lease_record = self._lease_record(lease)
+                # But, only in case if leader record didn't change
+                if all(lease_record.get(n) == self._leader_observed_record.get(n) for n in record.keys()):
+                    resource_version = lease.metadata.resource_version
+
+        ret = self._update_lease_with_retry(record, resource_version)
+        if ret:
+            # remove the leader lock from annotations, it could be left there when the mode was changed
+            self._update_leader_object({n: None for n in record.keys()}, self.__ips)
+        else:
+            logger.info('Could not take out TTL lock')
+        return ret
+
     def attempt_to_acquire_leader(self) -> bool:
-        now = self._isotime()
+        now = self._microtime() if self._leases else self._isotime()
         annotations = {self._LEADER: self._name, 'ttl': str(self._ttl),
                        'renewTime': now, 'acquireTime': now, 'transitions': '0'}
         if self._leader_observed_record:
@@ -1286,6 +1659,9 @@ class Kubernetes(AbstractDCS):
                 annotations['acquireTime'] = self._leader_observed_record.get('acquireTime') or now
             annotations['transitions'] = str(transitions)
 
+        if self._leases:
+            return self._acquire_lease(annotations)
+
         resource_version = self._leader_resource_version
         if resource_version:
             kind = self._kinds.get(self.leader_path)
@@ -1387,22 +1763,96 @@ class Kubernetes(AbstractDCS):
                 updated_labels.update({k: None for k, _ in self._bootstrap_labels.items()})
 
         member = cluster and cluster.get_member(self._name, fallback_to_leader=False)
-        pod_labels = member and member.data.pop('pod_labels', None)
-        ret = member and pod_labels is not None\
-            and all(pod_labels.get(k) == v for k, v in updated_labels.items())\
-            and deep_compare(data, member.data)
-
-        if not ret:
-            metadata: Dict[str, Any] = {'namespace': self._namespace, 'name': self._name, 'labels': updated_labels,
-                                        'annotations': {'status': json.dumps(data, separators=(',', ':'))}}
-            body = k8s_client.V1Pod(metadata=k8s_client.V1ObjectMeta(**metadata))
-            ret = self._api.patch_namespaced_pod(self._name, self._namespace, body)
-            if ret:
-                self._pods.set(self._name, ret)
+        pod_labels = member and member.data.get('pod_labels')
+        labels_match = member and pod_labels is not None\
+            and all(pod_labels.get(k) == v for k, v in updated_labels.items())
+        old_data = member and {k: v for k, v in member.data.items() if k != 'pod_labels'} or {}
+
+        if self._status_maps:
+            ret = labels_match or self._patch_pod(updated_labels)
+            if ret and (not member or self._status_changed(old_data, data)):
+                ret = self._publish_status(cluster, data)
+        else:
+            ret = labels_match and deep_compare(data, old_data)\
+                or self._patch_pod(updated_labels, {'status': json.dumps(data, separators=(',', ':'))})
         if self._should_create_config_service:
             self._create_config_service()
         return bool(ret)
 
+    def _patch_pod(self, labels: Dict[str, Any], annotations: Optional[Dict[str, Any]] = None) -> K8sObject:
+        """Patch labels and annotations of our Pod.
+
+        :param labels: labels to be set.
+        :param annotations: annotations to be set.
+
+        :returns: the updated Pod.
+        """
+        metadata: Dict[str, Any] = {'namespace': self._namespace, 'name': self._name, 'labels': labels}
+        if annotations:
+            metadata['annotations'] = annotations
+        body = k8s_client.V1Pod(metadata=k8s_client.V1ObjectMeta(**metadata))
+        ret = self._api.patch_namespaced_pod(self._name, self._namespace, body)
+        if ret:
+            self._pods.written(self._name, ret)
+        return ret
+
+    _LSN_KEYS = ('xlog_location', 'receive_lsn', 'replay_lsn')
+
+    def _status_changed(self, old: Dict[str, Any], new: Dict[str, Any]) -> bool:
+        """Check whether the status of this member should be published to the ``$SCOPE-members`` ConfigMap.
+
+        Changes of LSNs are published not more often than ``status_lsn_interval`` seconds, unless any of them has
+        moved by at least ``status_lsn_delta`` bytes. Changes of other fields are published immediately.
+
+        :param old: the status currently stored in the ConfigMap.
+        :param new: the current status.
+
+        :returns: ``True`` if *new* status should be written.
+        """
+        if not deep_compare({k: v for k, v in old.items() if k not in self._LSN_KEYS},
+                            {k: v for k, v in new.items() if k not in self._LSN_KEYS}):
+            return True
+        changed = [k for k in self._LSN_KEYS if old.get(k) != new.get(k)]
+        if not changed:
+            return False
+        if any(k not in old or k not in new for k in changed)\
+                or not (self._status_lsn_interval or self._status_lsn_delta):
+            return True
+        if self._status_lsn_interval and time.time() - self._status_published_at >= self._status_lsn_interval:
+            return True
+        return bool(self._status_lsn_delta)\
+            and any(abs(int(new[k]) - int(old[k])) >= self._status_lsn_delta for k in changed)
+
+    def _publish_status(self, cluster: Optional[Cluster], data: Dict[str, Any]) -> bool:
+        """Write the status of this member to the ``$SCOPE-members`` ConfigMap.
+
+        The leader also removes the status of members that don't have a Pod anymore.
+
+        :param cluster: the last known cluster state.
+        :param data: the status of this member.
+
+        :returns: ``True`` if the ConfigMap was successfully updated.
+        """
+        if TYPE_CHECKING:  # pragma: no cover
+            assert self._status_maps is not None
+        name = self.status_path
+        statuses: Dict[str, Any] = {self._name: json.dumps(data, separators=(',', ':'))}
+        old = self._status_maps.get(name)
+        if old and old.data and cluster and cluster.leader and cluster.leader.name == self._name:
+            members = {m.name for m in cluster.members}
+            statuses.update({n: None for n in old.data.to_dict() if n not in members and n != self._name})
+        metadata = k8s_client.V1ObjectMeta(namespace=self._namespace, name=name, labels=self._labels)
+        if old:
+            ret = self._api.patch_namespaced_config_map(name, self._namespace,
+                                                        k8s_client.V1ConfigMap(metadata=metadata, data=statuses))
+        else:
+            ret = self._api.create_namespaced_config_map(self._namespace,
+                                                         k8s_client.V1ConfigMap(metadata=metadata, data=statuses))
+        if ret:
+            self._status_maps.written(name, ret)
+            self._status_published_at = time.time()
+        return bool(ret)
+
     def initialize(self, create_new: bool = True, sysid: str = "") -> bool:
         cluster = self.cluster
         resource_version = str(cluster.config.version)\
@@ -1415,6 +1865,17 @@ class Kubernetes(AbstractDCS):
 
     def delete_leader(self, leader: Optional[Leader], last_lsn: Optional[int] = None) -> bool:
         ret = False
+        if self._leases:
+            lease = self._leases.get(self.lease_path)
+            if lease and self._lease_record(lease).get(self._LEADER) == self._name:
+                try:
+                    ret = self._update_lease_with_retry({self._LEADER: None}, lease.metadata.resource_version)
+                except KubernetesError as e:
+                    logger.error('Failed to release the lease: %r', e)
+                self._update_leader_object({self._OPTIME: str(last_lsn)} if last_lsn else {}, [])
+                self.reset_cluster()
+            return ret
+
         kind = self._kinds.get(self.leader_path)
         if kind and (kind.metadata.annotations or EMPTY_DICT).get(self._LEADER) == self._name:
             annotations: Dict[str, Optional[str]] = {self._LEADER: None}
@@ -1429,6 +1890,12 @@ class Kubernetes(AbstractDCS):
 
     @catch_kubernetes_errors
     def delete_cluster(self) -> bool:
+        if self._leases:
+            self.retry(self._api.delete_collection_namespaced_lease, self._namespace,
+                       label_selector=self._label_selector)
+        if self._status_maps and self._status_maps is not self._kinds:
+            self.retry(self._api.delete_collection_namespaced_config_map, self._namespace,
+                       label_selector=self._label_selector)
         return bool(self.retry(self._api.delete_collection_namespaced_kind,
                                self._namespace, label_selector=self._label_selector))
 
@@ -4,18 +4,23 @@ import select
 import socket
 import time
 
-from typing import Any, Callable, cast, Dict, List, Optional, Tuple, TYPE_CHECKING, Union
+from collections import namedtuple
+from threading import Condition, Lock
+from typing import Any, Callable, cast, Dict, List, Optional, Set, Tuple, TYPE_CHECKING, Union
 
 from kazoo.client import KazooClient, KazooRetry, KazooState
-from kazoo.exceptions import ConnectionClosedError, NodeExistsError, NoNodeError, SessionExpiredError
+from kazoo.exceptions import ConnectionClosedError, NodeExistsError, \
+    NoNodeError, RolledBackError, SessionExpiredError, UnimplementedError
 from kazoo.handlers.threading import AsyncResult, SequentialThreadingHandler
-from kazoo.protocol.states import KeeperState, WatchedEvent, ZnodeStat
+from kazoo.protocol.paths import _prefix_root
+from kazoo.protocol.serialization import Create, Create2, Delete, int_struct, SetData, Transaction, Watch, write_string
+from kazoo.protocol.states import Callback, EventType, KeeperState, WatchedEvent, ZnodeStat
 from kazoo.retry import RetryFailedError
 from kazoo.security import ACL, make_acl
 
 from ..exceptions import DCSError
 from ..postgresql.mpp import AbstractMPP
-from ..utils import deep_compare
+from ..utils import count_retry_attempt, deep_compare, parse_bool
 from . import AbstractDCS, Cluster, ClusterConfig, Failover, Leader, Member, Status, SyncState, TimelineHistory
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -73,8 +78,70 @@ class PatroniSequentialThreadingHandler(SequentialThreadingHandler):
             raise select.error(9, str(e))
 
 
+class AddWatch(namedtuple('AddWatch', 'path mode')):
+    """The ``addWatch`` request of ZooKeeper 3.6+, which isn't supported by kazoo."""
+
+    type = 106
+    PERSISTENT_RECURSIVE = 1
+
+    def serialize(self) -> bytearray:
+        b = bytearray()
+        b.extend(write_string(self.path))
+        b.extend(int_struct.pack(self.mode))
+        return b
+
+    @classmethod
+    def deserialize(cls, bytes: bytes, offset: int) -> bool:
+        return True
+
+
 class PatroniKazooClient(KazooClient):
 
+    # persistent recursive watches never report changes of children, only events of descendants themselves
+    _PERSISTENT_EVENT_TYPES = {1: EventType.CREATED, 2: EventType.DELETED, 3: EventType.CHANGED}
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super(PatroniKazooClient, self).__init__(*args, **kwargs)
+        self._persistent_watchers: Dict[str, Callable[[WatchedEvent], None]] = {}
+        self.write_listener: Optional[Callable[[str], None]] = None  # called with paths of znodes that we write
+        self._orig_read_watch_event = self._connection._read_watch_event
+        self._connection._read_watch_event = self._read_watch_event
+
+    def add_persistent_recursive_watch(self, path: str, watcher: Callable[[WatchedEvent], None]) -> None:
+        """Set the persistent recursive watch on the *path*.
+
+        .. note::
+            Kazoo doesn't restore such watches after reconnect, therefore they must be set again when the
+            connection is re-established.
+
+        :param path: the path of the znode.
+        :param watcher: the callback which will receive events about the *path* and all its descendants.
+
+        :raises:
+            :exc:`~kazoo.exceptions.UnimplementedError`: if ZooKeeper is older than 3.6.
+        """
+        # register the watcher before sending the request, events could come right after the response
+        self._persistent_watchers[path] = watcher
+        async_result = self.handler.async_result()
+        self._call(AddWatch(_prefix_root(self.chroot, path), AddWatch.PERSISTENT_RECURSIVE), async_result)
+        try:
+            async_result.get()
+        except Exception:
+            self._persistent_watchers.pop(path, None)
+            raise
+
+    def _read_watch_event(self, buffer: bytes, offset: int) -> None:
+        self._orig_read_watch_event(buffer, offset)
+        watch, _ = Watch.deserialize(buffer, offset)
+        event_type = self._PERSISTENT_EVENT_TYPES.get(watch.type)
+        if not event_type or self._stopped.is_set():
+            return
+        path = self.unchroot(watch.path)
+        for prefix, watcher in list(self._persistent_watchers.items()):
+            if path == prefix or path.startswith(prefix + '/'):
+                event = WatchedEvent(event_type, self._state, path)
+                self.handler.dispatch_callback(Callback('watch', watcher, (event,)))
+
     def _call(self, request: Tuple[Any], async_object: AsyncResult) -> Optional[bool]:
         # Before kazoo==2.7.0 it wasn't possible to send requests to zookeeper if
         # the connection is in the SUSPENDED state and Patroni was strongly relying on it.
@@ -84,9 +151,187 @@ class PatroniKazooClient(KazooClient):
         if self._state == KeeperState.CONNECTING:
             async_object.set_exception(SessionExpiredError())
             return False
+        if self.write_listener:
+            for operation in request.operations if isinstance(request, Transaction) else [request]:
+                if isinstance(operation, (Create, Create2, SetData, Delete)):
+                    self.write_listener(self.unchroot(operation.path))
         return super(PatroniKazooClient, self)._call(request, async_object)
 
 
+def _command_retry_sleep(seconds: float) -> None:
+    """Sleep between attempts of :class:`KazooRetry` and count the retry, like :class:`~patroni.utils.Retry` does.
+
+    :param seconds: how long to sleep.
+    """
+    count_retry_attempt()
+    time.sleep(seconds)
+
+
+class ZooKeeperCache(object):
+    """Mirror of znodes under :attr:`ZooKeeper.cluster_prefix`, kept up to date by a persistent recursive watch.
+
+    The cache is built by the first :meth:`build` call, which sets the watch and reads the whole tree. Afterwards every
+    created, changed or deleted znode is read again from the watch callback, so that loading the cluster doesn't cost
+    any round trips. Changes of the leader, status and config znodes wake up the HA loop.
+
+    Kazoo doesn't restore persistent watches after reconnect, therefore the cache becomes not ready when the connection
+    is suspended or lost, and it is built again by the next :meth:`build` call.
+
+    Watch events for our own writes are processed asynchronously, therefore znodes written by us are remembered (see
+    :meth:`written`) and read again by :meth:`refresh_written` before the next cluster load is served from the cache.
+    ZooKeeper processes requests of a session in order, so these reads see our writes.
+    """
+
+    def __init__(self, dcs: 'ZooKeeper', client: PatroniKazooClient) -> None:
+        """Create the :class:`ZooKeeperCache` object.
+
+        :param dcs: reference to the :class:`ZooKeeper` object.
+        :param client: reference to the :class:`PatroniKazooClient` object.
+        """
+        self._dcs = dcs
+        self._client = client
+        self._prefix = dcs.cluster_prefix.rstrip('/')
+        self._leader_path = dcs.leader_path
+        self._status_paths = (dcs.leader_optime_path, dcs.status_path)
+        self._config_path = dcs.config_path
+        self._name = getattr(dcs, '_name')  # pyright
+        self.condition = Condition()
+        self._is_ready = False
+        self._nodes: Dict[str, Tuple[str, ZnodeStat]] = {}
+        self._nodes_lock = Lock()
+        self._refresh_lock = Lock()  # reading a znode and updating the cache must be atomic
+        self._pending: Optional[Set[str]] = None  # paths changed while the cache is being built
+        self._written: Set[str] = set()  # paths written by us, which must be read again before the next load
+        self._client.add_listener(self._state_listener)
+
+    def _state_listener(self, state: str) -> None:
+        if state in (KazooState.SUSPENDED, KazooState.LOST):
+            self.invalidate()
+
+    def invalidate(self) -> None:
+        """Mark the cache as not ready, it will be built again by the next :meth:`build` call."""
+        with self.condition:
+            self._is_ready = False
+
+    def is_ready(self) -> bool:
+        with self.condition:
+            return self._is_ready
+
+    def covers(self, path: str) -> bool:
+        """Check whether znodes under the *path* are kept in the cache.
+
+        :param path: path in ZooKeeper.
+
+        :returns: ``True`` if *path* is under the watched prefix.
+        """
+        return path.rstrip('/') == self._prefix or path.startswith(self._prefix + '/')
+
+    def written(self, path: str) -> None:
+        """Remember the *path* written by us, so that it is read again by :meth:`refresh_written`.
+
+        :param path: path of the znode which we created, changed or deleted.
+        """
+        if self.covers(path):
+            with self._nodes_lock:
+                self._written.add(path)
+
+    def refresh_written(self) -> None:
+        """Read again all znodes written by us since the last call.
+
+        :raises:
+            :exc:`~kazoo.exceptions.KazooException`: if some of the znodes couldn't be read.
+        """
+        with self._nodes_lock:
+            paths, self._written = self._written, set()
+        try:
+            while paths:
+                path = next(iter(paths))
+                self._refresh(path)
+                paths.discard(path)
+        except Exception:
+            with self._nodes_lock:
+                self._written |= paths
+            raise
+
+    def _read(self, path: str) -> Optional[Tuple[str, ZnodeStat]]:
+        try:
+            value, stat = self._client.get(path)
+            return value.decode('utf-8'), stat
+        except NoNodeError:
+            return None
+
+    def _walk(self, path: str, nodes: Dict[str, Tuple[str, ZnodeStat]]) -> None:
+        node = self._read(path)
+        if node:
+            nodes[path] = node
+            for child in self._client.get_children(path):
+                self._walk(path + '/' + child, nodes)
+
+    def _refresh(self, path: str) -> None:
+        """Read the *path* again and update the cache.
+
+        :param path: path of the znode which was created, changed or deleted.
+        """
+        with self._refresh_lock:
+            node = self._read(path)
+            with self._nodes_lock:
+                old = self._nodes.pop(path, None)
+                if node:
+                    self._nodes[path] = node
+                leader = self._nodes.get(self._leader_path)
+
+        old_value, new_value = old and old[0], node and node[0]
+        if old_value != new_value and (path in (self._leader_path, self._config_path)
+                                       or path in self._status_paths and (not leader or leader[0] != self._name)):
+            self._dcs.event.set()
+
+    def _watcher(self, event: WatchedEvent) -> None:
+        with self._nodes_lock:
+            if self._pending is not None:
+                return self._pending.add(event.path)
+        try:
+            self._refresh(event.path)
+        except Exception as e:
+            logger.error('Failed to refresh %s: %r', event.path, e)
+            self.invalidate()
+
+    def build(self) -> None:
+        """Set the persistent recursive watch and read all znodes under the prefix.
+
+        :raises:
+            :exc:`~kazoo.exceptions.UnimplementedError`: if ZooKeeper is older than 3.6.
+        """
+        with self._nodes_lock:
+            self._pending = set()
+            self._written.clear()  # the tree is read from scratch
+        try:
+            self._client.add_persistent_recursive_watch(self._prefix, self._watcher)
+            nodes: Dict[str, Tuple[str, ZnodeStat]] = {}
+            self._walk(self._prefix, nodes)
+        finally:
+            with self._nodes_lock:
+                pending, self._pending = self._pending, None
+        with self._nodes_lock:
+            self._nodes = nodes
+        # znodes that were changed while we were reading the tree
+        for path in pending:
+            self._refresh(path)
+        with self.condition:
+            self._is_ready = True
+
+    def get_node(
+            self, key: str, watch: Optional[Callable[[WatchedEvent], None]] = None
+    ) -> Optional[Tuple[str, ZnodeStat]]:
+        with self._nodes_lock:
+            return self._nodes.get(key.rstrip('/'))
+
+    def get_children(self, key: str) -> List[str]:
+        parent = key.rstrip('/') + '/'
+        with self._nodes_lock:
+            return [path[len(parent):] for path in self._nodes
+                    if path.startswith(parent) and '/' not in path[len(parent):]]
+
+
 class ZooKeeper(AbstractDCS):
 
     def __init__(self, config: Dict[str, Any], mpp: AbstractMPP) -> None:
@@ -123,16 +368,31 @@ class ZooKeeper(AbstractDCS):
         self._client = PatroniKazooClient(hosts, handler=PatroniSequentialThreadingHandler(config['retry_timeout']),
                                           timeout=config['ttl'], connection_retry=KazooRetry(max_delay=1, max_tries=-1,
                                           sleep_func=time.sleep), command_retry=KazooRetry(max_delay=1, max_tries=-1,
-                                          deadline=config['retry_timeout'], sleep_func=time.sleep),
+                                          deadline=config['retry_timeout'], sleep_func=_command_retry_sleep),
                                           auth_data=list(config.get('auth_data', {}).items()), **kwargs)
 
         self.__last_member_data: Optional[Dict[str, Any]] = None
+        self._batch_writes = parse_bool(config.get('batch_writes', True)) is not False
+        self._write_batch: Optional[List[Tuple[str, str]]] = None
 
         self._orig_kazoo_connect = self._client._connection._connect
         self._client._connection._connect = self._kazoo_connect
 
         self._client.start()
 
+        self._cache = ZooKeeperCache(self, self._client) \
+            if not self._ctl and config.get('use_persistent_watches') else None
+        if self._cache:
+            self._client.write_listener = self._cache.written
+
+    @property
+    def cluster_prefix(self) -> str:
+        """Construct the cluster prefix for the cluster.
+
+        :returns: path in ZooKeeper under which we store information about this Patroni cluster.
+        """
+        return self._base_path + '/' if self.is_mpp_coordinator() else self.client_path('')
+
     def _kazoo_connect(self, *args: Any) -> Tuple[Union[int, float], Union[int, float]]:
         """Kazoo is using Ping's to determine health of connection to zookeeper. If there is no
         response on Ping after Ping interval (1/2 from read_timeout) it will consider current
@@ -199,10 +459,12 @@ class ZooKeeper(AbstractDCS):
         except NoNodeError:
             return None
 
-    def get_status(self, path: str, leader: Optional[Leader]) -> Status:
-        status = self.get_node(path + self._STATUS)
+    def get_status(self, path: str, leader: Optional[Leader],
+                   reader: Union['ZooKeeper', ZooKeeperCache, None] = None) -> Status:
+        reader = reader or self
+        status = reader.get_node(path + self._STATUS)
         if not status:
-            status = self.get_node(path + self._LEADER_OPTIME)
+            status = reader.get_node(path + self._LEADER_OPTIME)
         return Status.from_node(status and status[0])
 
     @staticmethod
@@ -215,10 +477,11 @@ class ZooKeeper(AbstractDCS):
         except NoNodeError:
             return []
 
-    def load_members(self, path: str) -> List[Member]:
+    def load_members(self, path: str, reader: Union['ZooKeeper', ZooKeeperCache, None] = None) -> List[Member]:
+        reader = reader or self
         members: List[Member] = []
-        for member in self.get_children(path + self._MEMBERS):
-            data = self.get_node(path + self._MEMBERS + member)
+        for member in reader.get_children(path + self._MEMBERS):
+            data = reader.get_node(path + self._MEMBERS + member)
             if data is not None:
                 members.append(self.member(member, *data))
         return members
@@ -230,42 +493,44 @@ class ZooKeeper(AbstractDCS):
 
         :returns: :class:`Cluster` instance.
         """
-        nodes = set(self.get_children(path))
+        # with the cache no watches are needed, it wakes up the HA loop itself
+        reader = self._cache if self._cache and self._cache.covers(path) and self._cache.is_ready() else self
+        nodes = set(reader.get_children(path))
 
         # get initialize flag
-        initialize = (self.get_node(path + self._INITIALIZE) or [None])[0] if self._INITIALIZE in nodes else None
+        initialize = (reader.get_node(path + self._INITIALIZE) or [None])[0] if self._INITIALIZE in nodes else None
 
         # get global dynamic configuration
-        config = self.get_node(path + self._CONFIG, watch=self._watcher) if self._CONFIG in nodes else None
+        config = reader.get_node(path + self._CONFIG, watch=self._watcher) if self._CONFIG in nodes else None
         config = config and ClusterConfig.from_node(config[1].version, config[0], config[1].mzxid)
 
         # get timeline history
-        history = self.get_node(path + self._HISTORY) if self._HISTORY in nodes else None
+        history = reader.get_node(path + self._HISTORY) if self._HISTORY in nodes else None
         history = history and TimelineHistory.from_node(history[1].mzxid, history[0])
 
         # get synchronization state
-        sync = self.get_node(path + self._SYNC) if self._SYNC in nodes else None
+        sync = reader.get_node(path + self._SYNC) if self._SYNC in nodes else None
         sync = SyncState.from_node(sync and sync[1].version, sync and sync[0])
 
         # get list of members
-        members = self.load_members(path) if self._MEMBERS[:-1] in nodes else []
+        members = self.load_members(path, reader) if self._MEMBERS[:-1] in nodes else []
 
         # get leader
-        leader = self.get_node(path + self._LEADER, watch=self._watcher) if self._LEADER in nodes else None
+        leader = reader.get_node(path + self._LEADER, watch=self._watcher) if self._LEADER in nodes else None
         if leader:
             member = Member(-1, leader[0], None, {})
             member = ([m for m in members if m.name == leader[0]] or [member])[0]
             leader = Leader(leader[1].version, leader[1].ephemeralOwner, member)
 
         # get last known leader lsn and slots
-        status = self.get_status(path, leader)
+        status = self.get_status(path, leader, reader)
 
         # failover key
-        failover = self.get_node(path + self._FAILOVER) if self._FAILOVER in nodes else None
+        failover = reader.get_node(path + self._FAILOVER) if self._FAILOVER in nodes else None
         failover = failover and Failover.from_node(failover[1].version, failover[0])
 
         # get failsafe topology
-        failsafe = self.get_node(path + self._FAILSAFE) if self._FAILSAFE in nodes else None
+        failsafe = reader.get_node(path + self._FAILSAFE) if self._FAILSAFE in nodes else None
         try:
             failsafe = json.loads(failsafe[0]) if failsafe else None
         except Exception:
@@ -281,7 +546,8 @@ class ZooKeeper(AbstractDCS):
         :returns: all MPP groups as :class:`dict`, with group IDs as keys and :class:`Cluster` objects as values.
         """
         ret: Dict[int, Cluster] = {}
-        for node in self.get_children(path):
+        reader = self._cache if self._cache and self._cache.covers(path) and self._cache.is_ready() else self
+        for node in reader.get_children(path):
             if self._mpp.group_re.match(node):
                 ret[int(node)] = self._postgresql_cluster_loader(path + node + '/')
         return ret
@@ -289,6 +555,20 @@ class ZooKeeper(AbstractDCS):
     def _load_cluster(
             self, path: str, loader: Callable[[str], Union[Cluster, Dict[int, Cluster]]]
     ) -> Union[Cluster, Dict[int, Cluster]]:
+        if self._cache and self._cache.covers(path) and not self._cache.is_ready():
+            try:
+                self._cache.build()
+            except UnimplementedError:
+                logger.warning('ZooKeeper does not support persistent recursive watches, falling back to polling')
+                self._cache = None
+            except Exception as e:
+                logger.error('Failed to build the cache of %s: %r', path, e)
+        elif self._cache and self._cache.covers(path):
+            try:
+                self._cache.refresh_written()
+            except Exception as e:
+                logger.error('Failed to refresh written znodes of %s: %r', path, e)
+                self._cache.invalidate()
         try:
             return self._client.retry(loader, path)
         except Exception:
@@ -351,23 +631,53 @@ class ZooKeeper(AbstractDCS):
         return self._create(self.initialize_path, sysid_bytes, retry=True) if create_new \
             else self._client.retry(self._client.set, self.initialize_path, sysid_bytes)
 
+    @staticmethod
+    def _raise_txn_error(results: List[Any]) -> None:
+        """Raise the exception of the operation which made the ``multi`` request fail.
+
+        :param results: results of operations returned by :meth:`~kazoo.client.TransactionRequest.commit`.
+        """
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, RolledBackError):
+                raise result
+
+    def _recreate_ephemeral(self, path: str, value: bytes) -> None:
+        """Replace the *path* with the ephemeral ZNode owned by our session.
+
+        The old ZNode is deleted and the new one is created with a single ``multi`` request, therefore other members
+        never observe the *path* missing.
+
+        :param path: path of the ZNode.
+        :param value: value of the new ZNode.
+
+        :raises: the exception of the failed operation.
+        """
+        txn = self._client.transaction()
+        txn.delete(path)
+        txn.create(path, value, ephemeral=True)
+        results = txn.commit_async().get(timeout=1)
+        if isinstance(results[0], NoNodeError):
+            self._client.create_async(path, value, makepath=True, ephemeral=True).get(timeout=1)
+        else:
+            self._raise_txn_error(results)
+
     def touch_member(self, data: Dict[str, Any]) -> bool:
         cluster = self.cluster
         member = cluster and cluster.get_member(self._name, fallback_to_leader=False)
         member_data = self.__last_member_data or member and member.data
+        encoded_data = json.dumps(data, separators=(',', ':')).encode('utf-8')
         if member and member_data:
-            # We want delete the member ZNode if our session doesn't match with session id on our member key
+            # We want recreate the member ZNode if our session doesn't match with session id on our member key
             if self._client.client_id is not None and member.session != self._client.client_id[0]:
                 logger.warning('Recreating the member ZNode due to ownership mismatch')
                 try:
-                    self._client.delete_async(self.member_path).get(timeout=1)
-                except NoNodeError:
-                    pass
+                    self._recreate_ephemeral(self.member_path, encoded_data)
+                    self.__last_member_data = data
+                    return True
                 except Exception:
+                    logger.exception('touch_member')
                     return False
-                member = None
 
-        encoded_data = json.dumps(data, separators=(',', ':')).encode('utf-8')
         if member and member_data:
             if deep_compare(data, member_data):
                 return True
@@ -392,35 +702,121 @@ class ZooKeeper(AbstractDCS):
     def take_leader(self) -> bool:
         return self.attempt_to_acquire_leader()
 
+    def _set_or_batch(self, key: str, value: str) -> bool:
+        """Write *value* to the *key* or add it to the write batch if one is being collected.
+
+        :param key: path of the ZNode.
+        :param value: value to write.
+
+        :returns: ``True`` if the *value* was written or added to the batch.
+        """
+        if self._write_batch is not None:
+            self._write_batch.append((key, value))
+            return True
+        return self._set_or_create(key, value) is not False
+
     def _write_leader_optime(self, last_lsn: str) -> bool:
-        return self._set_or_create(self.leader_optime_path, last_lsn) is not False
+        return self._set_or_batch(self.leader_optime_path, last_lsn)
 
     def _write_status(self, value: str) -> bool:
-        return self._set_or_create(self.status_path, value) is not False
+        return self._set_or_batch(self.status_path, value)
 
     def _write_failsafe(self, value: str) -> bool:
-        return self._set_or_create(self.failsafe_path, value) is not False
+        return self._set_or_batch(self.failsafe_path, value)
+
+    def _commit_write_batch(self, leader: Leader, batch: List[Tuple[str, str]]) -> bool:
+        """Execute all writes collected in the *batch* with a single ``multi`` request.
+
+        The value of the leader ZNode is never changed, therefore its version is always ``0``, even after another
+        member recreated it, and the version check in the ``multi`` request only guarantees that the leader ZNode
+        exists. Before sending the request we check that the leader ZNode is owned by our session, using its
+        ``ephemeralOwner`` from the cache (i.e. it is as fresh as the last received watch event). The check is not
+        atomic with the ``multi`` request, so it doesn't give more guarantees than separate writes do.
+
+        Values are written one by one if there is only one of them, or if the cache isn't available, because
+        reading the leader ZNode would cost one more request than separate writes.
+
+        ZNodes that don't exist yet can't be created with ``multi`` without knowing it in advance, therefore if any
+        of them is missing values are written one by one.
+
+        :param leader: :class:`Leader` object with information about the current leader ZNode.
+        :param batch: list of ``(path, value)`` tuples.
+
+        :returns: ``True`` if all values were written.
+        """
+        if len(batch) < 2 or not self._cache or not self._cache.covers(self.leader_path) or not self._cache.is_ready():
+            return all(self._set_or_create(key, value) is not False for key, value in batch)
+
+        txn = self._client.transaction()
+        txn.check(self.leader_path, leader.version)
+        for key, value in batch:
+            txn.set_data(key, value.encode('utf-8'))
+        try:
+            node = self._cache.get_node(self.leader_path)
+            if not node or not self._client.client_id or node[1].ephemeralOwner != self._client.client_id[0]:
+                logger.warning('The leader ZNode is not owned by our session')
+                return False
+            results = txn.commit_async().get(timeout=1)
+        except Exception as e:
+            logger.error('Failed to commit the transaction: %r', e)
+            return False
+        if isinstance(results[0], Exception):
+            return False
+        if any(isinstance(result, NoNodeError) for result in results[1:]):
+            return all(self._set_or_create(key, value) is not False for key, value in batch)
+        if any(isinstance(result, Exception) for result in results):
+            return False
+        self.operation_stats.save_rpcs(len(batch) - 1)
+        return True
+
+    def update_leader(self, cluster: Cluster, last_lsn: Optional[int],
+                      slots: Optional[Dict[str, int]] = None, failsafe: Optional[Dict[str, str]] = None) -> bool:
+        """Check the ownership of the leader ZNode and update ``/status``, ``/optime/leader`` and ``/failsafe``.
+
+        .. note::
+            Unless ``batch_writes`` is disabled, writes to ``/status``, ``/optime/leader`` and ``/failsafe`` ZNodes
+            are collected while the :meth:`~AbstractDCS.update_leader` is running and executed afterwards, with a
+            single ``multi`` request if possible. If it fails, values are written again on the next HA cycle.
+
+        :param cluster: :class:`Cluster` object with information about the current cluster state.
+        :param last_lsn: absolute WAL LSN in bytes.
+        :param slots: dictionary with permanent slots ``confirmed_flush_lsn``.
+        :param failsafe: if defined dictionary passed to :meth:`~AbstractDCS.write_failsafe`.
+
+        :returns: ``True`` if we are still the owner of the leader ZNode.
+        """
+        if not self._batch_writes:
+            return super(ZooKeeper, self).update_leader(cluster, last_lsn, slots, failsafe)
+
+        if TYPE_CHECKING:  # pragma: no cover
+            assert isinstance(cluster.leader, Leader)
+        last_written = self._last_status, self._last_failsafe, self._last_lsn
+        batch: Optional[List[Tuple[str, str]]] = []
+        self._write_batch = batch
+        try:
+            ret = super(ZooKeeper, self).update_leader(cluster, last_lsn, slots, failsafe)
+            if batch and not self._commit_write_batch(cluster.leader, batch):
+                logger.warning('Failed to write %s', ', '.join(key for key, _ in batch))
+                batch = None
+        except Exception:
+            batch = None
+            raise
+        finally:
+            self._write_batch = None
+            if batch is None:
+                # make sure that values will be written again on the next HA cycle
+                self._last_status, self._last_failsafe, self._last_lsn = last_written
+        return ret
 
     def _update_leader(self, leader: Leader) -> bool:
         if self._client.client_id and self._client.client_id[0] != leader.session:
             logger.warning('Recreating the leader ZNode due to ownership mismatch')
             try:
-                self._client.retry(self._client.delete, self.leader_path)
-            except NoNodeError:
-                pass
+                self._client.retry(self._recreate_ephemeral, self.leader_path, self._name.encode('utf-8'))
             except (ConnectionClosedError, RetryFailedError) as e:
                 raise ZooKeeperError(e)
             except Exception as e:
-                logger.error('Failed to remove %s: %r', self.leader_path, e)
-                return False
-
-            try:
-                self._client.retry(self._client.create, self.leader_path,
-                                   self._name.encode('utf-8'), makepath=True, ephemeral=True)
-            except (ConnectionClosedError, RetryFailedError) as e:
-                raise ZooKeeperError(e)
-            except Exception as e:
-                logger.error('Failed to create %s: %r', self.leader_path, e)
+                logger.error('Failed to recreate %s: %r', self.leader_path, e)
                 return False
         return True
 
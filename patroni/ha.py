@@ -7,8 +7,11 @@ import sys
 import time
 import uuid
 
+from bisect import bisect_left
+from contextlib import contextmanager
 from threading import RLock
-from typing import Any, Callable, cast, Collection, Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING, Union
+from typing import Any, Callable, cast, Collection, Dict, Iterator, \
+    List, NamedTuple, Optional, Tuple, TYPE_CHECKING, Union
 
 from . import global_config, psycopg, thread_pool
 from .__main__ import Patroni
@@ -175,12 +178,13 @@ class Failsafe(object):
         if leader:
             # We rely on the strict order of fields in the namedtuple
             status = Status(cluster.status[0], leader.member.data['slots'], *cluster.status[2:])
-            cluster = Cluster(*cluster[0:2], leader, status, *cluster[4:])
             # To advance LSN of replication slots on the primary for nodes that are doing cascading
             # replication from other nodes we need to update `xlog_location` on respective members.
-            for member in cluster.members:
-                if member.replicatefrom and status.slots and member.name in status.slots:
-                    member.data['xlog_location'] = status.slots[member.name]
+            # Members are copied, because Cluster objects could be shared with other DCS consumers.
+            members = [Member(m.version, m.name, m.session, {**m.data, 'xlog_location': status.slots[m.name]})
+                       if m.replicatefrom and status.slots and m.name in status.slots else m
+                       for m in cluster.members]
+            cluster = Cluster(cluster[0], cluster[1], leader, status, members, *cluster[5:])
         return cluster
 
     def is_active(self) -> bool:
@@ -220,8 +224,108 @@ class Failsafe(object):
                 self._reset_state()
 
 
+class CycleTimer(object):
+    """Always-on timer of the HA cycle phases.
+
+    Durations of phases are accumulated during the cycle and, when it finishes, stored as the last cycle breakdown and
+    added to cumulative histograms, which are exposed through ``GET /patroni`` and ``GET /metrics``.
+    """
+
+    PHASES = ('load_cluster', 'global_config', 'cluster_info', 'touch_member',
+              'update_lock', 'sync_replication', 'sync_slots', 'total')
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self) -> None:
+        """Create a :class:`CycleTimer` instance."""
+        self._lock = RLock()
+        self._start = 0.0
+        self._current: Dict[str, float] = {}
+        self.last: Dict[str, float] = {}
+        self.histograms = {phase: [0] * (len(self.BUCKETS) + 1) for phase in self.PHASES}
+        self.sums = dict.fromkeys(self.PHASES, 0.0)
+
+    def start(self) -> None:
+        """Start a new HA cycle."""
+        with self._lock:
+            self._current = {}
+        self._start = time.monotonic()
+
+    def elapsed(self) -> float:
+        """Time passed since the start of the current HA cycle.
+
+        :returns: number of seconds since :meth:`start` was called.
+        """
+        return time.monotonic() - self._start
+
+    def add(self, phase: str, duration: float) -> None:
+        """Add *duration* to the time spent in *phase* during the current cycle.
+
+        :param phase: name of the phase, one of :attr:`PHASES`.
+        :param duration: time spent in seconds.
+        """
+        with self._lock:
+            self._current[phase] = self._current.get(phase, 0.0) + duration
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Account the time spent in the context to *phase* of the current cycle.
+
+        :param phase: name of the phase, one of :attr:`PHASES`.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(phase, time.monotonic() - start)
+
+    def finish(self) -> None:
+        """Finish the current HA cycle and account durations of its phases."""
+        self.add('total', time.monotonic() - self._start)
+        with self._lock:
+            self.last = self._current
+            for phase, duration in self._current.items():
+                self.histograms[phase][bisect_left(self.BUCKETS, duration)] += 1
+                self.sums[phase] += duration
+
+    def describe_last(self) -> str:
+        """Describe the last HA cycle breakdown for logging.
+
+        :returns: phases of the last cycle with their durations, the slowest first.
+        """
+        with self._lock:
+            last = sorted(self.last.items(), key=lambda item: -item[1])
+        return ', '.join('{0}={1:.3f}s'.format(phase, duration) for phase, duration in last)
+
+    def snapshot(self) -> Tuple[Dict[str, List[int]], Dict[str, float]]:
+        """Get a consistent copy of histograms.
+
+        :returns: per phase counts of observations in every bucket of :attr:`BUCKETS` (not cumulative, the last one is
+            for durations above the largest bucket) and per phase sums of durations.
+        """
+        with self._lock:
+            return {phase: list(counts) for phase, counts in self.histograms.items()}, dict(self.sums)
+
+
+def _cycle_phase(phase: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorate a method of :class:`Ha` to account the time spent in it to *phase* of the current HA cycle.
+
+    :param phase: name of the phase, one of :attr:`CycleTimer.PHASES`.
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(self: 'Ha', *args: Any, **kwargs: Any) -> Any:
+            with self.cycle_timer.phase(phase):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 class Ha(object):
 
+    # timeout and number of retries of ``POST /failsafe`` requests to members of the failsafe topology
+    _FAILSAFE_REQUEST_TIMEOUT = 2
+    _FAILSAFE_REQUEST_RETRIES = 1
+
     def __init__(self, patroni: Patroni):
         self.patroni = patroni
         self.state_handler = patroni.postgresql
@@ -260,6 +364,14 @@ class Ha(object):
         self._prev_wal_lsn: Optional[int] = None
         # timestamp when primary_race_backoff was triggered
         self._primary_race_backoff_timestamp = 0
+        self.cycle_timer = CycleTimer()
+        # statuses of other members fetched in background during the current cycle, member name -> (api_url, future)
+        self._prefetched_statuses: Dict[str, Tuple[str, 'concurrent.futures.Future[_MemberStatus]']] = {}
+        # durations of the last ``POST /failsafe`` requests to members of the failsafe topology, member name -> seconds.
+        # Requests could still be running in the thread pool when the check is finished, changes are protected by
+        # _failsafe_response_times_lock.
+        self.failsafe_response_times: Dict[str, float] = {}
+        self._failsafe_response_times_lock = RLock()
 
         # Count of concurrent sync disabling requests. Value above zero means that we don't want to be synchronous
         # standby. Changes protected by _member_state_lock.
@@ -332,6 +444,7 @@ class Ha(object):
             return 'failover'
         return 'switchover' if self.cluster.failover.leader else 'manual failover'
 
+    @_cycle_phase('load_cluster')
     def load_cluster_from_dcs(self) -> None:
         cluster = self.dcs.get_cluster()
 
@@ -371,6 +484,7 @@ class Ha(object):
                 ret[self.state_handler.name] = self.patroni.api.connection_string
             return ret
 
+    @_cycle_phase('update_lock')
     def update_lock(self, update_status: bool = False) -> bool:
         """Update the leader lock in DCS.
 
@@ -445,6 +559,7 @@ class Ha(object):
                     logger.warning('Request to %s coordinator leader %s %s failed: %r', mpp_handler.type,
                                    coordinator.leader.name, coordinator.leader.member.api_url, e)
 
+    @_cycle_phase('touch_member')
     def touch_member(self) -> bool:
         with self._member_state_lock:
             data: Dict[str, Any] = {
@@ -739,11 +854,16 @@ class Ha(object):
         if node_to_follow and not isinstance(node_to_follow, RemoteMember):
             # we are going to abuse Member.data to pass following parameters
             params = ('restore_command', 'archive_cleanup_command')
-            for param in params:  # It is highly unlikely to happen, but we want to protect from the case
-                node_to_follow.data.pop(param, None)  # when above-mentioned params came from outside.
+            # It is highly unlikely to happen, but we want to protect from the case when above-mentioned params came
+            # from outside. Member objects are shared with other DCS consumers, therefore the data is copied.
+            member = node_to_follow.member if isinstance(node_to_follow, Leader) else node_to_follow
+            data = {k: v for k, v in member.data.items() if k not in params}
             if self.is_standby_cluster():
                 standby_config = global_config.get_standby_cluster_config()
-                node_to_follow.data.update({p: standby_config[p] for p in params if standby_config.get(p)})
+                data.update({p: standby_config[p] for p in params if standby_config.get(p)})
+            member = Member(member.version, member.name, member.session, data)
+            node_to_follow = Leader(node_to_follow.version, node_to_follow.session, member)\
+                if isinstance(node_to_follow, Leader) else member
 
         return node_to_follow
 
@@ -1034,6 +1154,7 @@ class Ha(object):
             else:
                 logger.info("Synchronous replication key updated by someone else")
 
+    @_cycle_phase('sync_replication')
     def process_sync_replication(self) -> None:
         """Process synchronous replication behavior on the primary."""
         if self.is_quorum_commit_mode():
@@ -1254,11 +1375,43 @@ class Ha(object):
             logger.warning("Request failed to %s: GET %s (%s)", member.name, member.api_url, e)
         return _MemberStatus.unknown(member)
 
+    def prefetch_nodes_statuses(self) -> None:
+        """Start fetching statuses of other members in background if the leader race may happen in this cycle.
+
+        While the cluster has no leader, statuses are requested right after loading the cluster from DCS, so that the
+        requests are executed concurrently with querying of Postgres and updating the member key, and
+        :meth:`fetch_nodes_statuses` doesn't have to wait for responses later in the cycle. Manual failovers aren't
+        time critical and are handled without prefetching.
+        """
+        self._prefetched_statuses = {}
+        if not self.cluster.is_unlocked() or self.cluster.failover or self.is_paused() or self.patroni.nofailover\
+                or not self.cluster.initialize or self.state_handler.bootstrapping:
+            return
+
+        executor = thread_pool.get_executor()
+        self._prefetched_statuses = {member.name: (member.api_url, executor.submit(self.fetch_node_status, member))
+                                     for member in self.cluster.members
+                                     if member.name != self.state_handler.name and member.api_url}
+
     def fetch_nodes_statuses(self, members: List[Member]) -> List[_MemberStatus]:
+        """Fetch statuses of *members* in parallel.
+
+        Statuses prefetched in the current cycle by :meth:`prefetch_nodes_statuses` are used once, if the member
+        ``api_url`` didn't change in the meantime.
+
+        :param members: members to fetch statuses from.
+
+        :returns: statuses of *members*, in the order of responses.
+        """
         if not members:
             return []
 
-        futures = [thread_pool.get_executor().submit(self.fetch_node_status, member) for member in members]
+        futures: List['concurrent.futures.Future[_MemberStatus]'] = []
+        for member in members:
+            api_url, future = self._prefetched_statuses.pop(member.name, (None, None))
+            if future is None or api_url != member.api_url:
+                future = thread_pool.get_executor().submit(self.fetch_node_status, member)
+            futures.append(future)
         # Run API calls on members in parallel
         results = [future.result() for future in concurrent.futures.as_completed(futures)]
         return results
@@ -1287,8 +1440,10 @@ class Ha(object):
         """
         endpoint = 'failsafe'
         url = member.get_endpoint_url(endpoint)
+        start = time.monotonic()
         try:
-            response = self.patroni.request(member, 'post', endpoint, data, timeout=2, retries=1)
+            response = self.patroni.request(member, 'post', endpoint, data, timeout=self._FAILSAFE_REQUEST_TIMEOUT,
+                                            retries=self._FAILSAFE_REQUEST_RETRIES)
             response_data = response.data.decode('utf-8')
             logger.info('Got response from %s %s: %s', member.name, url, response_data)
             accepted = response.status == 200 and response_data == 'Accepted'
@@ -1296,6 +1451,9 @@ class Ha(object):
             return _FailsafeResponse(member.name, accepted, parse_int(response.headers.get('lsn')))
         except Exception as e:
             logger.warning("Request failed to %s: POST %s (%s)", member.name, url, e)
+        finally:
+            with self._failsafe_response_times_lock:
+                self.failsafe_response_times[member.name] = time.monotonic() - start
         return _FailsafeResponse(member.name, False, None)
 
     def check_failsafe_topology(self) -> bool:
@@ -1320,6 +1478,12 @@ class Ha(object):
             used by the primary to advance position of replication slots that for nodes that are doing cascading
             replication from other nodes. It is required to avoid indefinite growth of ``pg_wal``.
 
+            Members are called in parallel and the check finishes as soon as its outcome is known: on the first
+            member that doesn't agree, or if not all members responded within the deadline. The deadline is the time
+            a single request could take including its retry, but not longer than what is left of ``loop_wait`` in the
+            current cycle, so an unresponsive member can't hold the cycle longer than its own request would. Requests
+            that are still queued are cancelled, and requests in flight are left to complete in background.
+
         :returns: ``True`` if all members from the ``/failsafe`` topology agree that this node could continue to
                   run as a ``primary``, or ``False`` if some of standby nodes are not accessible or don't agree.
         """
@@ -1341,14 +1505,33 @@ class Ha(object):
         if not members:  # A single node cluster
             return True
 
+        names = {member.name for member in members}
+        with self._failsafe_response_times_lock:
+            self.failsafe_response_times = {name: value for name, value in self.failsafe_response_times.items()
+                                            if name in names}
+
+        request_timeout = self._FAILSAFE_REQUEST_TIMEOUT
+        timeout = min(request_timeout * (self._FAILSAFE_REQUEST_RETRIES + 1),
+                      max(request_timeout, self.dcs.loop_wait - self.cycle_timer.elapsed()))
         futures = [thread_pool.get_executor().submit(self.call_failsafe_member, data, member) for member in members]
-        results = [future.result() for future in concurrent.futures.as_completed(futures)]
-        ret = all(r.accepted for r in results)
-        if ret:
-            # The LSN feedback will be later used to advance position of replication slots
-            # for nodes that are doing cascading replication from other nodes.
-            self._failsafe.update_slots({r.member_name: r.lsn for r in results if r.lsn})
-        return ret
+        results: List[_FailsafeResponse] = []
+        try:
+            for future in concurrent.futures.as_completed(futures, timeout=timeout):
+                result = future.result()
+                if not result.accepted:
+                    return False
+                results.append(result)
+        except concurrent.futures.TimeoutError:
+            logger.warning('Not all members of the failsafe topology responded in %.1f seconds', timeout)
+            return False
+        finally:
+            for future in futures:
+                future.cancel()
+
+        # The LSN feedback will be later used to advance position of replication slots
+        # for nodes that are doing cascading replication from other nodes.
+        self._failsafe.update_slots({r.member_name: r.lsn for r in results if r.lsn})
+        return True
 
     def is_lagging(self, wal_position: int) -> bool:
         """Check if node should consider itself unhealthy to be promoted due to replication lag.
@@ -2254,12 +2437,16 @@ class Ha(object):
 
     def _run_cycle(self) -> str:
         self._prev_wal_lsn = self._last_wal_lsn
+        self._prefetched_statuses = {}
         dcs_failed = False
         try:
             try:
                 self.load_cluster_from_dcs()
-                global_config.update(self.cluster)
-                self.state_handler.reset_cluster_info_state(self.cluster, self.patroni)
+                with self.cycle_timer.phase('global_config'):
+                    global_config.update(self.cluster)
+                self.prefetch_nodes_statuses()
+                with self.cycle_timer.phase('cluster_info'):
+                    self.state_handler.reset_cluster_info_state(self.cluster, self.patroni)
             except Exception as exc1:
                 self.state_handler.reset_cluster_info_state(None)
                 if self.is_failsafe_mode():
@@ -2455,6 +2642,7 @@ class Ha(object):
                 self._sync_replication_slots(True)
         return 'DCS is not accessible'
 
+    @_cycle_phase('sync_slots')
     def _sync_replication_slots(self, dcs_failed: bool) -> List[str]:
         """Handles replication slots.
 
@@ -2481,6 +2669,7 @@ class Ha(object):
 
     def run_cycle(self) -> str:
         with self._async_executor:
+            self.cycle_timer.start()
             try:
                 info = self._run_cycle()
                 return (self.is_paused() and 'PAUSE: ' or '') + info
@@ -2489,6 +2678,8 @@ class Ha(object):
             except Exception:
                 logger.exception('Unexpected exception')
                 return 'Unexpected exception raised, please report it as a BUG'
+            finally:
+                self.cycle_timer.finish()
 
     def shutdown(self) -> None:
         self._async_executor.cancel()
@@ -2600,11 +2791,11 @@ class Ha(object):
             if self.sync_mode_is_active() and not self.cluster.sync.matches(node.name)\
                     and not (failover and not failover.leader):
                 return False
-            # Don't spend time on "nofailover" nodes checking.
-            # We also don't need nodes which we can't query with the api in the list.
-            # And, if exclude_failover_candidate is True we want to skip  node.name == failover.candidate check.
-            return node.name not in exclude and not node.nofailover and bool(node.api_url) and \
+            # If exclude_failover_candidate is True we want to skip  node.name == failover.candidate check.
+            return node.name not in exclude and \
                 (exclude_failover_candidate or not failover
                  or not failover.candidate or node.name == failover.candidate)
 
-        return list(filter(is_eligible, self.cluster.members))
+        # Don't spend time on "nofailover" nodes checking.
+        # We also don't need nodes which we can't query with the api in the list.
+        return list(filter(is_eligible, self.cluster.failover_candidates))
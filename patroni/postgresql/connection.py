@@ -1,7 +1,8 @@
 import logging
+import time
 
 from contextlib import contextmanager
-from threading import Lock
+from threading import Condition, Lock
 from typing import Any, Dict, Generator, List, Optional, Tuple, TYPE_CHECKING, Union
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -9,7 +10,7 @@ if TYPE_CHECKING:  # pragma: no cover
     from psycopg2 import connection, cursor
 
 from .. import psycopg
-from ..exceptions import PostgresConnectionException
+from ..exceptions import PostgresConnectionException, PostgresException
 
 logger = logging.getLogger(__name__)
 
@@ -104,16 +105,147 @@ class NamedConnection:
         return ret
 
 
+class ConnectionPoolExhausted(PostgresException):
+    """No connection in a :class:`NamedConnectionPool` became available within the checkout timeout."""
+
+    pass
+
+
+class NamedConnectionPool:
+    """A bounded set of :class:`NamedConnection` objects sharing the same name.
+
+    Allows running queries from multiple threads in parallel, where a single :class:`NamedConnection` would serialize
+    them. Connections are opened lazily, idle connections are closed after :attr:`idle_timeout` seconds, and callers
+    that could not check out a connection within :attr:`timeout` seconds get :exc:`ConnectionPoolExhausted`.
+
+    :ivar max_size: maximum number of connections.
+    :ivar timeout: how long (in seconds) :func:`checkout` waits for a free connection.
+    :ivar idle_timeout: after how many seconds an unused connection is closed.
+    :ivar checkouts: number of successful checkouts.
+    :ivar exhausted: number of checkouts failed due to timeout.
+    :ivar wait_time: total time (in seconds) spent waiting for a free connection by successful checkouts.
+    """
+
+    def __init__(self, pool: 'ConnectionPool', name: str) -> None:
+        """Create an instance of :class:`NamedConnectionPool` class.
+
+        :param pool: reference to a :class:`ConnectionPool` object.
+        :param name: name of the connections.
+        """
+        self._pool = pool
+        self._name = name
+        self._cond = Condition()
+        self._idle: List[Tuple[float, NamedConnection]] = []  # (time of the last use, connection), oldest first
+        self._size = 0
+        self.max_size = 1
+        self.timeout = 5.0
+        self.idle_timeout = 300.0
+        self.checkouts = self.exhausted = 0
+        self.wait_time = 0.0
+
+    @property
+    def size(self) -> int:
+        """Number of connection objects that are currently managed by the pool."""
+        return self._size
+
+    @property
+    def in_use(self) -> int:
+        """Number of connections that are currently checked out."""
+        with self._cond:
+            return self._size - len(self._idle)
+
+    def configure(self, max_size: int, timeout: float, idle_timeout: float) -> None:
+        """Change the pool parameters.
+
+        :param max_size: maximum number of connections.
+        :param timeout: how long (in seconds) :func:`checkout` waits for a free connection.
+        :param idle_timeout: after how many seconds an unused connection is closed.
+        """
+        with self._cond:
+            self.max_size = max(1, max_size)
+            self.timeout = timeout
+            self.idle_timeout = idle_timeout
+            while self._idle and self._size > self.max_size:
+                self._discard(self._idle.pop(0)[1])
+            self._cond.notify_all()
+
+    def _discard(self, connection: NamedConnection) -> None:
+        """Close *connection* and forget about it. Must be called with the lock held.
+
+        :param connection: the connection to be closed.
+        """
+        connection.close(True)
+        self._size -= 1
+
+    def _reap(self, now: float) -> None:
+        """Close connections that were not used for longer than :attr:`idle_timeout`. Must be called with the lock held.
+
+        .. note::
+            The most recently used connection is always kept open.
+
+        :param now: current time.
+        """
+        while len(self._idle) > 1 and self._idle[0][0] + self.idle_timeout < now:
+            self._discard(self._idle.pop(0)[1])
+
+    @contextmanager
+    def checkout(self) -> Generator[NamedConnection, None, None]:
+        """Check out a connection from the pool, waiting up to :attr:`timeout` seconds for a free one.
+
+        :yields: a :class:`NamedConnection` object, that is returned to the pool upon exit from the context.
+
+        :raises:
+            :exc:`ConnectionPoolExhausted`: if all connections are in use and none was returned within the timeout.
+        """
+        start = time.time()
+        with self._cond:
+            while True:
+                self._reap(start)
+                if self._idle:
+                    connection = self._idle.pop()[1]
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection = NamedConnection(self._pool, self._name, None)
+                    break
+                remaining = start + self.timeout - time.time()
+                if remaining <= 0:
+                    self.exhausted += 1
+                    raise ConnectionPoolExhausted(f'all {self._size} patroni {self._name} connections are busy')
+                self._cond.wait(remaining)
+            self.checkouts += 1
+            self.wait_time += time.time() - start
+        try:
+            yield connection
+        finally:
+            with self._cond:
+                if self._size > self.max_size:
+                    self._discard(connection)
+                else:
+                    self._idle.append((time.time(), connection))
+                self._cond.notify()
+
+    def close(self) -> bool:
+        """Close all idle connections of the pool.
+
+        :returns: ``True`` if at least one ``psycopg`` connection was closed, ``False`` otherwise.
+        """
+        with self._cond:
+            return any([connection.close(True) for _, connection in self._idle])
+
+
 class ConnectionPool:
     """Helper class to manage named connections from Patroni to PostgreSQL.
 
-    The instance keeps named :class:`NamedConnection` objects and parameters that must be used for new connections.
+    The instance keeps named :class:`NamedConnection` and :class:`NamedConnectionPool` objects and parameters that
+    must be used for new connections.
     """
 
     def __init__(self) -> None:
         """Create an instance of :class:`ConnectionPool` class."""
         self._lock = Lock()
         self._connections: Dict[str, NamedConnection] = {}
+        self._pools: Dict[str, NamedConnectionPool] = {}
         self._conn_kwargs: Dict[str, Any] = {}
 
     @property
@@ -150,10 +282,26 @@ class ConnectionPool:
                 self._connections[name] = NamedConnection(self, name, kwargs_override)
         return self._connections[name]
 
+    def get_pool(self, name: str) -> NamedConnectionPool:
+        """Get a :class:`NamedConnectionPool` object with connections named *name*.
+
+        .. note::
+            Creates a new :class:`NamedConnectionPool` object if it doesn't yet exist.
+
+        :param name: name of the connections.
+
+        :returns: :class:`NamedConnectionPool` object.
+        """
+        with self._lock:
+            if name not in self._pools:
+                self._pools[name] = NamedConnectionPool(self, name)
+        return self._pools[name]
+
     def close(self) -> None:
         """Close all named connections from Patroni to PostgreSQL registered in the pool."""
         with self._lock:
             closed_connections = [conn.close(True) for conn in self._connections.values()]
+            closed_connections += [pool.close() for pool in self._pools.values()]
             if any(closed_connections):
                 logger.info("closed patroni connections to postgres")
 
@@ -237,8 +237,8 @@ class _ReplicaList(List[_Replica]):
             'remote_write': 'write'
         }.get(postgresql.synchronous_commit(), 'flush') + '_lsn'
 
-        members = CaseInsensitiveDict({m.name: m for m in cluster.members
-                                       if m.is_running and not m.nosync and m.name.lower() != postgresql.name.lower()})
+        members = CaseInsensitiveDict({m.name: m for m in cluster.running_members
+                                       if not m.nosync and m.name.lower() != postgresql.name.lower()})
         replication = CaseInsensitiveDict({row['application_name']: row for row in postgresql.pg_stat_replication()
                                            if row[sort_col] is not None and row['application_name'] in members})
         for row in replication.values():
@@ -1,7 +1,7 @@
 """Facilities for handling communication with Patroni's REST API."""
 import json
 
-from typing import Any, Dict, Optional, Union
+from typing import Any, Collection, Dict, FrozenSet, Optional, Tuple, Union
 
 import urllib3
 
@@ -27,8 +27,12 @@ class PatroniRequest(object):
     """Wrapper for performing requests to Patroni's REST API.
 
     Prepares the request manager with the configured settings before performing the request.
+
+    :cvar MIN_POOLS: minimal number of per host connection pools kept by the request manager.
     """
 
+    MIN_POOLS = 10
+
     def __init__(self, config: Union[Config, Dict[str, Any]], insecure: Optional[bool] = None) -> None:
         """Create a new :class:`PatroniRequest` instance with given *config*.
 
@@ -41,7 +45,9 @@ class PatroniRequest(object):
             * If none of the above applies, then it falls back to ``False``.
         """
         self._insecure = insecure
-        self._pool = PatroniPoolManager(num_pools=10, maxsize=10)
+        self._num_pools = self.MIN_POOLS
+        self._pool = PatroniPoolManager(num_pools=self._num_pools, maxsize=10)
+        self._peers: FrozenSet[Tuple[str, str, int]] = frozenset()
         self.reload_config(config)
 
     @staticmethod
@@ -135,6 +141,44 @@ class PatroniRequest(object):
         cacert = self._get_ctl_value(config, 'cacert') or self._get_restapi_value(config, 'cafile')
         self._apply_pool_param('ca_certs', cacert)
 
+    @staticmethod
+    def _peer_key(url: str) -> Tuple[str, str, int]:
+        """Get the key identifying the connection pool used for requests to *url*.
+
+        :param url: base URL of the member REST API.
+
+        :returns: scheme, lowercased host and port, the same way :class:`urllib3.PoolManager` identifies pools.
+        """
+        parsed = urllib3.util.parse_url(url)
+        scheme = (parsed.scheme or 'http').lower()
+        return scheme, (parsed.host or '').lower(), parsed.port or urllib3.connectionpool.port_by_scheme.get(scheme, 80)
+
+    def set_peers(self, urls: Collection[str]) -> None:
+        """Keep connection pools to the REST API of all cluster members.
+
+        The request manager is resized to hold a connection pool per member, so that persistent connections aren't
+        evicted on clusters with many members and can be reused during the leader race. Pools of members that left the
+        cluster are closed.
+
+        :param urls: base URLs of the REST API of current cluster members.
+        """
+        peers = frozenset(self._peer_key(url) for url in urls)
+        if peers == self._peers:
+            return
+
+        if len(peers) > self._num_pools:
+            self._num_pools = len(peers) + self.MIN_POOLS
+            pool = PatroniPoolManager(num_pools=self._num_pools, headers=self._pool.headers,
+                                      **self._pool.connection_pool_kw)
+            self._pool, old_pool = pool, self._pool
+            old_pool.clear()
+        else:
+            departed = self._peers - peers
+            for key in self._pool.pools.keys():
+                if (key.key_scheme, key.key_host, key.key_port) in departed:
+                    self._pool.pools.pop(key, None)
+        self._peers = peers
+
     def request(self, method: str, url: str, body: Optional[Any] = None,
                 **kwargs: Any) -> urllib3.response.HTTPResponse:
         """Perform an HTTP request.
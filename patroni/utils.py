@@ -25,7 +25,9 @@ import time
 from collections import OrderedDict
 from json import JSONDecoder
 from shlex import split
-from typing import Any, Callable, cast, Dict, Iterator, List, Mapping, Optional, Tuple, Type, TYPE_CHECKING, Union
+from threading import local
+from typing import Any, Callable, cast, Dict, Iterable, Iterator, \
+    List, Mapping, Optional, Tuple, Type, TYPE_CHECKING, Union
 
 from dateutil import tz
 from urllib3.response import HTTPResponse
@@ -635,6 +637,25 @@ def read_stripped(file_path: str) -> Iterator[str]:
             yield line.strip()
 
 
+_retry_attempts = local()
+
+
+def retry_attempts_in_thread() -> int:
+    """Get the number of retries made by :class:`Retry` objects in the current thread.
+
+    Every call of :meth:`Retry.update_delay` and of :func:`count_retry_attempt` is counted as a retry. The counter is
+    never reset, callers are expected to compare values taken before and after an operation.
+
+    :returns: total number of retry attempts made in the current thread.
+    """
+    return getattr(_retry_attempts, 'value', 0)
+
+
+def count_retry_attempt() -> None:
+    """Count a retry attempt made in the current thread by a retry helper other than :class:`Retry`."""
+    _retry_attempts.value = retry_attempts_in_thread() + 1
+
+
 class RetryFailedError(PatroniException):
     """Maximum number of attempts exhausted in retry operation."""
 
@@ -709,6 +730,7 @@ class Retry(object):
             * ``max_delay``.
         """
         self._cur_delay = min(self._cur_delay * self.backoff, self.max_delay)
+        count_retry_attempt()
 
     @property
     def stoptime(self) -> float:
@@ -884,11 +906,21 @@ def iter_response_objects(response: HTTPResponse) -> Iterator[Dict[str, Any]]:
 
     :param response: the HTTP response from which JSON documents will be retrieved.
 
+    :yields: current JSON document.
+    """
+    return iter_json_objects(response.read_chunked(decode_content=False))
+
+
+def iter_json_objects(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """Iterate over *chunks* of a stream and yield each JSON document that is found.
+
+    :param chunks: parts of the stream, JSON documents could span multiple chunks.
+
     :yields: current JSON document.
     """
     prev = ''
     decoder = JSONDecoder()
-    for chunk in response.read_chunked(decode_content=False):
+    for chunk in chunks:
         chunk = prev + chunk.decode('utf-8')
 
         length = len(chunk)
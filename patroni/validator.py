@@ -1062,6 +1062,7 @@ validate_etcd = {
     Optional("cert"): str,
     Optional("key"): str
 }
+validate_etcd3 = {**validate_etcd, Optional("batch_writes"): bool, Optional("lease_keepalive_stream"): bool}
 
 schema = Schema({
     "name": validate_name,
@@ -1109,6 +1110,17 @@ schema = Schema({
                                                  case_sensitive=True, raise_assert=True),
         Optional("allowlist"): [str],
         Optional("allowlist_include_members"): bool,
+        Optional("allowlist_members_cache_ttl"): IntValidator(min=0, base_unit='s', raise_assert=True),
+        Optional("status_snapshot_interval"): IntValidator(min=0, base_unit='ms', raise_assert=True),
+        Optional("connection_pool_size"): IntValidator(min=1, expected_type=int, raise_assert=True),
+        Optional("connection_pool_timeout"): IntValidator(min=0, base_unit='s', raise_assert=True),
+        Optional("connection_pool_idle_timeout"): IntValidator(min=0, base_unit='s', raise_assert=True),
+        Optional("server_mode"): EnumValidator(('threaded', 'asyncio'), case_sensitive=False, raise_assert=True),
+        Optional("keepalive_timeout"): IntValidator(min=0, base_unit='s', raise_assert=True),
+        Optional("keepalive_max_requests"): IntValidator(min=1, expected_type=int, raise_assert=True),
+        Optional("keepalive_max_idle_connections"): IntValidator(min=0, expected_type=int, raise_assert=True),
+        Optional("unix_socket"): str,
+        Optional("unix_socket_mode"): IntValidator(min=0, max=511, expected_type=int, raise_assert=True),
         Optional("http_extra_headers"): dict,
         Optional("https_extra_headers"): dict,
         Optional("request_queue_size"): IntValidator(min=0, max=4096, expected_type=int, raise_assert=True),
@@ -1180,10 +1192,12 @@ schema = Schema({
             Optional("service_check_interval"): str,
             Optional("service_check_tls_server_name"): str,
             Optional("consistency"): EnumValidator(('default', 'consistent', 'stale'),
-                                                   case_sensitive=True, raise_assert=True)
+                                                   case_sensitive=True, raise_assert=True),
+            Optional("use_cache"): bool,
+            Optional("batch_writes"): bool
         },
         "etcd": validate_etcd,
-        "etcd3": validate_etcd,
+        "etcd3": validate_etcd3,
         "exhibitor": {
             "hosts": [str],
             "port": IntValidator(max=65535, expected_type=int, raise_assert=True),
@@ -1212,6 +1226,8 @@ schema = Schema({
             Optional("verify"): bool,
             Optional("set_acls"): dict,
             Optional("auth_data"): dict,
+            Optional("use_persistent_watches"): bool,
+            Optional("batch_writes"): bool,
         },
         "kubernetes": {
             "labels": {},
@@ -1224,6 +1240,12 @@ schema = Schema({
             Optional("standby_leader_label_value"): str,
             Optional("tmp_role_label"): str,
             Optional("use_endpoints"): bool,
+            Optional("use_leases"): bool,
+            Optional("use_status_config_map"): bool,
+            Optional("leader_optime_interval"): int,
+            Optional("leader_optime_delta"): int,
+            Optional("status_lsn_interval"): int,
+            Optional("status_lsn_delta"): int,
             Optional("pod_ip"): Or(is_ipv4_address, is_ipv6_address),
             Optional("ports"): [{"name": str, "port": IntValidator(max=65535, expected_type=int, raise_assert=True)}],
             Optional("cacert"): str,
@@ -1,18 +1,27 @@
 import datetime
 import json
+import os
 import socket
+import stat
+import tempfile
+import time
 import unittest
 
+from contextlib import contextmanager
+from http.client import HTTPConnection
 from http.server import HTTPServer
 from io import BytesIO as IO
+from ipaddress import ip_address
+from threading import Thread
 from unittest.mock import Mock, patch, PropertyMock
 
 from patroni import global_config
-from patroni.api import RestApiHandler, RestApiServer
-from patroni.dcs import ClusterConfig, Member
+from patroni.api import ClusterEvents, RestApiHandler, RestApiServer
+from patroni.dcs import ClusterConfig, DCSOperationStats, Failover, Member
 from patroni.exceptions import PostgresConnectionException
-from patroni.ha import _MemberStatus
+from patroni.ha import _MemberStatus, CycleTimer
 from patroni.postgresql.config import get_param_diff
+from patroni.postgresql.connection import ConnectionPoolExhausted, NamedConnectionPool
 from patroni.postgresql.misc import PostgresqlRole, PostgresqlState
 from patroni.psycopg import OperationalError
 from patroni.utils import RetryFailedError, tzutc
@@ -38,12 +47,26 @@ class MockConnection:
                  + '"state":"streaming","sync_state":"async","sync_priority":0}]')]
 
 
+class MockNamedConnectionPool(NamedConnectionPool):
+
+    @contextmanager
+    def checkout(self):
+        with super(MockNamedConnectionPool, self).checkout():
+            yield MockConnection()
+
+
 class MockConnectionPool:
 
+    restapi_pool = MockNamedConnectionPool(None, 'restapi')
+
     @staticmethod
     def get(*args):
         return MockConnection()
 
+    @staticmethod
+    def get_pool(*args):
+        return MockConnectionPool.restapi_pool
+
 
 class MockPostgresql:
 
@@ -88,6 +111,8 @@ class MockHa(object):
 
     state_handler = MockPostgresql()
     watchdog = MockWatchdog()
+    cycle_timer = CycleTimer()
+    failsafe_response_times = {'other': 0.01}
 
     @staticmethod
     def update_failsafe(*args):
@@ -257,6 +282,10 @@ class TestRestApiHandler(unittest.TestCase):
         with patch.object(global_config.__class__, 'is_standby_cluster', Mock(return_value=True)), \
                 patch.object(global_config.__class__, 'is_paused', Mock(return_value=True)):
             MockRestApiServer(RestApiHandler, 'GET /standby_leader')
+        with patch.object(RestApiHandler, 'write_response') as mock_write_response:
+            config = {'listen': '127.0.0.1:8008', 'status_snapshot_interval': '250ms'}
+            MockRestApiServer(RestApiHandler, 'GET /replica', config)
+            self.assertIn('"status_snapshot_age": 0.0', mock_write_response.call_args[0][1])
 
         # test tags
         #
@@ -402,6 +431,10 @@ class TestRestApiHandler(unittest.TestCase):
     @patch.object(MockPostgresql, 'state', PropertyMock(return_value=PostgresqlState.STOPPED))
     def test_do_GET_patroni(self):
         self.assertIsNotNone(MockRestApiServer(RestApiHandler, 'GET /patroni'))
+        with patch.object(MockHa.cycle_timer, 'last', {'total': 0.5}), \
+                patch.object(RestApiHandler, '_write_status_response') as mock_response:
+            MockRestApiServer(RestApiHandler, 'GET /patroni')
+            self.assertEqual(mock_response.call_args[0][1]['ha_cycle'], {'total': 0.5})
 
     def test_basicauth(self):
         self.assertIsNotNone(MockRestApiServer(RestApiHandler, 'POST /restart HTTP/1.0'))
@@ -440,6 +473,26 @@ class TestRestApiHandler(unittest.TestCase):
         # Test with failsafe as None
         type(mock_dcs).failsafe = PropertyMock(return_value=None)
         self.assertIsNotNone(MockRestApiServer(RestApiHandler, 'GET /metrics'))
+        # Test with DCS operation stats
+        mock_dcs.operation_stats = Mock(spec=DCSOperationStats, BUCKETS=DCSOperationStats.BUCKETS, rpcs_saved=2)
+        stats = DCSOperationStats()
+        stats.observe('load_cluster', 0.01, 1, 'RetryFailedError')
+        mock_dcs.operation_stats.snapshot.return_value = stats.snapshot()
+        stats.relisted('pods')
+        stats.observe_watch_lag('pods', 0.02)
+        mock_dcs.operation_stats.watch_snapshot.return_value = stats.watch_snapshot()
+        mock_dcs.lease_ttl_remaining = 12.5
+        with patch.object(RestApiHandler, 'write_response') as mock_response:
+            MockRestApiServer(RestApiHandler, 'GET /metrics')
+            self.assertIn('patroni_dcs_operation_errors{scope="dummy",name="test",operation="load_cluster",'
+                          'error="RetryFailedError"} 1', mock_response.call_args[0][1])
+            self.assertIn('patroni_dcs_rpcs_saved{scope="dummy",name="test"} 2', mock_response.call_args[0][1])
+            self.assertIn('patroni_dcs_watch_relists{scope="dummy",name="test",cache="pods"} 1',
+                          mock_response.call_args[0][1])
+            self.assertIn('patroni_dcs_watch_lag_seconds_count{scope="dummy",name="test",cache="pods"} 1',
+                          mock_response.call_args[0][1])
+            self.assertIn('patroni_dcs_lease_ttl_remaining_seconds{scope="dummy",name="test"} 12.500',
+                          mock_response.call_args[0][1])
 
     @patch.object(MockPatroni, 'dcs')
     def test_do_PATCH_config(self, mock_dcs):
@@ -748,6 +801,12 @@ class TestRestApiHandler(unittest.TestCase):
         MockRestApiServer(RestApiHandler, post + '0\n\n')
         MockRestApiServer(RestApiHandler, post + '14\n\n{"leader":"1"}')
 
+    @patch.object(RestApiHandler, 'send_error')
+    def test_connection_pool_exhausted(self, mock_send_error):
+        with patch.object(RestApiServer, 'query', Mock(side_effect=ConnectionPoolExhausted('busy'))):
+            MockRestApiServer(RestApiHandler, 'GET /patroni')
+        mock_send_error.assert_called_once_with(503, 'busy')
+
     @patch.object(MockHa, 'is_leader', Mock(return_value=True))
     def test_do_POST_mpp(self):
         post = 'POST /mpp HTTP/1.0' + self._authorization + '\nContent-Length: '
@@ -790,6 +849,312 @@ class TestRestApiServer(unittest.TestCase):
         mock_rh.client_address = ('127.0.0.1',)
         mock_rh.request.getpeercert.return_value = None
         self.assertIsNot(self.srv.check_access(mock_rh), True)
+        self.assertEqual(self.srv.members_ips_cache.misses, 1)
+
+    @patch('socket.getaddrinfo', Mock(side_effect=socket_getaddrinfo))
+    def test_members_ips_cache(self):
+        cache = self.srv.members_ips_cache
+        cluster = get_cluster_initialized_without_leader()
+        cluster.members[0].data['api_url'] = 'https://localhost/patroni'
+        cluster.members[1].data['api_url'] = 'http://127.0.0.1z:8011/patroni'
+        cluster.members.append(Member(0, 'bad-api-url', 30, {'api_url': 123}))
+        ips = cache.get(cluster)
+        self.assertEqual(ips, {ip_address('127.0.0.1'), ip_address('::1')})
+        self.assertEqual(socket.getaddrinfo.call_count, 2)
+
+        # all consecutive lookups are answered from memory
+        self.assertIs(cache.get(cluster), ips)
+        self.assertEqual(socket.getaddrinfo.call_count, 2)
+        self.assertEqual((cache.hits, cache.misses, cache.refreshes), (1, 1, 0))
+
+        # expired entries are refreshed in background, while old values are still served
+        with patch('time.time', Mock(return_value=time.time() + 61)), \
+                patch('patroni.thread_pool.get_executor') as mock_executor:
+            self.assertIs(cache.get(cluster), ips)
+            self.assertIs(cache.get(cluster), ips)
+        self.assertEqual(mock_executor.return_value.submit.call_count, 2)
+        self.assertEqual(cache.refreshes, 2)
+        for args in mock_executor.return_value.submit.call_args_list:
+            args[0][0](*args[0][1:])
+        self.assertEqual(socket.getaddrinfo.call_count, 4)
+
+        # members that left the cluster are evicted
+        cluster.members.pop(0)
+        self.assertEqual(cache.get(cluster), frozenset())
+        self.assertEqual(len(cache._entries), 1)
+        cache._refresh(('localhost', 443))
+        self.assertEqual(len(cache._entries), 1)
+
+        # the refresh is executed synchronously if the thread pool is not available
+        with patch('time.time', Mock(return_value=time.time() + 61)), \
+                patch('patroni.thread_pool.get_executor', Mock(side_effect=Exception)):
+            cache.get(cluster)
+        self.assertEqual(cache.refreshes, 3)
+
+    def test_status_snapshot(self):
+        snapshot = self.srv.status_snapshot
+        func = Mock(side_effect=[(1,), (2,), OperationalError, (3,)])
+        self.assertEqual(snapshot.get(func), ((1,), 0.0))
+        self.assertEqual(snapshot.get(func), ((2,), 0.0))
+
+        snapshot.interval = 10
+        self.assertRaises(OperationalError, snapshot.get, func)
+        self.assertEqual(snapshot.get(func), ((3,), 0.0))
+        row, age = snapshot.get(func)
+        self.assertEqual(row, (3,))
+        self.assertGreaterEqual(age, 0)
+        self.assertEqual(func.call_count, 4)
+
+        # results of a different key are not shared
+        func.side_effect = [(5,)]
+        self.assertEqual(snapshot.get(func, True), ((5,), 0.0))
+        self.assertEqual(snapshot.get(func)[0], (3,))
+        self.assertEqual(func.call_count, 5)
+
+        # concurrent callers wait for the refresh in progress instead of executing their own query
+        snapshot._values.pop(None)
+        snapshot._refreshing.add(None)
+
+        def finish_refresh(*args):
+            snapshot._values[None] = ((4,), time.time())
+            snapshot._refreshing.discard(None)
+
+        with patch.object(snapshot._cond, 'wait', Mock(side_effect=finish_refresh)) as mock_wait:
+            self.assertEqual(snapshot.get(func)[0], (4,))
+            mock_wait.assert_called_once()
+        self.assertEqual(func.call_count, 5)
+
+        # but don't wait for the refresh of a different key
+        snapshot._values.pop(True)
+        snapshot._refreshing.add(None)
+        func.side_effect = [(6,)]
+        with patch.object(snapshot._cond, 'wait') as mock_wait:
+            self.assertEqual(snapshot.get(func, True), ((6,), 0.0))
+            mock_wait.assert_not_called()
+        self.assertEqual(func.call_count, 6)
+
+    def test_serve_asyncio(self):
+        srv = RestApiServer(MockPatroni(), {'listen': '127.0.0.1:0', 'server_mode': 'asyncio'})
+        srv.start()
+        try:
+            conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+            conn.request('GET', '/patroni')
+            response = conn.getresponse()
+            self.assertEqual(response.status, 200)
+            self.assertEqual(json.loads(response.read().decode('utf-8'))['state'], 'running')
+            conn.close()
+
+            conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+            conn.request('POST', '/reload', body='{}')
+            self.assertEqual(conn.getresponse().status, 202)
+            conn.close()
+
+            # invalid requests are dropped without response
+            sock = socket.create_connection(srv.server_address[:2], timeout=10)
+            sock.sendall(b'POST /reload HTTP/1.0\r\nContent-Length: foo\r\n\r\n')
+            self.assertEqual(sock.recv(1024), b'')
+            sock.close()
+
+            # exceptions raised by handlers are logged
+            with patch.object(RestApiServer, 'finish_request', Mock(side_effect=Exception)), \
+                    patch.object(RestApiServer, 'handle_error') as mock_handle_error:
+                conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+                conn.request('GET', '/patroni')
+                self.assertRaises(Exception, conn.getresponse)
+                conn.close()
+                mock_handle_error.assert_called_once()
+
+            # switch to the threaded mode in runtime
+            srv.reload_config({'listen': '127.0.0.1:0'})
+            conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+            conn.request('GET', '/patroni')
+            self.assertEqual(conn.getresponse().status, 200)
+            conn.close()
+        finally:
+            srv.shutdown()
+            srv.server_close()
+
+    @patch.object(MockPatroni, 'dcs', Mock(ttl=30))
+    def test_keepalive(self):
+        for server_mode in ('threaded', 'asyncio'):
+            srv = RestApiServer(MockPatroni(), {'listen': '127.0.0.1:0', 'server_mode': server_mode,
+                                                'keepalive_timeout': 10, 'keepalive_max_requests': 3})
+            srv.start()
+            try:
+                conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+                for path, connection in (('/patroni', 'keep-alive'), ('/liveness', 'keep-alive'),
+                                         ('/patroni', 'close')):
+                    conn.request('GET', path)
+                    response = conn.getresponse()
+                    response.read()
+                    self.assertEqual(response.status, 200)
+                    self.assertEqual(response.getheader('Connection'), connection)
+                self.assertEqual(srv.keepalive_requests, 2)
+                conn.close()
+
+                # requests with body are not kept alive
+                conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+                conn.request('POST', '/reload', body='{}')
+                response = conn.getresponse()
+                self.assertEqual(response.status, 202)
+                self.assertEqual(response.getheader('Connection'), 'close')
+                conn.close()
+
+                # the interim response doesn't carry the connection headers
+                sock = socket.create_connection(srv.server_address[:2], timeout=10)
+                sock.sendall(b'POST /reload HTTP/1.1\r\nContent-Length: 2\r\nExpect: 100-continue\r\n\r\n{}')
+                data = b''
+                while not data.endswith(b'\r\n\r\n') or b' 202 ' not in data:
+                    chunk = sock.recv(1024)
+                    if not chunk:
+                        break
+                    data += chunk
+                sock.close()
+                interim, final = data.split(b'\r\n\r\n', 1)
+                self.assertEqual(interim, b'HTTP/1.1 100 Continue')
+                self.assertIn(b'Connection: close', final)
+
+                # idle connections are closed after keepalive_timeout
+                srv.keepalive_timeout = 0.1
+                sock = socket.create_connection(srv.server_address[:2], timeout=10)
+                sock.sendall(b'GET /liveness HTTP/1.1\r\n\r\n')
+                self.assertIn(b'Content-Length: 0', sock.recv(1024))
+                self.assertEqual(sock.recv(1024), b'')
+                sock.close()
+
+                # too many idle connections
+                srv.keepalive_max_idle_connections = 0
+                sock = socket.create_connection(srv.server_address[:2], timeout=10)
+                sock.sendall(b'GET /liveness HTTP/1.1\r\n\r\n')
+                self.assertIn(b'Connection: keep-alive', sock.recv(1024))
+                self.assertEqual(sock.recv(1024), b'')
+                sock.close()
+                self.assertEqual(srv.keepalive_idle_connections, 0)
+            finally:
+                srv.shutdown()
+                srv.server_close()
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'requires Unix domain sockets')
+    def test_unix_socket(self):
+        path = os.path.join(tempfile.mkdtemp(), 'api.sock')
+        for server_mode in ('threaded', 'asyncio'):
+            config = {'listen': '127.0.0.1:0', 'server_mode': server_mode, 'allowlist': ['1.2.3.4'],
+                      'unix_socket': path, 'unix_socket_mode': 0o600}
+            srv = RestApiServer(MockPatroni(), config)
+            srv.start()
+            try:
+                self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+                for _ in range(2):
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    sock.settimeout(10)
+                    sock.connect(path)
+                    sock.sendall(b'POST /reload HTTP/1.0\r\n\r\n')
+                    self.assertTrue(sock.recv(1024).startswith(b'HTTP/1.0 202'))
+                    sock.close()
+                    # the socket is recreated on reload
+                    srv.reload_config(dict(config, unix_socket_mode=0o660))
+                self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o660)
+
+                # allowlist still applies to TCP connections
+                conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+                conn.request('POST', '/reload')
+                self.assertEqual(conn.getresponse().status, 403)
+                conn.close()
+            finally:
+                srv.shutdown()
+                srv.server_close()
+            self.assertFalse(os.path.exists(path))
+
+        os.rmdir(os.path.dirname(path))
+        self.assertRaises(OSError, RestApiServer, MockPatroni(), {'listen': '127.0.0.1:0', 'unix_socket': path})
+
+    def test_cluster_events(self):
+        events = ClusterEvents()
+        cluster = get_cluster_initialized_without_leader(failover=Failover(0, '', 'other', None))
+        # nobody is waiting, the state is built by the next wait
+        with patch.object(ClusterEvents, 'cluster_state', Mock(wraps=ClusterEvents.cluster_state)) as mock_state:
+            self.assertFalse(events.update(cluster, 'replica'))
+            self.assertFalse(events.update(cluster, 'replica'))
+            mock_state.assert_not_called()
+            version, state = events.wait(None, 0)
+            mock_state.assert_called_once()
+        self.assertEqual(state['failover'], {'candidate': 'other'})
+        self.assertNotIn('lsn', state['members'][0])
+        self.assertIsNone(events.wait(version, 0.01))
+        self.assertFalse(events.update(None, 'primary'))
+        self.assertEqual(events.wait(version, 0)[1], {'members': [], 'role': 'primary'})
+
+        # clients are waiting
+        results = []
+        waiter = Thread(target=lambda: results.append(events.wait(events.version, 10)))
+        waiter.start()
+        while not events._waiters:
+            time.sleep(0.01)
+        self.assertFalse(events.update(None, 'primary'))
+        self.assertTrue(events.update(None, 'replica'))
+        waiter.join()
+        self.assertEqual(results[0][1]['role'], 'replica')
+        events.close()
+        self.assertIsNone(events.wait(None, 10))
+
+    def test_do_GET_events(self):
+        for server_mode in ('threaded', 'asyncio'):
+            srv = RestApiServer(MockPatroni(), {'listen': '127.0.0.1:0', 'server_mode': server_mode})
+            srv.cluster_events.update(None, 'replica')
+            srv.start()
+            try:
+                version = srv.cluster_events.wait(None, 0)[0]
+
+                # long-poll
+                conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+                conn.request('GET', '/events?poll=1&version=' + version)
+                self.assertEqual(conn.getresponse().status, 304)
+                conn.close()
+                conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+                conn.request('GET', '/events?poll=1')
+                response = conn.getresponse()
+                self.assertEqual(response.status, 200)
+                self.assertEqual(json.loads(response.read().decode('utf-8'))['version'], version)
+                conn.close()
+
+                # stream
+                conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+                conn.request('GET', '/events?heartbeat=1', headers={'Last-Event-ID': version})
+                response = conn.getresponse()
+                self.assertEqual(response.getheader('Content-Type'), 'text/event-stream')
+                self.assertEqual(response.fp.readline(), b'retry: 1000\n')
+                response.fp.readline()
+                self.assertEqual(response.fp.readline(), b': heartbeat\n')
+                response.fp.readline()
+                if server_mode == 'threaded':
+                    srv.cluster_events.update(None, 'primary')
+                    self.assertEqual(response.fp.readline(), 'id: {0}\n'.format(srv.cluster_events.version).encode())
+                    self.assertEqual(response.fp.readline(), b'event: cluster\n')
+                    self.assertEqual(json.loads(response.fp.readline()[6:])['role'], 'primary')
+                else:
+                    self.assertEqual(response.fp.readline(), b'')
+                conn.close()
+
+                srv.max_event_streams = 0
+                conn = HTTPConnection(*srv.server_address[:2], timeout=10)
+                conn.request('GET', '/events')
+                self.assertEqual(conn.getresponse().status, 503)
+                conn.close()
+            finally:
+                srv.shutdown()
+                srv.server_close()
+
+    @patch('asyncio.start_server', Mock(side_effect=Exception))
+    def test_serve_asyncio_failure(self):
+        srv = RestApiServer(MockPatroni(), {'listen': '127.0.0.1:0', 'server_mode': 'asyncio'})
+        with patch('patroni.api.logger.exception') as mock_logger:
+            srv.start()
+            srv._executor.shutdown(wait=True)
+        mock_logger.assert_called_once()
+        srv.shutdown()
+        # the shutdown request isn't left behind for the next start of the loop
+        self.assertFalse(srv._RestApiServer__asyncio_shutdown_request)
+        srv.server_close()
 
     def test_handle_error(self):
         try:
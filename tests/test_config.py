@@ -54,6 +54,12 @@ class TestConfig(unittest.TestCase):
             'PATRONI_RESTAPI_CERTFILE': '/certfile',
             'PATRONI_RESTAPI_KEYFILE': '/keyfile',
             'PATRONI_RESTAPI_ALLOWLIST_INCLUDE_MEMBERS': 'on',
+            'PATRONI_RESTAPI_ALLOWLIST_MEMBERS_CACHE_TTL': '30',
+            'PATRONI_RESTAPI_STATUS_SNAPSHOT_INTERVAL': '250',
+            'PATRONI_RESTAPI_CONNECTION_POOL_SIZE': '3',
+            'PATRONI_RESTAPI_SERVER_MODE': 'asyncio',
+            'PATRONI_RESTAPI_KEEPALIVE_TIMEOUT': '5',
+            'PATRONI_RESTAPI_UNIX_SOCKET_MODE': '0660',
             'PATRONI_POSTGRESQL_LISTEN': '0.0.0.0:5432',
             'PATRONI_POSTGRESQL_CONNECT_ADDRESS': '127.0.0.1:5432',
             'PATRONI_POSTGRESQL_PROXY_ADDRESS': '127.0.0.1:5433',
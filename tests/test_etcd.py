@@ -9,7 +9,7 @@ import urllib3.util.connection
 from dns.exception import DNSException
 from urllib3.exceptions import ReadTimeoutError
 
-from patroni.dcs import get_dcs
+from patroni.dcs import Failover, get_dcs, Member, node_parse_cache, NodeParseCache
 from patroni.dcs.etcd import AbstractDCS, Cluster, DnsCachingResolver, Etcd, EtcdClient, EtcdError
 from patroni.exceptions import DCSError
 from patroni.postgresql.mpp import get_mpp
@@ -382,3 +382,23 @@ class TestEtcd(unittest.TestCase):
 
     def test_last_seen(self):
         self.assertIsNotNone(self.etcd.last_seen)
+
+    def test_node_parse_cache(self):
+        node_parse_cache.clear()
+        cluster = self.etcd.get_cluster()
+        self.etcd._cluster_valid_till = 0
+        self.assertIs(self.etcd.get_cluster().members[0], cluster.members[0])
+        self.assertEqual(Failover.from_node(1, {'leader': 'foo'}).leader, 'foo')
+        with patch.object(NodeParseCache, 'MAX_SIZE', 1):
+            Member.from_node(1, 'foo', None, '{}')
+            self.assertEqual(len(node_parse_cache._cache), 1)
+
+    def test_operation_stats(self):
+        self.etcd.get_cluster()
+        with patch.object(EtcdClient, 'write', Mock(side_effect=etcd.EtcdConnectionFailed)):
+            self.assertRaises(EtcdError, self.etcd.attempt_to_acquire_leader)
+        self.assertFalse(self.etcd.touch_member(''))
+        histograms, sums, _, errors = self.etcd.operation_stats.snapshot()
+        self.assertEqual(sum(histograms['load_cluster']), 1)
+        self.assertGreaterEqual(sums['load_cluster'], 0)
+        self.assertEqual(errors, {('attempt_to_acquire_leader', 'EtcdError'): 1, ('touch_member', 'false'): 1})
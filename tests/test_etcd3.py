@@ -3,16 +3,16 @@ import socket
 import unittest
 
 from threading import Thread
-from unittest.mock import Mock, patch, PropertyMock
+from unittest.mock import call, Mock, patch, PropertyMock
 
 import etcd
 import urllib3
 
-from patroni.dcs import get_dcs
+from patroni.dcs import AbstractDCS, get_dcs
 from patroni.dcs.etcd import DnsCachingResolver
 from patroni.dcs.etcd3 import AuthFailed, AuthOldRevision, base64_encode, Cluster, Etcd3, \
-    Etcd3Client, Etcd3ClientError, Etcd3Error, InvalidAuthToken, PatroniEtcd3Client, \
-    RetryFailedError, Unavailable, Unknown, UnsupportedEtcdVersion, UserEmpty
+    Etcd3Client, Etcd3ClientError, Etcd3Error, InvalidAuthToken, KVCache, LeaseKeepAliveStream, \
+    PatroniEtcd3Client, RetryFailedError, Unavailable, Unknown, UnsupportedEtcdVersion, UserEmpty
 from patroni.postgresql.mpp import get_mpp
 
 from . import MockResponse, SleepException
@@ -129,7 +129,7 @@ class BaseTestEtcd3(unittest.TestCase):
 class TestKVCache(BaseTestEtcd3):
 
     @patch.object(urllib3.PoolManager, 'urlopen', mock_urlopen)
-    @patch.object(Etcd3Client, 'watchprefix', Mock(return_value=urllib3.response.HTTPResponse()))
+    @patch.object(Etcd3Client, 'watch', Mock(return_value=urllib3.response.HTTPResponse()))
     @patch.object(urllib3.response.HTTPResponse, 'read_chunked',
                   Mock(return_value=[b'{"result":{"canceled":true}}']))
     def test__build_cache(self):
@@ -138,8 +138,8 @@ class TestKVCache(BaseTestEtcd3):
             mock_logger.info.assert_called_once_with('Watch request canceled')
 
     def test__do_watch(self):
-        self.client.watchprefix = Mock(return_value=False)
-        self.assertRaises(AttributeError, self.kv_cache._do_watch, '1')
+        self.client.watch = Mock(return_value=False)
+        self.assertRaises(AttributeError, self.kv_cache._do_watch, {'/patroni/test/': '1'})
 
     @patch('time.sleep', Mock(side_effect=SleepException))
     @patch('patroni.dcs.etcd3.KVCache._build_cache', Mock(side_effect=Exception))
@@ -148,9 +148,9 @@ class TestKVCache(BaseTestEtcd3):
 
     @patch.object(urllib3.response.HTTPResponse, 'read_chunked',
                   Mock(return_value=[b'{"error":{"grpc_code":14,"message":"","http_code":503}}']))
-    @patch.object(Etcd3Client, 'watchprefix', Mock(return_value=urllib3.response.HTTPResponse()))
+    @patch.object(Etcd3Client, 'watch', Mock(return_value=urllib3.response.HTTPResponse()))
     def test_kill_stream(self):
-        self.assertRaises(Unavailable, self.kv_cache._do_watch, '1')
+        self.assertRaises(Unavailable, self.kv_cache._do_watch, {'/patroni/test/': '1'})
         with patch.object(urllib3.response.HTTPResponse, 'connection') as mock_conn:
             self.kv_cache.kill_stream()
             mock_conn.sock.close.side_effect = Exception
@@ -158,6 +158,30 @@ class TestKVCache(BaseTestEtcd3):
             type(mock_conn).sock = PropertyMock(side_effect=Exception)
             self.kv_cache.kill_stream()
 
+    @patch.object(urllib3.PoolManager, 'urlopen', mock_urlopen)
+    @patch.object(urllib3.response.HTTPResponse, 'read_chunked',
+                  Mock(return_value=[b'{"result":{"canceled":true}}']))
+    def test_add_prefix(self):
+        self.assertFalse(self.kv_cache.covers('/patroni/other/'))
+        with patch.object(KVCache, 'kill_stream') as mock_kill_stream:
+            self.assertEqual(self.client.get_cluster('/patroni/other/'), [])
+            mock_kill_stream.assert_called_once()
+        self.assertTrue(self.kv_cache.covers('/patroni/other/1'))
+        self.assertFalse(self.kv_cache._is_ready)
+        self.kv_cache.add_prefix('/patroni/other/1/')
+        self.assertEqual(self.kv_cache._prefixes, ['/patroni/test/', '/patroni/other/'])
+
+        with patch.object(Etcd3Client, 'watch', Mock(return_value=urllib3.response.HTTPResponse())) as mock_watch:
+            self.kv_cache._build_cache()
+            self.assertEqual([r['key'] for r in mock_watch.call_args[0][0]],
+                             [base64_encode('/patroni/test/'), base64_encode('/patroni/other/')])
+        self.kv_cache._is_ready = True
+        self.assertTrue(self.client.get_cluster('/patroni/test/'))
+        self.assertEqual(self.client.get_cluster('/patroni/other/'), [])
+
+        self.kv_cache.add_prefix('/patroni/')
+        self.assertEqual(self.kv_cache._prefixes, ['/patroni/'])
+
     @patch.object(urllib3.PoolManager, 'urlopen', mock_urlopen)
     def test_is_ready(self):
         self.kv_cache._build_cache()
@@ -167,6 +191,76 @@ class TestKVCache(BaseTestEtcd3):
             self.assertFalse(self.kv_cache.is_ready())
 
 
+class TestLeaseKeepAliveStream(BaseTestEtcd3):
+
+    @patch.object(Thread, 'start', Mock())
+    def setUp(self):
+        super(TestLeaseKeepAliveStream, self).setUp()
+        self.client.start_lease_stream()
+        self.stream = self.client._lease_stream
+        self.assertIsInstance(self.stream, LeaseKeepAliveStream)
+
+    @patch('patroni.dcs.etcd3.HTTPResponse')
+    def test__do_stream(self, mock_response):
+        self.stream._lease = '123'
+        mock_conn = Mock()
+        with patch.object(urllib3.HTTPConnectionPool, '_new_conn', Mock(return_value=mock_conn)):
+            mock_response.return_value.status = 200
+            mock_response.return_value.read1.side_effect = [b'{"result":{"TTL":"30"}}', b'']
+            self.stream._do_stream()
+            self.assertEqual(self.stream._ttl, '30')
+            self.assertTrue(mock_conn.send.called)
+            # headers are read with the timeout, responses to keepalive requests without it
+            self.assertEqual(mock_conn.sock.settimeout.call_args_list, [call(self.client.read_timeout), call(None)])
+            mock_conn.close.assert_called_once()
+            self.assertFalse(self.stream._is_ready)
+
+            mock_response.return_value.read1.side_effect = [b'{"error":{"grpc_code":14,"message":"",'
+                                                            b'"http_code":503}}']
+            self.assertRaises(Unavailable, self.stream._do_stream)
+
+            mock_response.return_value.status = 500
+            mock_response.return_value.read.return_value = b'{"error":"foo","code":2}'
+            self.assertRaises(Unknown, self.stream._do_stream)
+
+    @patch('time.sleep', Mock(side_effect=SleepException))
+    @patch.object(LeaseKeepAliveStream, '_do_stream', Mock(side_effect=Exception))
+    def test_run(self):
+        self.assertRaises(SleepException, self.stream.run)
+
+    def test_keepalive(self):
+        self.assertFalse(self.stream.keepalive('123', 1))
+        self.assertEqual(self.stream._lease, '123')
+        self.assertIsNone(self.stream.ttl_remaining)
+
+        self.stream._is_ready = True
+        self.stream._conn = Mock()
+        self.stream._conn.send.side_effect = lambda _: self.stream._process_message({'result': {'TTL': '30'}})
+        self.assertEqual(self.stream.keepalive('123', 1), '30')
+        self.assertGreater(self.stream.ttl_remaining, 29)
+        self.stream._conn.send.side_effect = lambda _: self.stream._process_message({'result': {}})
+        self.assertIsNone(self.stream.keepalive('123', 1))
+
+        # no response in time
+        self.stream._conn.send.side_effect = None
+        self.assertFalse(self.stream.keepalive('123', 0))
+        self.stream._conn.sock.shutdown.assert_called_once()
+
+        # failed to send
+        self.stream._conn.send.side_effect = Exception
+        self.assertFalse(self.stream.keepalive('123', 1))
+
+    @patch.object(urllib3.PoolManager, 'urlopen', mock_urlopen)
+    def test_lease_keepalive(self):
+        with patch.object(LeaseKeepAliveStream, 'keepalive', Mock(return_value='20')):
+            self.assertEqual(self.client.lease_keepalive('123'), '20')
+        with patch.object(LeaseKeepAliveStream, 'keepalive', Mock(return_value=False)):
+            self.assertEqual(self.client.lease_keepalive('123'), 30)
+        with patch.object(LeaseKeepAliveStream, 'ttl_remaining', PropertyMock(return_value=10.0)):
+            self.assertEqual(self.etcd3.lease_ttl_remaining, 10.0)
+        self.client._restart_watcher()
+
+
 class TestPatroniEtcd3Client(BaseTestEtcd3):
 
     @patch('patroni.dcs.etcd3.Etcd3Client.authenticate', Mock(side_effect=AuthFailed))
@@ -180,6 +274,8 @@ class TestPatroniEtcd3Client(BaseTestEtcd3):
         mock_urlopen.return_value.content = '{"succeeded":true,"header":{"revision":"1"}}'
         self.client.call_rpc('/kv/put', request)
         self.client.call_rpc('/kv/deleterange', request)
+        self.client.txn_batch(request, [{'request_put': {'key': request['key'], 'value': ''}},
+                                        {'request_delete_range': {'key': base64_encode('/patroni/test/sync')}}])
 
     @patch.object(urllib3.PoolManager, 'urlopen')
     def test_txn(self, mock_urlopen):
@@ -188,6 +284,12 @@ class TestPatroniEtcd3Client(BaseTestEtcd3):
         self.client.txn({'target': 'MOD', 'mod_revision': '1'},
                         {'request_delete_range': {'key': base64_encode('/patroni/test/leader')}})
 
+    @patch.object(urllib3.PoolManager, 'urlopen')
+    def test_watch(self, mock_urlopen):
+        self.client.watch([{'key': 'a'}, {'key': 'b'}])
+        self.assertEqual(mock_urlopen.call_args[1]['body'],
+                         '{"create_request": {"key": "a"}}{"create_request": {"key": "b"}}')
+
     @patch('time.time', Mock(side_effect=[1, 10.9, 100]))
     def test__wait_cache(self):
         with self.kv_cache.condition:
@@ -299,6 +401,18 @@ class TestEtcd3(BaseTestEtcd3):
         self.assertIsInstance(cluster, Cluster)
         self.assertIsInstance(cluster.workers[1], Cluster)
 
+    def test_cluster_snapshots(self):
+        self.etcd3._mpp = get_mpp({'citus': {'group': 0, 'database': 'postgres'}})
+        cluster = self.etcd3.get_cluster()
+        self.etcd3._cluster_valid_till = 0
+        # nodes didn't change, the same objects are reused, but a new coordinator object is returned
+        new_cluster = self.etcd3.get_cluster()
+        self.assertIsNot(new_cluster, cluster)
+        self.assertIs(new_cluster.workers[1], cluster.workers[1])
+        self.etcd3._cluster_snapshots._snapshots['/patroni/test/2/'] = (frozenset(), Cluster.empty())
+        self.etcd3._mpp_cluster_loader('')
+        self.assertNotIn('/patroni/test/2/', self.etcd3._cluster_snapshots._snapshots)
+
     def test_touch_member(self):
         self.etcd3.touch_member({})
         self.etcd3._lease = 'bla'
@@ -322,6 +436,29 @@ class TestEtcd3(BaseTestEtcd3):
         with patch.object(PatroniEtcd3Client, 'lease_keepalive', Mock(side_effect=Unknown)):
             self.assertFalse(self.etcd3.update_leader(cluster, '125'))
 
+    def test_update_leader_batch_writes(self):
+        cluster = self.etcd3.get_cluster()
+        self.etcd3._lease = cluster.leader.session
+        with patch.object(Etcd3Client, 'txn_batch', Mock(return_value={'succeeded': True})) as mock_txn_batch:
+            self.assertTrue(self.etcd3.update_leader(cluster, 123, failsafe={'foo': 'bar'}))
+            # /status, /optime/leader (there is a member running old Patroni version) and /failsafe
+            self.assertEqual(len(mock_txn_batch.call_args[0][1]), 3)
+        self.assertEqual(self.etcd3.operation_stats.rpcs_saved, 2)
+        # transaction failed, keys must be written again on the next cycle
+        with patch('patroni.dcs.etcd3.logger.warning') as mock_warning:
+            self.assertTrue(self.etcd3.update_leader(cluster, 124, failsafe={'foo': 'baz'}))
+            self.assertEqual(mock_warning.call_args[0][1],
+                             '/patroni/test/status, /patroni/test/optime/leader, /patroni/test/failsafe')
+        self.assertEqual(self.etcd3._last_status, {'optime': 123})
+        with patch.object(AbstractDCS, 'write_failsafe', Mock(side_effect=Etcd3Error(''))):
+            self.assertRaises(Etcd3Error, self.etcd3.update_leader, cluster, 125, failsafe={})
+        self.assertEqual(self.etcd3._last_status, {'optime': 123})
+        self.assertIsNone(self.etcd3._write_batch)
+        self.etcd3._batch_writes = False
+        with patch.object(PatroniEtcd3Client, 'put', Mock(return_value={})) as mock_put:
+            self.etcd3.update_leader(cluster, 126, failsafe={'foo': 'qux'})
+            self.assertEqual(mock_put.call_count, 3)
+
     def test_take_leader(self):
         self.assertFalse(self.etcd3.take_leader())
 
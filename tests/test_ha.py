@@ -1,3 +1,4 @@
+import concurrent.futures
 import datetime
 import os
 import sys
@@ -13,7 +14,7 @@ from patroni.dcs import Cluster, ClusterConfig, Failover, get_dcs, \
     Leader, Member, RemoteMember, Status, SyncState, TimelineHistory
 from patroni.dcs.etcd import AbstractEtcdClientWithFailover
 from patroni.exceptions import DCSError, PatroniFatalException, PostgresConnectionException
-from patroni.ha import _MemberStatus, Ha
+from patroni.ha import _FailsafeResponse, _MemberStatus, CycleTimer, Ha
 from patroni.postgresql import Postgresql
 from patroni.postgresql.bootstrap import Bootstrap
 from patroni.postgresql.callback_executor import CallbackAction
@@ -235,6 +236,14 @@ class TestHa(PostgresInit):
         global_config.update(self.ha.cluster)
         self.ha.load_cluster_from_dcs = Mock()
 
+    def test_cycle_timer(self):
+        self.ha.run_cycle()
+        self.assertIn('cluster_info', self.ha.cycle_timer.last)
+        self.assertIn('total', self.ha.cycle_timer.describe_last())
+        histograms, sums = self.ha.cycle_timer.snapshot()
+        self.assertEqual(sum(histograms['total']), 1)
+        self.assertEqual(sums['total'], self.ha.cycle_timer.last['total'])
+
     def test_update_lock(self):
         self.ha.is_failsafe_mode = true
         self.p.last_operation = Mock(side_effect=PostgresConnectionException(''))
@@ -556,6 +565,28 @@ class TestHa(PostgresInit):
         self.assertEqual(self.ha.run_cycle(),
                          'continue to run as a leader because failsafe mode is enabled and all members are accessible')
 
+    def test_check_failsafe_topology_early_completion(self):
+        self.ha.cluster = get_cluster_initialized_with_leader_and_failsafe()
+        self.ha.dcs._last_failsafe = {'leader': 'http://127.0.0.1:8008/patroni', 'a': 'http://a:8008/patroni',
+                                      'b': 'http://b:8008/patroni'}
+        self.ha.state_handler.name = 'leader'
+        self.ha.failsafe_response_times = {'gone': 1.0}
+        responses = {'a': _FailsafeResponse('a', False, None), 'b': _FailsafeResponse('b', True, None)}
+        with patch.object(Ha, 'call_failsafe_member', Mock(side_effect=lambda _, m: responses[m.name])):
+            self.assertFalse(self.ha.check_failsafe_topology())
+        self.assertNotIn('gone', self.ha.failsafe_response_times)
+        with patch('concurrent.futures.as_completed', Mock(side_effect=concurrent.futures.TimeoutError)) as mock_wait:
+            # a dead member can't hold the check longer than its own request with a retry
+            with patch.object(CycleTimer, 'elapsed', Mock(return_value=0)):
+                self.assertFalse(self.ha.check_failsafe_topology())
+                self.assertEqual(mock_wait.call_args[1]['timeout'], 4)
+            with patch.object(CycleTimer, 'elapsed', Mock(return_value=7.5)):
+                self.assertFalse(self.ha.check_failsafe_topology())
+                self.assertEqual(mock_wait.call_args[1]['timeout'], 2.5)
+            with patch.object(CycleTimer, 'elapsed', Mock(return_value=20)):
+                self.assertFalse(self.ha.check_failsafe_topology())
+                self.assertEqual(mock_wait.call_args[1]['timeout'], 2)
+
     def test_no_dcs_connection_primary_failsafe(self):
         self.ha.load_cluster_from_dcs = Mock(side_effect=DCSError('Etcd is not responding properly'))
         self.ha.cluster = get_cluster_initialized_with_leader_and_failsafe()
@@ -1065,6 +1096,25 @@ class TestHa(PostgresInit):
         self.ha.cluster = get_cluster_initialized_without_leader(failover=Failover(0, 'leader', self.p.name, None))
         self.assertEqual(self.ha.run_cycle(), 'PAUSE: promoted self to leader by acquiring session lock')
 
+    def test_prefetch_nodes_statuses(self):
+        self.ha.patroni.nofailover = False
+        self.ha.fetch_node_status = get_node_status()
+        self.ha.cluster = get_cluster_initialized_without_leader()
+        self.ha.prefetch_nodes_statuses()
+        self.assertEqual(set(self.ha._prefetched_statuses), {'leader', 'other'})
+        members = [m for m in self.ha.cluster.members if m.name != 'postgresql0']
+        self.ha.fetch_node_status = Mock()
+        self.assertEqual(len(self.ha.fetch_nodes_statuses(members)), 2)
+        self.ha.fetch_node_status.assert_not_called()
+        self.assertEqual(self.ha._prefetched_statuses, {})
+        # prefetched statuses are used only once
+        self.ha.fetch_nodes_statuses(members)
+        self.assertEqual(self.ha.fetch_node_status.call_count, 2)
+        # no prefetching if the cluster has a leader
+        self.ha.cluster = get_cluster_initialized_with_leader()
+        self.ha.prefetch_nodes_statuses()
+        self.assertEqual(self.ha._prefetched_statuses, {})
+
     def test_is_healthiest_node(self):
         self.ha.is_failsafe_mode = true
         self.ha.state_handler.is_primary = false
@@ -11,10 +11,10 @@ from unittest.mock import Mock, mock_open, patch, PropertyMock
 
 import urllib3
 
-from patroni.dcs import get_dcs
+from patroni.dcs import get_dcs, Member
 from patroni.dcs.kubernetes import Cluster, k8s_client, k8s_config, K8sConfig, K8sConnectionFailed, \
-    K8sException, K8sObject, Kubernetes, KubernetesError, KubernetesRetriableException, Retry, \
-    RetryFailedError, SERVICE_HOST_ENV_NAME, SERVICE_PORT_ENV_NAME
+    K8sException, K8sObject, Kubernetes, KubernetesError, KubernetesRetriableException, \
+    ObjectCache, Retry, RetryFailedError, SERVICE_HOST_ENV_NAME, SERVICE_PORT_ENV_NAME
 from patroni.postgresql.misc import PostgresqlRole, PostgresqlState
 from patroni.postgresql.mpp import get_mpp
 
@@ -224,6 +224,19 @@ class TestCoreV1Api(unittest.TestCase):
     def test_delete_namespaced_pod(self):
         self.assertEqual(str(self.a.delete_namespaced_pod('foo', 'default', _request_timeout=(1, 2), body={})), '{}')
 
+    def test_list_namespaced_lease(self):
+        a = k8s_client.CoordinationV1Api(self.a._api_client)
+        self.assertEqual(str(a.list_namespaced_lease('default')), '{}')
+        self.assertTrue(self.a._api_client.pool_manager.request.call_args[0][1].endswith(
+            '/apis/coordination.k8s.io/v1/namespaces/default/leases'))
+
+
+def mock_lease(holder='p-0', resource_version='5'):
+    metadata = k8s_client.V1ObjectMeta(name='test-leader', resource_version=resource_version, labels={'f': 'b'})
+    spec = k8s_client.V1LeaseSpec(holder_identity=holder, lease_duration_seconds=30, lease_transitions=1,
+                                  acquire_time='2024-01-01T00:00:00.000000Z', renew_time='2024-01-01T00:00:10.000000Z')
+    return k8s_client.V1Lease(metadata=metadata, spec=spec)
+
 
 class BaseTestKubernetes(unittest.TestCase):
 
@@ -248,6 +261,9 @@ class BaseTestKubernetes(unittest.TestCase):
         self.k._pods._is_ready = True
         self.assertRaises(TypeError, self.k._kinds._build_cache)
         self.k._kinds._is_ready = True
+        if self.k._leases:
+            self.k._leases._is_ready = True
+            self.k._leases.set('test-leader', mock_lease())
         self.k.get_cluster()
 
 
@@ -274,6 +290,25 @@ class TestKubernetesConfigMaps(BaseTestKubernetes):
         self.assertIsInstance(cluster, Cluster)
         self.assertIsInstance(cluster.workers[1], Cluster)
 
+    def test_member(self):
+        pod = mock_list_namespaced_pod().items[0]
+        member = self.k.member(pod)
+        self.assertEqual(member.data['pod_labels'], {'f': 'b', 'citus-group': '1'})
+        # the object parsed from the same value is shared, labels must not leak into it
+        pod.metadata.labels = {'f': 'c'}
+        self.assertEqual(self.k.member(pod).data['pod_labels'], {'f': 'c'})
+        self.assertEqual(member.data['pod_labels'], {'f': 'b', 'citus-group': '1'})
+        self.assertNotIn('pod_labels', Member.from_node('1', 'p-0', None, '{}').data)
+
+    def test_cluster_snapshots(self):
+        self.k._mpp = get_mpp({'citus': {'group': 0, 'database': 'postgres'}})
+        cluster = self.k.get_cluster()
+        self.k._cluster_valid_till = 0
+        # our own group is always rebuilt, other groups are reused while objects don't change
+        new_cluster = self.k.get_cluster()
+        self.assertIsNot(new_cluster.status, cluster.status)
+        self.assertIs(new_cluster.workers[1], cluster.workers[1])
+
     @patch('patroni.dcs.kubernetes.logger.error')
     def test_get_mpp_coordinator(self, mock_logger):
         self.assertIsInstance(self.k.get_mpp_coordinator(), Cluster)
@@ -428,6 +463,211 @@ class TestKubernetesEndpointsNoPodIP(BaseTestKubernetes):
         self.assertEqual(args[2].subsets[0].addresses[0].ip, '10.0.0.1')
 
 
+@patch('urllib3.PoolManager.request', Mock())
+@patch.object(k8s_client.CoreV1Api, 'patch_namespaced_config_map', create=True)
+@patch.object(k8s_client.CoordinationV1Api, 'patch_namespaced_lease', create=True)
+class TestKubernetesLeases(BaseTestKubernetes):
+
+    def setUp(self, config=None):
+        super(TestKubernetesLeases, self).setUp({'use_leases': True})
+
+    def test_get_cluster(self, mock_patch_lease, mock_patch_config_map):
+        cluster = self.k.get_cluster()
+        self.assertEqual(cluster.leader.name, 'p-0')
+        self.assertEqual(cluster.leader.version, '5')
+        self.assertEqual(cluster.status.last_lsn, 0)
+        self.assertEqual(self.k._leader_observed_record['transitions'], '1')
+        self.assertEqual(self.k._leader_resource_version, '5')
+
+    def test_update_leader(self, mock_patch_lease, mock_patch_config_map):
+        cluster = self.k.get_cluster()
+        mock_patch_lease.return_value = mock_lease(resource_version='6')
+        self.assertTrue(self.k.update_leader(cluster, 1234, failsafe={'foo': 'bar'}))
+        body = mock_patch_lease.call_args[0][2]
+        self.assertEqual(body.metadata.resource_version, '5')
+        self.assertEqual(body.spec.holder_identity, 'p-0')
+        self.assertEqual(body.spec.lease_transitions, 1)
+        self.assertEqual(mock_patch_config_map.call_args[0][2].metadata.annotations,
+                         {'optime': '1234', 'slots': None, 'retain_slots': None, 'failsafe': '{"foo":"bar"}'})
+
+        # the leader state didn't change, only the Lease is updated
+        mock_patch_config_map.reset_mock()
+        self.k._kinds.set('test-leader', k8s_client.V1ConfigMap(metadata=k8s_client.V1ObjectMeta(
+            name='test-leader', resource_version='7', annotations={'optime': '1234'})))
+        self.assertTrue(self.k.update_leader(cluster, 1234))
+        mock_patch_config_map.assert_not_called()
+
+        self.k._leases.set('test-leader', mock_lease('p-1', '8'))
+        self.assertFalse(self.k.update_leader(cluster, 1234))
+
+    def test_update_leader_throttle_optime(self, mock_patch_lease, mock_patch_config_map):
+        cluster = self.k.get_cluster()
+        mock_patch_lease.return_value = mock_lease(resource_version='6')
+        self.k._leader_optime_interval = 60
+        self.k._leader_optime_delta = 1000
+        leader = k8s_client.V1ConfigMap(metadata=k8s_client.V1ObjectMeta(
+            name='test-leader', resource_version='7', annotations={'optime': '1234'}))
+        mock_patch_config_map.return_value = leader
+        self.k._kinds.set('test-leader', leader)
+        with patch('time.time', Mock(return_value=100)):
+            self.k._leader_optime_written_at = 90
+            # only the optime moved a bit, the leader object isn't patched
+            self.assertTrue(self.k.update_leader(cluster, 1334))
+            mock_patch_config_map.assert_not_called()
+            self.assertTrue(self.k.update_leader(cluster, 2234))
+            mock_patch_config_map.assert_called_once()
+            self.assertEqual(self.k._leader_optime_written_at, 100)
+            # other changes of the leader state are written immediately
+            self.assertTrue(self.k.update_leader(cluster, 1334, failsafe={'foo': 'bar'}))
+            self.assertEqual(mock_patch_config_map.call_count, 2)
+        with patch('time.time', Mock(return_value=200)):
+            self.assertTrue(self.k.update_leader(cluster, 1334))
+            self.assertEqual(mock_patch_config_map.call_count, 3)
+        self.assertTrue(self.k._optime_due('foo', '1334'))
+
+    @patch('time.sleep', Mock())
+    @patch.object(k8s_client.CoordinationV1Api, 'read_namespaced_lease', create=True)
+    def test__update_lease_with_retry(self, mock_read, mock_patch_lease, mock_patch_config_map):
+        mock_patch_lease.side_effect = k8s_client.rest.ApiException(502, '')
+        self.assertFalse(self.k._update_lease_with_retry({'leader': 'p-0'}, '5'))
+        mock_patch_lease.side_effect = RetryFailedError('')
+        self.assertRaises(KubernetesError, self.k._update_lease_with_retry, {'leader': 'p-0'}, '5')
+
+        # the first attempt succeeded, but we got 409 on retry
+        mock_patch_lease.side_effect = k8s_client.rest.ApiException(409, '')
+        mock_read.return_value = mock_lease(resource_version='6')
+        self.assertTrue(self.k._update_lease_with_retry({'leader': 'p-0', 'ttl': '30'}, '5'))
+        self.assertFalse(self.k._update_lease_with_retry({'leader': 'p-1'}, '5'))
+        with patch.object(Retry, 'ensure_deadline', Mock(return_value=False)):
+            self.assertFalse(self.k._update_lease_with_retry({'leader': 'p-0'}, '5'))
+        mock_read.side_effect = Exception
+        self.assertFalse(self.k._update_lease_with_retry({'leader': 'p-0'}, '5'))
+        mock_read.side_effect = RetryFailedError('')
+        self.assertRaises(KubernetesError, self.k._update_lease_with_retry, {'leader': 'p-0'}, '5')
+
+    @patch.object(k8s_client.CoordinationV1Api, 'create_namespaced_lease', create=True)
+    def test_attempt_to_acquire_leader(self, mock_create_lease, mock_patch_lease, mock_patch_config_map):
+        self.k.get_cluster()
+        self.k._leases.set('test-leader', mock_lease('p-1'))
+        self.k._leader_observed_record['leader'] = 'p-1'
+        mock_patch_lease.return_value = mock_lease(resource_version='6')
+        self.assertTrue(self.k.attempt_to_acquire_leader())
+        body = mock_patch_lease.call_args[0][2]
+        self.assertEqual(body.spec.holder_identity, 'p-0')
+        self.assertEqual(body.spec.lease_transitions, 2)
+
+        # the Lease doesn't exist yet
+        self.k._leader_resource_version = None
+        mock_create_lease.return_value = mock_lease(resource_version='1')
+        self.assertTrue(self.k.take_leader())
+
+        mock_patch_lease.side_effect = k8s_client.rest.ApiException(403, '')
+        self.k._leader_resource_version = '5'
+        self.assertFalse(self.k.attempt_to_acquire_leader())
+
+    def test_delete_leader(self, mock_patch_lease, mock_patch_config_map):
+        mock_patch_lease.return_value = mock_lease(None, '6')
+        self.assertTrue(self.k.delete_leader(None, 1234))
+        self.assertIsNone(mock_patch_lease.call_args[0][2].spec.holder_identity)
+        self.assertEqual(mock_patch_config_map.call_args[0][2].metadata.annotations, {'optime': '1234'})
+        mock_patch_lease.side_effect = RetryFailedError('')
+        self.k._leases.set('test-leader', mock_lease('p-0', '7'))
+        self.assertFalse(self.k.delete_leader(None))
+        self.assertFalse(self.k.delete_leader(None))
+
+    @patch.object(k8s_client.CoreV1Api, 'delete_collection_namespaced_config_map', Mock(), create=True)
+    @patch.object(k8s_client.CoordinationV1Api, 'delete_collection_namespaced_lease', create=True)
+    def test_delete_cluster(self, mock_delete_leases, mock_patch_lease, mock_patch_config_map):
+        self.assertTrue(self.k.delete_cluster())
+        mock_delete_leases.assert_called_once()
+
+    def test__process_event(self, mock_patch_lease, mock_patch_config_map):
+        self.k.event.clear()
+        for holder, version, event_is_set in (('p-0', '6', False), ('p-1', '7', True)):
+            obj = {'metadata': {'name': 'test-leader', 'resourceVersion': version, 'labels': {'f': 'b'}},
+                   'spec': {'holderIdentity': holder, 'leaseDurationSeconds': 30}}
+            self.k._leases._process_event({'type': 'MODIFIED', 'object': obj})
+            self.assertEqual(self.k.event.is_set(), event_is_set)
+
+
+def mock_status_config_map(resource_version='3', **statuses):
+    metadata = k8s_client.V1ObjectMeta(name='test-members', resource_version=resource_version, labels={'f': 'b'})
+    data = {n: json.dumps(v) for n, v in statuses.items()}
+    return K8sObject(k8s_client.V1ConfigMap(metadata=metadata, data=data).to_dict())
+
+
+@patch('urllib3.PoolManager.request', Mock())
+@patch.object(k8s_client.CoreV1Api, 'patch_namespaced_pod', create=True)
+@patch.object(k8s_client.CoreV1Api, 'patch_namespaced_config_map', create=True)
+class TestKubernetesStatusConfigMap(BaseTestKubernetes):
+
+    def setUp(self, config=None):
+        super(TestKubernetesStatusConfigMap, self).setUp(
+            {'use_status_config_map': True, 'status_lsn_interval': 60, 'status_lsn_delta': 1000})
+        self.status = {'state': 'running', 'role': 'primary', 'xlog_location': 100}
+        self.k._kinds.set('test-members', mock_status_config_map(**{'p-0': self.status, 'p-9': {}}))
+
+    def test_get_cluster(self, mock_patch_config_map, mock_patch_pod):
+        cluster = self.k.get_cluster()
+        self.assertEqual(cluster.members[0].data['xlog_location'], 100)
+        self.assertEqual(len(cluster.members), 1)
+
+    @patch.object(k8s_client.CoreV1Api, 'create_namespaced_config_map', create=True)
+    def test_touch_member(self, mock_create_config_map, mock_patch_config_map, mock_patch_pod):
+        pod = mock_list_namespaced_pod().items[0]
+        pod.metadata.labels.update({'role': 'primary', 'foo': None})
+        pod.metadata.resource_version = '10'
+        mock_patch_pod.return_value = pod
+        mock_patch_config_map.return_value = mock_status_config_map('20')
+        self.k.get_cluster()
+
+        # labels are changed, but the status is the same
+        self.assertTrue(self.k.touch_member(self.status))
+        self.assertIsNone(mock_patch_pod.call_args[0][2].metadata.annotations)
+        mock_patch_config_map.assert_not_called()
+
+        self.k.get_cluster()
+        mock_patch_pod.reset_mock()
+        self.k._status_published_at = time.time()
+        self.assertTrue(self.k.touch_member({**self.status, 'xlog_location': 200}))
+        mock_patch_pod.assert_not_called()
+        mock_patch_config_map.assert_not_called()
+
+        # LSN has moved by more than status_lsn_delta, the status of p-9 is removed by the leader
+        self.assertTrue(self.k.touch_member({**self.status, 'xlog_location': 2000}))
+        self.assertEqual(mock_patch_config_map.call_args[0][2].data,
+                         {'p-0': '{"state":"running","role":"primary","xlog_location":2000}', 'p-9': None})
+
+        # the ConfigMap doesn't exist yet
+        self.k._kinds.delete('test-members', '100')
+        mock_create_config_map.return_value = None
+        self.assertFalse(self.k.touch_member({**self.status, 'state': 'stopped'}))
+        mock_create_config_map.assert_called_once()
+
+    def test__status_changed(self, mock_patch_config_map, mock_patch_pod):
+        self.k._status_published_at = time.time()
+        self.assertFalse(self.k._status_changed(self.status, self.status))
+        self.assertTrue(self.k._status_changed(self.status, {**self.status, 'replay_lsn': 100}))
+        self.assertFalse(self.k._status_changed(self.status, {**self.status, 'xlog_location': 1000}))
+        self.k._status_published_at = 0
+        self.assertTrue(self.k._status_changed(self.status, {**self.status, 'xlog_location': 1000}))
+        self.k._status_lsn_interval = self.k._status_lsn_delta = 0
+        self.assertTrue(self.k._status_changed(self.status, {**self.status, 'xlog_location': 101}))
+
+    @patch.object(Thread, 'start', Mock())
+    @patch.object(k8s_client.CoreV1Api, 'delete_collection_namespaced_config_map', create=True)
+    def test_separate_cache(self, mock_delete_config_maps, mock_patch_config_map, mock_patch_pod):
+        # with use_endpoints the ConfigMap is watched by its own cache
+        self.k._status_maps = ObjectCache(self.k, Mock(), self.k._retry, self.k._condition, 'p-0', 'configmaps')
+        self.k._status_maps._is_ready = True
+        self.k._status_maps.set('test-members', self.k._kinds.get('test-members'))
+        self.k._status_maps.set('test-config', self.k._kinds.get('test-config'))
+        self.k._kinds.delete('test-members', '100')
+        self.assertEqual(self.k.get_cluster().members[0].data['xlog_location'], 100)
+        self.assertTrue(self.k.delete_cluster())
+        self.assertEqual(mock_delete_config_maps.call_count, 2)
+
+
 @patch('urllib3.PoolManager.request', Mock())
 class TestKubernetesEndpoints(BaseTestKubernetes):
 
@@ -549,6 +789,54 @@ class TestCacheBuilder(BaseTestKubernetes):
             {'type': 'MDIFIED', 'object': {'metadata': {'name': self.k.config_path}}}
         ) + '\n').encode('utf-8'), b'{"object":{', b'"code":410}}\n']
         self.k._kinds._build_cache()
+        self.assertIsNone(self.k._kinds._resource_version)
+
+    @patch.object(k8s_client.CoreV1Api, 'list_namespaced_config_map', mock_list_namespaced_config_map, create=True)
+    @patch.object(urllib3.HTTPResponse, 'read_chunked')
+    def test_resume_watch(self, mock_read_chunked):
+        self.k._kinds._resource_version = '1'
+        self.k._kinds._listed = True
+        self.k._kinds.written(self.k.config_path, k8s_client.V1ConfigMap(
+            metadata=k8s_client.V1ObjectMeta(name=self.k.config_path, resource_version='5')))
+        mock_read_chunked.return_value = [json.dumps(
+            {'type': 'MODIFIED', 'object': {'metadata': {'name': self.k.config_path, 'resourceVersion': '5'}}}
+        ).encode('utf-8') + b'\n', json.dumps(
+            {'type': 'BOOKMARK', 'object': {'metadata': {'resourceVersion': '7'}}}).encode('utf-8') + b'\n']
+        with patch.object(ObjectCache, '_watch', Mock(return_value=urllib3.HTTPResponse())) as mock_watch:
+            self.k._kinds._build_cache()
+            self.assertEqual(self.k._kinds._resource_version, '7')
+            self.assertFalse(self.k._kinds.is_ready())
+
+            # the stream was closed, the watch is resumed without LIST
+            mock_read_chunked.return_value = [b'{"type":"ERROR","object":{"code":500,"message":"foo"}}\n']
+            with patch.object(ObjectCache, '_list') as mock_list, patch('time.sleep') as mock_sleep:
+                self.k._kinds._build_cache()
+                mock_list.assert_not_called()
+                mock_sleep.assert_called_once_with(1)
+            self.assertEqual(mock_watch.call_args[0][0], '7')
+
+            # resourceVersion is too old
+            mock_read_chunked.return_value = [b'{"type":"ERROR","object":{"code":410}}\n']
+            self.k._kinds._build_cache()
+            self.assertIsNone(self.k._kinds._resource_version)
+            self.k._kinds._build_cache()
+
+            # the watch request itself was rejected with 410 Gone
+            self.k._kinds._resource_version = '7'
+            mock_watch.side_effect = k8s_client.rest.ApiException(410, 'Gone')
+            self.k._kinds._build_cache()
+            self.assertIsNone(self.k._kinds._resource_version)
+            mock_watch.side_effect = k8s_client.rest.ApiException(500, '')
+            self.assertRaises(k8s_client.rest.ApiException, self.k._kinds._build_cache)
+            self.assertIsNotNone(self.k._kinds._resource_version)
+        self.assertEqual(self.k._kinds._dcs.operation_stats.watch_snapshot()[0], {'configmaps': 2})
+        self.assertEqual(self.k._kinds._dcs.operation_stats.watch_snapshot()[1]['configmaps'][-1], 0)
+
+    @patch('time.sleep', Mock())
+    def test__watch(self):
+        self.k._pods._func = Mock(side_effect=Exception)
+        self.assertRaises(Exception, self.k._pods._watch, '1')
+        self.assertEqual(self.k._pods._kind, 'pods')
 
     @patch('patroni.dcs.kubernetes.logger.error', Mock(side_effect=SleepException))
     @patch('patroni.dcs.kubernetes.ObjectCache._build_cache', Mock(side_effect=Exception))
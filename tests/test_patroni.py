@@ -229,6 +229,14 @@ class TestPatroni(unittest.TestCase):
         tags = {'nosync': True, 'sync_priority': 1}
         self.assertEqual(self.p._filter_tags(tags), tags)
 
+    def test_set_peers(self):
+        self.p.request._pool.connection_from_url('http://127.0.0.1:8010')
+        self.p.request.set_peers(['http://127.0.0.1:8010/patroni', 'http://127.0.0.1:8011/patroni'])
+        self.p.request.set_peers(['http://127.0.0.1:8011/patroni'])
+        self.assertEqual(len(self.p.request._pool.pools), 0)
+        self.p.request.set_peers(['http://127.0.0.1:{0}/patroni'.format(8000 + i) for i in range(15)])
+        self.assertEqual(self.p.request._num_pools, 25)
+
     def test_noloadbalance(self):
         self.p.tags['noloadbalance'] = True
         self.assertTrue(self.p.noloadbalance)
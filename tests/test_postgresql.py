@@ -25,6 +25,7 @@ from patroni.postgresql import PgIsReadyStatus, Postgresql
 from patroni.postgresql.bootstrap import Bootstrap
 from patroni.postgresql.callback_executor import CallbackAction
 from patroni.postgresql.config import _false_validator, get_param_diff
+from patroni.postgresql.connection import ConnectionPoolExhausted
 from patroni.postgresql.misc import PostgresqlRole, PostgresqlState
 from patroni.postgresql.postmaster import PostmasterProcess
 from patroni.postgresql.validator import _get_postgres_guc_validators, _load_postgres_gucs_validators, \
@@ -393,6 +394,40 @@ class TestPostgresql(BaseTestPostgresql):
         self.assertRaises(PostgresConnectionException, self.p.query, 'RetryFailedError')
         self.assertRaises(psycopg.ProgrammingError, self.p.query, 'blabla')
 
+    def test_named_connection_pool(self):
+        pool = self.p.connection_pool.get_pool('restapi')
+        self.assertIs(pool, self.p.connection_pool.get_pool('restapi'))
+        pool.configure(2, 0, 300)
+        with pool.checkout() as conn1:
+            conn1.get()
+            with pool.checkout() as conn2:
+                self.assertIsNot(conn1, conn2)
+                self.assertEqual(pool.in_use, 2)
+                self.assertRaises(ConnectionPoolExhausted, pool.checkout().__enter__)
+        self.assertEqual((pool.size, pool.in_use, pool.checkouts, pool.exhausted), (2, 0, 2, 1))
+
+        # the most recently used connection is reused
+        with pool.checkout() as conn:
+            self.assertIs(conn, conn1)
+
+        # idle connections are reaped, except the most recently used one
+        with patch('time.time', Mock(return_value=time.time() + 301)):
+            with pool.checkout():
+                self.assertEqual(pool.size, 1)
+
+        # shrinking the pool closes excessive connections when they are returned
+        with pool.checkout(), pool.checkout():
+            pool.configure(1, 0, 300)
+        self.assertEqual(pool.size, 1)
+
+        # waiting for a connection to be returned
+        with pool.checkout():
+            with patch.object(pool._cond, 'wait', Mock(side_effect=lambda _: setattr(pool, 'timeout', 0))) as mock_wait:
+                pool.timeout = 5
+                self.assertRaises(ConnectionPoolExhausted, pool.checkout().__enter__)
+                mock_wait.assert_called_once()
+        self.assertIsNone(self.p.connection_pool.close())
+
     @patch.object(Postgresql, 'pg_isready', Mock(return_value=PgIsReadyStatus.REJECT))
     def test_is_primary(self):
         self.assertTrue(self.p.is_primary())
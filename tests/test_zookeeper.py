@@ -4,15 +4,49 @@ import unittest
 from unittest.mock import Mock, patch, PropertyMock
 
 from kazoo.client import KazooClient
-from kazoo.exceptions import NodeExistsError, NoNodeError
+from kazoo.exceptions import BadVersionError, ConnectionLoss, \
+    NodeExistsError, NoNodeError, RolledBackError, UnimplementedError
 from kazoo.handlers.threading import SequentialThreadingHandler
-from kazoo.protocol.states import KeeperState, WatchedEvent, ZnodeStat
-from kazoo.retry import RetryFailedError
+from kazoo.protocol.serialization import CheckVersion, Create, GetData, int_struct, SetData, Transaction, write_string
+from kazoo.protocol.states import EventType, KazooState, KeeperState, WatchedEvent, ZnodeStat
+from kazoo.retry import KazooRetry, RetryFailedError
 
 from patroni.dcs import get_dcs
-from patroni.dcs.zookeeper import Cluster, PatroniKazooClient, \
-    PatroniSequentialThreadingHandler, ZooKeeper, ZooKeeperError
+from patroni.dcs.zookeeper import _command_retry_sleep, AddWatch, Cluster, PatroniKazooClient, \
+    PatroniSequentialThreadingHandler, ZooKeeper, ZooKeeperCache, ZooKeeperError
 from patroni.postgresql.mpp import get_mpp
+from patroni.utils import retry_attempts_in_thread
+
+
+class MockTransaction(object):
+
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def check(self, path, version):
+        self._ops.append((self._client.check, path, version))
+
+    def create(self, path, value=b"", acl=None, ephemeral=False, sequence=False):
+        self._ops.append((self._client.create, path, value, acl, ephemeral))
+
+    def delete(self, path, version=-1):
+        self._ops.append((self._client.delete, path, version))
+
+    def set_data(self, path, value, version=-1):
+        self._ops.append((self._client.set, path, value, version))
+
+    def commit_async(self):
+        results = []
+        for func, *args in self._ops:
+            if any(isinstance(r, Exception) for r in results):
+                results.append(RolledBackError())
+                continue
+            try:
+                results.append(func(*args) or True)
+            except Exception as e:
+                results.append(e)
+        return Mock(get=Mock(return_value=results))
 
 
 class MockKazooClient(Mock):
@@ -120,6 +154,14 @@ class MockKazooClient(Mock):
     def delete_async(self, path, version=-1, recursive=False):
         return self.delete(path, version, recursive) or Mock()
 
+    @staticmethod
+    def check(path, version):
+        if version != 0:
+            raise BadVersionError
+
+    def transaction(self):
+        return MockTransaction(self)
+
 
 class TestPatroniSequentialThreadingHandler(unittest.TestCase):
 
@@ -148,6 +190,39 @@ class TestPatroniKazooClient(unittest.TestCase):
         c._state = KeeperState.CONNECTING
         self.assertFalse(c._call(None, Mock()))
 
+    def test__call_write_listener(self):
+        c = PatroniKazooClient()
+        c.write_listener = Mock()
+        with patch.object(KazooClient, '_call', Mock()):
+            c._call(SetData('/a', b'', -1), Mock())
+            c._call(Transaction([Create('/b', b'', [], 0), CheckVersion('/c', 0)]), Mock())
+            c._call(GetData('/d', None), Mock())
+        self.assertEqual([args[0][0] for args in c.write_listener.call_args_list], ['/a', '/b'])
+
+    def test_add_persistent_recursive_watch(self):
+        c = PatroniKazooClient()
+        self.assertEqual(AddWatch('/a', 1).serialize(), write_string('/a') + int_struct.pack(1))
+        self.assertTrue(AddWatch.deserialize(b'', 0))
+        with patch.object(KazooClient, '_call', Mock(side_effect=lambda r, a: a.set(True))):
+            c.add_persistent_recursive_watch('/service/test', Mock())
+        self.assertIn('/service/test', c._persistent_watchers)
+        with patch.object(KazooClient, '_call', Mock(side_effect=lambda r, a: a.set_exception(UnimplementedError()))):
+            self.assertRaises(UnimplementedError, c.add_persistent_recursive_watch, '/service/foo', Mock())
+        self.assertNotIn('/service/foo', c._persistent_watchers)
+
+    def test__read_watch_event(self):
+        c = PatroniKazooClient()
+        c._orig_read_watch_event = Mock()
+        c._stopped.clear()
+        watcher = Mock()
+        c._persistent_watchers['/service/test'] = watcher
+        with patch.object(c.handler, 'dispatch_callback') as mock_dispatch:
+            for event_type, path in ((3, '/service/test/leader'), (4, '/service/test'), (3, '/service/test2')):
+                c._read_watch_event(int_struct.pack(event_type) + int_struct.pack(3) + write_string(path), 0)
+            mock_dispatch.assert_called_once()
+            callback = mock_dispatch.call_args[0][0]
+            self.assertEqual(callback.args[0], WatchedEvent(EventType.CHANGED, c._state, '/service/test/leader'))
+
 
 class TestZooKeeper(unittest.TestCase):
 
@@ -159,6 +234,13 @@ class TestZooKeeper(unittest.TestCase):
                                                       'digest:principal1:R6IlbH3lMF4qX9UfEp/rOy1fv/4=': ['ALL']}}})
         self.assertIsInstance(self.zk, ZooKeeper)
 
+    @patch('time.sleep', Mock())
+    def test_command_retry_counted(self):
+        retries = retry_attempts_in_thread()
+        retry = KazooRetry(max_tries=-1, sleep_func=_command_retry_sleep)
+        self.assertEqual(retry(Mock(side_effect=[ConnectionLoss, 1])), 1)
+        self.assertEqual(retry_attempts_in_thread(), retries + 1)
+
     def test_reload_config(self):
         self.zk.reload_config({'ttl': 20, 'retry_timeout': 10, 'loop_wait': 10})
         self.zk.reload_config({'ttl': 20, 'retry_timeout': 10, 'loop_wait': 5})
@@ -272,6 +354,58 @@ class TestZooKeeper(unittest.TestCase):
                 self.assertRaises(ZooKeeperError, self.zk.update_leader, cluster, 12345)
                 self.assertFalse(self.zk.update_leader(cluster, 12345))
 
+    @patch('patroni.dcs.zookeeper.logger.warning')
+    def test_update_leader_batch(self, mock_warning):
+        cluster = self.zk.get_cluster()
+        commit_async = MockTransaction.commit_async
+        with patch.object(MockKazooClient, 'client_id', PropertyMock(return_value=(0, ''))), \
+                patch.object(MockKazooClient, 'set', Mock()) as mock_set, \
+                patch.object(MockTransaction, 'commit_async', autospec=True, side_effect=commit_async) as mock_commit, \
+                patch.object(self.zk.operation_stats, 'save_rpcs') as mock_save_rpcs:
+            # without the cache checking the owner of the leader ZNode would cost one more request
+            self.assertTrue(self.zk.update_leader(cluster, 12345, failsafe={'foo': 'bar'}))
+            self.assertEqual(mock_set.call_count, 2)
+            mock_commit.assert_not_called()
+            self.assertEqual(self.zk._last_status['optime'], 12345)
+            # the ownership of the leader ZNode is taken from the cache
+            self.zk._cache = Mock()
+            self.zk._cache.get_node.return_value = ('foo', ZnodeStat(*[0] * 11))
+            # only one value has changed
+            self.assertTrue(self.zk.update_leader(cluster, 12346, failsafe={'foo': 'bar'}))
+            self.assertEqual(mock_set.call_count, 3)
+            mock_commit.assert_not_called()
+            self.assertTrue(self.zk.update_leader(cluster, 12347, failsafe={'foo': 'baz'}))
+            mock_commit.assert_called_once()
+            mock_save_rpcs.assert_called_once_with(1)
+            self.assertEqual(self.zk._last_status['optime'], 12347)
+            # another session recreated the leader ZNode, its version is 0 again
+            self.zk._cache.get_node.return_value = ('foo', ZnodeStat(*[0] * 7 + [1, 0, 0, 0]))
+            self.assertTrue(self.zk.update_leader(cluster, 12348, failsafe={'foo': 'bar'}))
+            mock_commit.assert_called_once()
+            self.assertEqual(self.zk._last_status['optime'], 12347)
+            self.assertEqual(mock_warning.call_count, 2)
+            self.zk._cache.get_node.return_value = ('foo', ZnodeStat(*[0] * 11))
+            mock_warning.reset_mock()
+            # the leader ZNode was removed
+            with patch.object(MockKazooClient, 'check', Mock(side_effect=BadVersionError)):
+                self.assertTrue(self.zk.update_leader(cluster, 23456, failsafe={'foo': 'bar'}))
+            self.assertEqual(self.zk._last_status['optime'], 12347)
+            mock_warning.assert_called_once()
+            mock_commit.side_effect = Exception
+            self.assertTrue(self.zk.update_leader(cluster, 23456, failsafe={'foo': 'bar'}))
+            self.assertEqual(self.zk._last_status['optime'], 12347)
+            mock_commit.side_effect = commit_async
+            mock_set.side_effect = Exception
+            self.assertTrue(self.zk.update_leader(cluster, 23456, failsafe={'foo': 'bar'}))
+            self.assertEqual(self.zk._last_status['optime'], 12347)
+            mock_set.side_effect = None
+            with patch.object(ZooKeeper, '_update_leader', Mock(side_effect=ZooKeeperError(''))):
+                self.assertRaises(ZooKeeperError, self.zk.update_leader, cluster, 23456)
+            self.assertEqual(self.zk._last_status['optime'], 12347)
+            self.zk._batch_writes = False
+            self.assertTrue(self.zk.update_leader(cluster, 23456))
+            self.assertEqual(self.zk._last_status['optime'], 23456)
+
     @patch.object(Cluster, 'min_version', PropertyMock(return_value=(2, 0)))
     def test_write_leader_optime(self):
         self.zk.last_lsn = '0'
@@ -311,3 +445,104 @@ class TestZooKeeper(unittest.TestCase):
     def test_watcher(self):
         self.zk._watcher(WatchedEvent('', '', ''))
         self.assertTrue(self.zk.watch(1, 1))
+
+
+class TestZooKeeperCache(unittest.TestCase):
+
+    @patch('patroni.dcs.zookeeper.PatroniKazooClient', MockKazooClient)
+    def setUp(self):
+        self.zk = get_dcs({'scope': 'test', 'name': 'foo', 'ttl': 30, 'retry_timeout': 10, 'loop_wait': 10,
+                           'zookeeper': {'hosts': ['localhost:2181'], 'use_persistent_watches': True}})
+        self.assertIsInstance(self.zk._cache, ZooKeeperCache)
+        self.cache = self.zk._cache
+        tree = {'/service/test': ['leader', 'members', 'status'], '/service/test/members': ['foo', 'bar']}
+        self.zk._client.get_children = Mock(side_effect=lambda path, *args, **kwargs: tree.get(path.rstrip('/'), []))
+
+    def test_get_cluster(self):
+        cluster = self.zk.get_cluster()
+        self.assertTrue(self.cache.is_ready())
+        self.assertEqual(cluster.leader.name, 'foo')
+        self.assertEqual(len(cluster.members), 2)
+        self.assertEqual(cluster.status.last_lsn, 500)
+        # the second load doesn't touch ZooKeeper
+        with patch.object(self.zk._client, 'get', Mock(side_effect=Exception)):
+            self.assertEqual(self.zk.get_cluster().status.last_lsn, 500)
+
+    @patch('patroni.dcs.zookeeper.logger.warning')
+    def test_build_unimplemented(self, mock_warning):
+        with patch.object(self.zk._client, 'add_persistent_recursive_watch', Mock(side_effect=UnimplementedError)):
+            self.assertIsInstance(self.zk.get_cluster(), Cluster)
+        mock_warning.assert_called_once()
+        self.assertIsNone(self.zk._cache)
+
+    @patch('patroni.dcs.zookeeper.logger.error')
+    def test_build_failed(self, mock_error):
+        with patch.object(self.zk._client, 'add_persistent_recursive_watch', Mock(side_effect=Exception)):
+            self.assertIsInstance(self.zk.get_cluster(), Cluster)
+        mock_error.assert_called_once()
+        self.assertFalse(self.cache.is_ready())
+
+    def test_build_with_pending(self):
+        def add_watch(path, watcher):
+            watcher(WatchedEvent(EventType.DELETED, KeeperState.CONNECTED, '/service/test/members/bar'))
+        with patch.object(self.zk._client, 'add_persistent_recursive_watch', Mock(side_effect=add_watch)), \
+                patch.object(self.cache, '_refresh') as mock_refresh:
+            self.cache.build()
+            mock_refresh.assert_called_once_with('/service/test/members/bar')
+
+    def test_watcher(self):
+        self.cache.build()
+        self.zk.event.clear()
+        self.cache._watcher(WatchedEvent(EventType.CHANGED, KeeperState.CONNECTED, '/service/test/members/foo'))
+        self.assertFalse(self.zk.event.is_set())
+        with patch.object(self.zk._client, 'get', Mock(return_value=(b'bar', ZnodeStat(*[0] * 11)))):
+            self.cache._watcher(WatchedEvent(EventType.CHANGED, KeeperState.CONNECTED, '/service/test/leader'))
+        self.assertTrue(self.zk.event.is_set())
+        self.zk.event.clear()
+        with patch.object(self.zk._client, 'get', Mock(return_value=(b'{"optime":600}', ZnodeStat(*[0] * 11)))):
+            self.cache._watcher(WatchedEvent(EventType.CHANGED, KeeperState.CONNECTED, '/service/test/status'))
+        self.assertTrue(self.zk.event.is_set())
+        with patch.object(self.zk._client, 'get', Mock(side_effect=NoNodeError)):
+            self.cache._watcher(WatchedEvent(EventType.DELETED, KeeperState.CONNECTED, '/service/test/members/bar'))
+        self.assertEqual(self.cache.get_children('/service/test/members/'), ['foo'])
+        with patch.object(self.zk._client, 'get', Mock(side_effect=Exception)):
+            self.cache._watcher(WatchedEvent(EventType.CHANGED, KeeperState.CONNECTED, '/service/test/leader'))
+        self.assertFalse(self.cache.is_ready())
+
+    def test_read_your_writes(self):
+        self.assertEqual(self.zk.get_cluster().leader.name, 'foo')
+        # PatroniKazooClient._call() reports znodes that we write
+        self.zk._client.write_listener('/service/test/leader')
+        self.zk._client.write_listener('/service/other/leader')
+        self.assertEqual(self.cache._written, {'/service/test/leader'})
+        self.zk._cluster_valid_till = 0
+        with patch.object(self.zk._client, 'get', Mock(return_value=(b'bar', ZnodeStat(*[0] * 11)))) as mock_get:
+            self.assertEqual(self.zk.get_cluster().leader.name, 'bar')
+            mock_get.assert_called_once_with('/service/test/leader')
+        self.assertEqual(self.cache._written, set())
+
+    @patch('patroni.dcs.zookeeper.logger.error')
+    def test_refresh_written_failed(self, mock_error):
+        self.zk.get_cluster()
+        self.cache.written('/service/test/leader')
+        self.cache.written('/service/test/status')
+        self.zk._cluster_valid_till = 0
+        with patch.object(self.zk._client, 'get', Mock(side_effect=Exception)):
+            self.assertRaises(Exception, self.cache.refresh_written)
+            self.assertEqual(len(self.cache._written), 2)
+        with patch.object(ZooKeeperCache, 'refresh_written', Mock(side_effect=Exception)):
+            # the cluster is read directly and the cache is built again on the next load
+            self.assertEqual(self.zk.get_cluster().leader.name, 'foo')
+        mock_error.assert_called_once()
+        self.assertFalse(self.cache.is_ready())
+
+    def test_state_listener(self):
+        self.cache.build()
+        self.cache._state_listener(KazooState.CONNECTED)
+        self.assertTrue(self.cache.is_ready())
+        self.cache._state_listener(KazooState.SUSPENDED)
+        self.assertFalse(self.cache.is_ready())
+
+    def test_covers(self):
+        self.assertTrue(self.cache.covers('/service/test/'))
+        self.assertFalse(self.cache.covers('/service/test2/'))